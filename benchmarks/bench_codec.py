@@ -0,0 +1,60 @@
+"""
+Compare encode/decode time per request of installed JSON codecs.
+
+Usage:
+
+    python benchmarks/bench_codec.py --requests 100000
+
+Install `orjson` or `ujson` to see accelerated codecs.
+"""
+
+import argparse
+import time
+
+from robokassa.codec import available_codecs
+
+INVOICE_RESPONSE = (
+    b'{"invoiceID":"9a0c6b3f-6f3a-4e0e-8b9e-1f1b6a9d2c4e",'
+    b'"errorCode":0,"errorMessage":null}'
+)
+
+RECEIPT = {
+    "sno": "osn",
+    "items": [
+        {
+            "name": f"Item {number}",
+            "quantity": 1,
+            "sum": 100.0 + number,
+            "payment_method": "full_payment",
+            "payment_object": "commodity",
+            "tax": "vat20",
+        }
+        for number in range(10)
+    ],
+}
+
+
+def measure(function, argument, requests: int) -> float:
+    started = time.perf_counter()
+    for _ in range(requests):
+        function(argument)
+    return (time.perf_counter() - started) / requests * 1_000_000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=100_000)
+    args = parser.parse_args()
+
+    for name, codec in available_codecs().items():
+        encoded_receipt = codec.dumps(RECEIPT)
+        print(
+            f"{name:7} "
+            f"decode invoice={measure(codec.loads, INVOICE_RESPONSE, args.requests):.2f}us "
+            f"encode receipt={measure(codec.dumps, RECEIPT, args.requests):.2f}us "
+            f"decode receipt={measure(codec.loads, encoded_receipt, args.requests):.2f}us"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Compare HTTP/1.1 and HTTP/2 for concurrent requests of async client.
+
+Usage:
+
+    python benchmarks/bench_http2.py --merchant-login demo --requests 200
+
+HTTP/2 requires `h2` package (`pip install robokassa[http2]`).
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+from robokassa.asyncio.connection import Requests
+
+
+async def run(http2: bool, merchant_login: str, requests: int) -> None:
+    connection = Requests(http2=http2).connection
+    latencies = []
+    versions = set()
+
+    async def get_currencies() -> None:
+        async with connection as conn:
+            started = time.perf_counter()
+            response = await conn.post(
+                "WebService/Service.asmx/GetCurrencies",
+                data={"MerchantLogin": merchant_login, "Language": "en"},
+            )
+            latencies.append(time.perf_counter() - started)
+            versions.add(response.http_version)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(get_currencies() for _ in range(requests)))
+    total = time.perf_counter() - started
+
+    async with connection as conn:
+        opened_connections = len(conn._transport._pool.connections)
+    await connection.aclose()
+
+    latencies.sort()
+    print(
+        f"http2={http2!s:5} versions={','.join(sorted(versions))} "
+        f"connections={opened_connections} total={total:.2f}s "
+        f"p50={statistics.median(latencies) * 1000:.1f}ms "
+        f"p99={latencies[int(len(latencies) * 0.99) - 1] * 1000:.1f}ms"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--merchant-login", default="demo")
+    parser.add_argument("--requests", type=int, default=100)
+    args = parser.parse_args()
+
+    for http2 in (False, True):
+        asyncio.run(run(http2, args.merchant_login, args.requests))
+
+
+if __name__ == "__main__":
+    main()
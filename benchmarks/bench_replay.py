@@ -0,0 +1,64 @@
+"""
+Replay recorded traffic of cassette through pooled connection.
+
+Usage:
+
+    python benchmarks/bench_replay.py robokassa.jsonl.gz --threads 16 --requests 10000
+
+Record cassette with `robokassa.cassette.RecordingTransport`.
+With `--realtime` every response waits its recorded latency,
+else requests are replayed as fast as possible.
+"""
+
+import argparse
+import base64
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from itertools import cycle, islice
+
+from robokassa.cassette import Cassette, ReplayTransport
+from robokassa.connection import HttpConnection
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("cassette")
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=None)
+    parser.add_argument("--realtime", action="store_true")
+    args = parser.parse_args()
+
+    cassette = Cassette.load(args.cassette, cycle=True)
+    interactions = cassette.interactions
+    requests = args.requests or len(interactions)
+    connection = HttpConnection(
+        transport=ReplayTransport(cassette, realtime=args.realtime)
+    )
+
+    def send(interaction) -> float:
+        started = time.perf_counter()
+        with connection as conn:
+            conn.request(
+                interaction.method,
+                interaction.url,
+                content=base64.b64decode(interaction.request_content),
+            )
+        return time.perf_counter() - started
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.threads) as executor:
+        latencies = list(executor.map(send, islice(cycle(interactions), requests)))
+    elapsed = time.perf_counter() - started
+    connection.close()
+
+    latencies.sort()
+    print(
+        f"{requests} requests in {elapsed:.2f}s: {requests / elapsed:.0f} req/s, "
+        f"p50 {statistics.median(latencies) * 1000:.2f} ms, "
+        f"p99 {latencies[int(len(latencies) * 0.99) - 1] * 1000:.2f} ms"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,13 @@
 from robokassa.client import Robokassa
 from robokassa.hash import HashAlgorithm
+from robokassa.receipt import Receipt, ReceiptItem
+from robokassa.registry import MerchantCredentials, MerchantRegistry
 
-__all__ = ["Robokassa", "HashAlgorithm"]
+__all__ = [
+    "Robokassa",
+    "HashAlgorithm",
+    "MerchantCredentials",
+    "MerchantRegistry",
+    "Receipt",
+    "ReceiptItem",
+]
@@ -1,3 +1,4 @@
 from robokassa.asyncio.client import Robokassa, HashAlgorithm
+from robokassa.asyncio.registry import AsyncMerchantRegistry
 
-__all__ = ["Robokassa", "HashAlgorithm"]
+__all__ = ["Robokassa", "HashAlgorithm", "AsyncMerchantRegistry"]
@@ -0,0 +1,55 @@
+import asyncio
+from typing import Awaitable, Callable, Iterable, List, Optional, TypeVar
+
+from robokassa.asyncio.limiter import AIMDLimiter
+from robokassa.batch import ITEM_ERRORS
+from robokassa.types import BatchItemResult
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+async def run_batch(
+    items: Iterable[T],
+    func: Callable[[T], Awaitable[R]],
+    limiter: AIMDLimiter,
+) -> List[BatchItemResult]:
+    """
+    Run `func` for every item with concurrency of limiter.
+    Items are taken from iterable only when there is free slot.
+
+    :return: Results in order of items
+    :raise: Error of `func` which isn't one of `ITEM_ERRORS`
+    """
+    results: List[BatchItemResult] = []
+    tasks = set()
+
+    async def run(result: BatchItemResult, item: T, started_at: float) -> None:
+        error: Optional[BaseException] = None
+        try:
+            result.value = await func(item)
+        except ITEM_ERRORS as exc:
+            error = result.error = exc
+        except BaseException as exc:
+            # cancellation or bug isn't a success of request
+            error = exc
+            raise
+        finally:
+            await limiter.release(started_at, error)
+
+    try:
+        for index, item in enumerate(items):
+            started_at = await limiter.acquire()
+            result = BatchItemResult(index=index)
+            results.append(result)
+
+            task = asyncio.ensure_future(run(result, item, started_at))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+
+        if tasks:
+            await asyncio.gather(*tasks)
+    finally:
+        for task in list(tasks):
+            task.cancel()
+    return results
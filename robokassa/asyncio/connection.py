@@ -1,24 +1,202 @@
+import asyncio
+from importlib.util import find_spec
 from typing import Optional
 
-from httpx import AsyncClient
+import httpx
+from httpx import AsyncClient, Limits
 
 from robokassa.connection import BaseHttpConnection, BaseRequests
+from robokassa.deadline import Deadline, TimeoutTypes, resolve_timeout
+from robokassa.dns import AsyncDNSCachingTransport, DNSCache
+from robokassa.exceptions import DeadlineExceededInFlightError
+from robokassa.protocol import R, RobokassaRequest
 
 
 class AsyncHttpConnection(BaseHttpConnection):
-    def __init__(self, base_url: str = "") -> None:
+    """
+    Connection which keeps one pooled client per event loop,
+    so keep-alive connections are reused between requests.
+
+    With `http2=True` concurrent requests are multiplexed over
+    a few connections. If server doesn't choose HTTP/2 while TLS
+    handshake (ALPN), HTTP/1.1 is used for that connection.
+
+    Custom `transport`, e.g. replay of `robokassa.cassette`,
+    is used instead of network one.
+    """
+
+    def __init__(
+        self,
+        base_url: str = "",
+        http2: bool = False,
+        limits: Optional[Limits] = None,
+        dns_cache: Optional[DNSCache] = None,
+        timeout: Optional[TimeoutTypes] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ) -> None:
         self.base_url: str = base_url
+        self.http2 = http2
+        self.limits = limits
+        self.dns_cache = dns_cache
+        self.transport = transport
+        self.timeout = resolve_timeout(httpx.Timeout(5.0), timeout)
+
+        if http2 and find_spec("h2") is None:
+            raise ImportError(
+                "HTTP/2 requires `h2` package. "
+                "Install it with `pip install robokassa[http2]`"
+            )
 
         self._async_client: Optional[AsyncClient] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _create_client(self) -> AsyncClient:
+        kwargs = {}
+        if self.limits is not None:
+            kwargs["limits"] = self.limits
+        if self.transport is not None:
+            kwargs["transport"] = self.transport
+        elif self.dns_cache is not None:
+            kwargs["transport"] = AsyncDNSCachingTransport(
+                self.dns_cache, http2=self.http2, limits=self.limits
+            )
+        return AsyncClient(
+            base_url=self.base_url, http2=self.http2, timeout=self.timeout, **kwargs
+        )
 
     async def __aenter__(self) -> AsyncClient:
-        self._async_client = AsyncClient(base_url=self.base_url)
+        loop = asyncio.get_running_loop()
+        if (
+            self._async_client is None
+            or self._async_client.is_closed
+            or self._loop is not loop
+        ):
+            # connections of pool are bound to event loop where they were opened
+            stale_client, stale_loop = self._async_client, self._loop
+            self._async_client = self._create_client()
+            self._loop = loop
+            if stale_client is not None and not stale_client.is_closed:
+                # transport of user is shared by clients of all loops
+                if self.transport is None:
+                    await self._close_client(stale_client, stale_loop)
         return self._async_client
 
+    @staticmethod
+    async def _close_client(
+        client: AsyncClient, loop: Optional[asyncio.AbstractEventLoop]
+    ) -> None:
+        if loop is asyncio.get_running_loop():
+            await client.aclose()
+            return
+        if loop is not None and loop.is_running():
+            asyncio.run_coroutine_threadsafe(client.aclose(), loop)
+            return
+        try:
+            await client.aclose()
+        except (RuntimeError, OSError):
+            # streams of closed loop can't be closed gracefully
+            pass
+
     async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
-        await self._async_client.aclose()
+        # client stays open to keep connections in the pool
+        pass
+
+    def request_timeout(
+        self,
+        timeout: Optional[TimeoutTypes] = None,
+        deadline: Optional[Deadline] = None,
+    ) -> httpx.Timeout:
+        """
+        Timeout of request with respect to timeout of call and deadline.
+        """
+        return resolve_timeout(self.timeout, timeout, deadline)
+
+    async def send(
+        self,
+        request: RobokassaRequest[R],
+        timeout: Optional[TimeoutTypes] = None,
+        deadline: Optional[Deadline] = None,
+    ) -> R:
+        """
+        Send request built by `robokassa.protocol` and parse its response.
+
+        :raise DeadlineExceededError: If deadline passed before request was sent
+        :raise DeadlineExceededInFlightError: If deadline passed after request
+            could be sent, outcome of request is unknown
+        """
+        deadline = deadline or Deadline.current()
+        request_timeout = self.request_timeout(timeout, deadline)
+        async with self as conn:
+            sending = conn.request(
+                request.method,
+                request.url,
+                data=request.data,
+                content=request.content,
+                params=request.params,
+                headers=request.headers,
+                timeout=request_timeout,
+            )
+            if deadline is None:
+                response = await sending
+            else:
+                # phases of request are limited separately, deadline limits
+                # the whole request
+                try:
+                    response = await asyncio.wait_for(sending, deadline.remaining())
+                except asyncio.TimeoutError:
+                    raise DeadlineExceededInFlightError(
+                        "Deadline of operation is exceeded while waiting for response"
+                    ) from None
+        return request.parse(response.status_code, response.content)
+
+    async def awarmup(self, connections: int = 1) -> int:
+        """
+        Open connections of pool before the first request.
+
+        :param connections: Count of connections to open
+        :raise ValueError: If count of connections is negative
+        :return: Count of successfully opened connections
+        """
+        if connections < 0:
+            raise ValueError("Count of connections must not be negative")
+        if connections == 0:
+            return 0
+        client = await self.__aenter__()
+
+        async def touch() -> bool:
+            try:
+                await client.head("")
+            except httpx.TransportError:
+                return False
+            return True
+
+        results = await asyncio.gather(*(touch() for _ in range(connections)))
+        return sum(results)
+
+    async def aclose(self) -> None:
+        client, loop = self._async_client, self._loop
+        self._async_client = None
+        self._loop = None
+        if client is not None:
+            await self._close_client(client, loop)
 
 
 class Requests(BaseRequests):
     _base_url = "https://auth.robokassa.ru/Merchant"
-    connection = AsyncHttpConnection(base_url=_base_url)
+
+    def __init__(
+        self,
+        http2: bool = False,
+        limits: Optional[Limits] = None,
+        dns_cache: Optional[DNSCache] = None,
+        timeout: Optional[TimeoutTypes] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ) -> None:
+        self.connection = AsyncHttpConnection(
+            base_url=self._base_url,
+            http2=http2,
+            limits=limits,
+            dns_cache=dns_cache,
+            timeout=timeout,
+            transport=transport,
+        )
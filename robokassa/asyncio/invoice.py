@@ -0,0 +1,100 @@
+import asyncio
+from typing import Any, AsyncIterator, Dict, Optional, Union
+
+from robokassa import protocol
+from robokassa.asyncio.connection import Requests
+from robokassa.deadline import Deadline, TimeoutTypes
+from robokassa.invoice import (
+    _checked,
+    deactivation_payload,
+    invoice_payload,
+    list_payload,
+)
+from robokassa.jwt import JWTSigner
+from robokassa.responses import InvoiceApiResult, InvoiceListResult
+
+
+class AsyncInvoiceApi:
+    """
+    Invoice API of Robokassa, JWT of requests is signed by MerchantLogin:Password#1.
+    """
+
+    def __init__(self, http: Requests, merchant_login: str, signer: JWTSigner) -> None:
+        self._http = http.connection
+        self._merchant_login = merchant_login
+        self._signer = signer
+
+    async def create(
+        self,
+        out_sum: Union[float, int, str],
+        timeout: Optional[TimeoutTypes] = None,
+        deadline: Optional[Deadline] = None,
+        **params: Any,
+    ) -> InvoiceApiResult:
+        token = self._signer.sign(
+            invoice_payload(self._merchant_login, out_sum, **params)
+        )
+        request = protocol.create_invoice_by_api(token)
+        return _checked(await self._http.send(request, timeout, deadline))
+
+    async def deactivate(
+        self,
+        inv_id: Optional[Union[int, str]] = None,
+        id_: Optional[str] = None,
+        encoded_id: Optional[str] = None,
+        timeout: Optional[TimeoutTypes] = None,
+        deadline: Optional[Deadline] = None,
+    ) -> InvoiceApiResult:
+        token = self._signer.sign(
+            deactivation_payload(self._merchant_login, inv_id, id_, encoded_id)
+        )
+        request = protocol.deactivate_invoice(token)
+        return _checked(await self._http.send(request, timeout, deadline))
+
+    async def get_page(
+        self,
+        page: int,
+        page_size: int,
+        timeout: Optional[TimeoutTypes] = None,
+        deadline: Optional[Deadline] = None,
+        **filters: Any,
+    ) -> InvoiceListResult:
+        token = self._signer.sign(
+            list_payload(self._merchant_login, page, page_size, **filters)
+        )
+        request = protocol.list_invoices(token)
+        return _checked(await self._http.send(request, timeout, deadline))
+
+    async def iter_invoices(
+        self,
+        page_size: int = 100,
+        timeout: Optional[TimeoutTypes] = None,
+        **filters: Any,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Lazily iterate over invoices page by page.
+        Next page is fetched by background task while current one
+        is consumed, so at most two pages are kept in memory.
+        Listing stops at the first page shorter than `page_size`.
+        """
+        if page_size < 1:
+            raise ValueError("Page size must be positive")
+
+        page = 1
+        task = asyncio.ensure_future(self.get_page(page, page_size, timeout, **filters))
+        try:
+            while True:
+                invoices = (await task).invoices
+                if len(invoices) < page_size:
+                    for invoice in invoices:
+                        yield invoice
+                    return
+                page += 1
+                task = asyncio.ensure_future(
+                    self.get_page(page, page_size, timeout, **filters)
+                )
+                for invoice in invoices:
+                    yield invoice
+        finally:
+            # iterator can be closed before prefetched page is consumed
+            task.cancel()
@@ -0,0 +1,135 @@
+import asyncio
+import time
+from typing import Dict, Optional, Tuple, Type
+
+import httpx
+
+from robokassa.exceptions import DeadlineExceededError, RobokassaInterfaceError
+
+
+class AIMDLimiter:
+    """
+    Adaptive limit of concurrent requests.
+
+    Limit grows by `increase` per window of successful requests while
+    latency stays healthy and is multiplied by `decrease_factor`
+    on timeouts, 5xx responses and Robokassa errors.
+    Latency is healthy while it is lower than `latency_tolerance`
+    multiplied by the lowest latency seen recently.
+
+    Limiter may be reused by batches of different event loops,
+    but not by batches running in several loops at the same time.
+    """
+
+    congestion_errors: Tuple[Type[BaseException], ...] = (
+        httpx.TimeoutException,
+        RobokassaInterfaceError,
+    )
+
+    def __init__(
+        self,
+        initial_limit: int = 4,
+        min_limit: int = 1,
+        max_limit: int = 64,
+        increase: float = 1.0,
+        decrease_factor: float = 0.5,
+        latency_tolerance: float = 2.0,
+    ) -> None:
+        if not min_limit <= initial_limit <= max_limit:
+            raise ValueError("Initial limit must be between min_limit and max_limit")
+        if not 0 < decrease_factor < 1:
+            raise ValueError("Decrease factor must be between 0 and 1")
+
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.increase = increase
+        self.decrease_factor = decrease_factor
+        self.latency_tolerance = latency_tolerance
+
+        self._limit = float(initial_limit)
+        self._in_flight = 0
+        self._min_latency: Optional[float] = None
+        self._last_decrease = 0.0
+        self._condition: Optional[asyncio.Condition] = None
+        self._condition_loop: Optional[asyncio.AbstractEventLoop] = None
+
+        self.successes = 0
+        self.failures = 0
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def metrics(self) -> Dict[str, float]:
+        return {
+            "limit": self.limit,
+            "in_flight": self._in_flight,
+            "successes": self.successes,
+            "failures": self.failures,
+            "min_latency": self._min_latency or 0.0,
+        }
+
+    def _get_condition(self) -> asyncio.Condition:
+        # condition is bound to event loop, limiter of client outlives
+        # loops of sequential `asyncio.run` calls
+        loop = asyncio.get_running_loop()
+        if self._condition is None or self._condition_loop is not loop:
+            self._condition = asyncio.Condition()
+            self._condition_loop = loop
+        return self._condition
+
+    async def acquire(self) -> float:
+        """
+        Wait for free slot.
+
+        :return: Start time of request, pass it to `release`
+        """
+        condition = self._get_condition()
+        async with condition:
+            await condition.wait_for(lambda: self._in_flight < self.limit)
+            self._in_flight += 1
+        return time.monotonic()
+
+    async def release(
+        self, started_at: float, error: Optional[BaseException] = None
+    ) -> None:
+        latency = time.monotonic() - started_at
+        if error is None:
+            self._on_success(latency)
+        elif isinstance(error, self.congestion_errors) and not isinstance(
+            error, DeadlineExceededError
+        ):
+            self._on_congestion(started_at)
+
+        condition = self._get_condition()
+        async with condition:
+            self._in_flight -= 1
+            condition.notify_all()
+
+    def _on_success(self, latency: float) -> None:
+        self.successes += 1
+        if self._min_latency is None or latency < self._min_latency:
+            self._min_latency = latency
+        else:
+            # let the lowest latency rise slowly, network path could change
+            self._min_latency += (latency - self._min_latency) * 0.01
+
+        if latency <= self._min_latency * self.latency_tolerance:
+            self._limit = min(
+                self.max_limit, self._limit + self.increase / max(self._limit, 1)
+            )
+
+    def _on_congestion(self, started_at: float) -> None:
+        self.failures += 1
+        if started_at < self._last_decrease:
+            # request was sent before the previous decrease, it is the same congestion
+            return
+        self._limit = max(self.min_limit, self._limit * self.decrease_factor)
+        self._last_decrease = time.monotonic()
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(limit={self.limit}, in_flight={self._in_flight})"
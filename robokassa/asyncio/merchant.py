@@ -1,23 +1,66 @@
+from typing import Optional, Union
+
+from robokassa import protocol
 from robokassa.asyncio.connection import Requests
-from robokassa.utils import HttpResponseValidator
+from robokassa.deadline import Deadline, TimeoutTypes
+from robokassa.hedging import HedgingPolicy
+from robokassa.protocol import R, RobokassaRequest
+from robokassa.responses import CurrenciesResult, OperationStateResult
 
 
 class AsyncMerchant:
-    def __init__(self, http: Requests, merchant_login: str) -> None:
+    def __init__(
+        self,
+        http: Requests,
+        merchant_login: str,
+        hedging: Optional[HedgingPolicy] = None,
+    ) -> None:
         self._http = http.connection
 
         self._merchant_login = merchant_login
+        self._hedging = hedging
+
+    async def _send(
+        self,
+        request: RobokassaRequest[R],
+        timeout: Optional[TimeoutTypes] = None,
+        deadline: Optional[Deadline] = None,
+    ) -> R:
+        if self._hedging is None or not request.idempotent:
+            return await self._http.send(request, timeout, deadline)
+        return await self._hedging.arun(
+            request.url, lambda: self._http.send(request, timeout, deadline)
+        )
+
+    async def get_currencies(
+        self,
+        language: str,
+        timeout: Optional[TimeoutTypes] = None,
+        deadline: Optional[Deadline] = None,
+    ) -> CurrenciesResult:
+        return await self._send(
+            protocol.get_currencies(self._merchant_login, language), timeout, deadline
+        )
 
-    async def get_currencies(self, language: str) -> dict:
-        async with self._http as conn:
-            response = await conn.post(
-                url="WebService/Service.asmx/GetCurrencies",
-                data={
-                    "MerchantLogin": self._merchant_login,
-                    "Language": language,
-                },
-            )
-            validated_response = HttpResponseValidator(
-                response, False
-            ).validate_http_response()
-            return validated_response
+    async def get_operation_state(
+        self,
+        signature_value: str,
+        invoice_id: Union[int, str],
+        timeout: Optional[TimeoutTypes] = None,
+        deadline: Optional[Deadline] = None,
+    ) -> OperationStateResult:
+        """
+        Get state of operation.
+        :param signature_value: MerchantLogin:InvoiceID:Password#2
+        :param invoice_id: Store account number
+        :param timeout: Timeout of request
+        :param deadline: Deadline of operation
+        :return: Lazy result of operation state
+        """
+        return await self._send(
+            protocol.get_operation_state(
+                self._merchant_login, invoice_id, signature_value
+            ),
+            timeout,
+            deadline,
+        )
@@ -1,36 +1,59 @@
-from typing import Union, Optional
-
-from httpx import Response
+import asyncio
+from typing import Any, Iterable, List, Optional, Tuple, Union
 
+from robokassa import protocol
+from robokassa.asyncio.batch import run_batch
 from robokassa.asyncio.connection import Requests
+from robokassa.asyncio.limiter import AIMDLimiter
+from robokassa.cache import InvoiceLinkCache, ScriptLinkCache
+from robokassa.deadline import Deadline, TimeoutTypes
 from robokassa.hash import Hash
 from robokassa.payment import PaymentUrlGenerator
+from robokassa.receipt import Receipt, encode_receipt
+from robokassa.protocol import RobokassaRequest
+from robokassa.responses import HoldOperationResult, RecurringResult
+from robokassa.batch import RateLimiter
+from robokassa.settlement import HoldSettlement, SettlementAction
 from robokassa.signature import SignaturesChecker
-from robokassa.types import RobokassaParams, Signature
-from robokassa.utils import HttpResponseValidator
+from robokassa.types import BatchItemResult, RobokassaParams, Signature
+from robokassa.validation import validate_params
 
 
 class AsyncPaymentRequests:
     def __init__(self, http: Requests) -> None:
         self._http = http.connection
-        self.payment_url = "https://auth.robokassa.ru/Merchant/Index"
-
-    async def _make_post_request(self, data: dict) -> Response:
-        async with self._http as conn:
-            response = await conn.post("Indexjson.aspx?", data=data)
-            return response
-
-    def _serialize_payment_url(self, invoice_id: str) -> str:
-        return f"{self.payment_url}/{invoice_id}"
+        self.payment_url = protocol.PAYMENT_URL
 
     async def create_url_to_payment_page(
-        self, robokassa_params: RobokassaParams
+        self,
+        robokassa_params: RobokassaParams,
+        timeout: Optional[TimeoutTypes] = None,
+        deadline: Optional[Deadline] = None,
     ) -> str:
-        response = await self._make_post_request(robokassa_params.as_dict())
-        validated_response = HttpResponseValidator(response).validate_http_response()
-        invoice_id = validated_response["invoiceID"]
+        result = await self._http.send(
+            protocol.create_invoice(robokassa_params), timeout, deadline
+        )
+        return protocol.payment_page_url(result)
 
-        return self._serialize_payment_url(invoice_id)
+    async def charge_recurring(
+        self,
+        robokassa_params: RobokassaParams,
+        timeout: Optional[TimeoutTypes] = None,
+        deadline: Optional[Deadline] = None,
+    ) -> RecurringResult:
+        return await self._http.send(
+            protocol.charge_recurring(robokassa_params), timeout, deadline
+        )
+
+    async def send_hold_operation(
+        self,
+        request: RobokassaRequest[HoldOperationResult],
+        timeout: Optional[TimeoutTypes] = None,
+        deadline: Optional[Deadline] = None,
+    ) -> HoldOperationResult:
+        result = await self._http.send(request, timeout, deadline)
+        result.raise_for_error()
+        return result
 
 
 class AsyncPaymentInterface:
@@ -38,9 +61,32 @@ class AsyncPaymentInterface:
         self._requests = AsyncPaymentRequests(http)
 
     async def create_url_to_payment_page(
-        self, robokassa_params: RobokassaParams
+        self,
+        robokassa_params: RobokassaParams,
+        timeout: Optional[TimeoutTypes] = None,
+        deadline: Optional[Deadline] = None,
     ) -> str:
-        return await self._requests.create_url_to_payment_page(robokassa_params)
+        return await self._requests.create_url_to_payment_page(
+            robokassa_params, timeout, deadline
+        )
+
+    async def charge_recurring(
+        self,
+        robokassa_params: RobokassaParams,
+        timeout: Optional[TimeoutTypes] = None,
+        deadline: Optional[Deadline] = None,
+    ) -> RecurringResult:
+        return await self._requests.charge_recurring(
+            robokassa_params, timeout, deadline
+        )
+
+    async def send_hold_operation(
+        self,
+        request: RobokassaRequest[HoldOperationResult],
+        timeout: Optional[TimeoutTypes] = None,
+        deadline: Optional[Deadline] = None,
+    ) -> HoldOperationResult:
+        return await self._requests.send_hold_operation(request, timeout, deadline)
 
 
 class AsyncPaymentLink:
@@ -51,11 +97,15 @@ class AsyncPaymentLink:
         hash_: Hash,
         merchant_login: str,
         password1: str,
+        invoice_link_cache: Optional[InvoiceLinkCache] = None,
+        script_link_cache: Optional[ScriptLinkCache] = None,
     ) -> None:
         self._is_test = is_test
         self._hash_ = hash_
         self._merchant_login = merchant_login
         self._password1 = password1
+        self._invoice_link_cache = invoice_link_cache
+        self._script_link_cache = script_link_cache
 
         self._payment_interface = AsyncPaymentInterface(http)
 
@@ -64,6 +114,7 @@ class AsyncPaymentLink:
             hash_=self._hash_,
             merchant_login=self._merchant_login,
             password=password1,
+            script_link_cache=script_link_cache,
         )
 
         self.robokassa_params: RobokassaParams = RobokassaParams(
@@ -72,13 +123,17 @@ class AsyncPaymentLink:
         )
 
     def _create_signature(
-        self, inv_id: Union[str, int], out_sum: Union[str, int, float]
+        self,
+        inv_id: Union[str, int],
+        out_sum: Union[str, int, float],
+        receipt: Optional[str] = None,
     ) -> Signature:
         return Signature(
             merchant_login=self._merchant_login,
             password=self._password1,
             inv_id=inv_id,
             out_sum=out_sum,
+            receipt=receipt,
             hash_=self._hash_,
         )
 
@@ -93,6 +148,8 @@ class AsyncPaymentLink:
         fail_url_method: Optional[str] = None,
         inv_id: Optional[int] = 0,
         description: Optional[str] = None,
+        receipt: Optional[Union[Receipt, str]] = None,
+        step_by_step: bool = False,
         **kwargs,
     ) -> str:
         return self._payment_generator.generate_by_script(
@@ -105,6 +162,8 @@ class AsyncPaymentLink:
             fail_url_method=fail_url_method,
             inv_id=inv_id,
             description=description,
+            receipt=receipt,
+            step_by_step=step_by_step,
             **kwargs,
         )
 
@@ -113,17 +172,140 @@ class AsyncPaymentLink:
         inv_id: Optional[Union[str, int]],
         out_sum: Union[str, int, float],
         description: str,
+        expiration_date: Optional[str] = None,
+        receipt: Optional[Union[Receipt, str]] = None,
+        step_by_step: bool = False,
+        timeout: Optional[TimeoutTypes] = None,
+        deadline: Optional[Deadline] = None,
     ) -> str:
-        return await self._payment_interface.create_url_to_payment_page(
-            RobokassaParams(
-                is_test=self._is_test,
-                merchant_login=self._merchant_login,
-                inv_id=inv_id,
-                out_sum=out_sum,
-                description=description,
-                signature_value=self._create_signature(inv_id, out_sum).value,
+        receipt = encode_receipt(receipt)
+        robokassa_params = RobokassaParams(
+            is_test=self._is_test,
+            merchant_login=self._merchant_login,
+            inv_id=inv_id,
+            out_sum=out_sum,
+            description=description,
+            expiration_date=expiration_date,
+            receipt=receipt,
+            step_by_step="true" if step_by_step else None,
+        )
+        validate_params(robokassa_params)
+        robokassa_params.signature_value = self._create_signature(
+            inv_id, out_sum, receipt
+        ).value
+        if self._invoice_link_cache is None or not self._invoice_link_cache.accepts(
+            inv_id, expiration_date
+        ):
+            return await self._payment_interface.create_url_to_payment_page(
+                robokassa_params, timeout, deadline
+            )
+
+        # SQLite of cache can wait for lock of other writer, so it's used
+        # in default executor instead of blocking the event loop
+        loop = asyncio.get_running_loop()
+        key = self._invoice_link_cache.make_key(robokassa_params.as_dict())
+        url = await loop.run_in_executor(None, self._invoice_link_cache.get, key)
+        if url is None:
+            url = await self._payment_interface.create_url_to_payment_page(
+                robokassa_params, timeout, deadline
+            )
+            await loop.run_in_executor(
+                None, self._invoice_link_cache.set, key, url, expiration_date
             )
+        return url
+
+    async def charge_recurring(
+        self,
+        previous_inv_id: Union[int, str],
+        inv_id: Union[int, str],
+        out_sum: Union[float, int, str],
+        description: Optional[str] = None,
+        receipt: Optional[Union[Receipt, str]] = None,
+        timeout: Optional[TimeoutTypes] = None,
+        deadline: Optional[Deadline] = None,
+    ) -> RecurringResult:
+        receipt = encode_receipt(receipt)
+        robokassa_params = RobokassaParams(
+            merchant_login=self._merchant_login,
+            inv_id=inv_id,
+            previous_inv_id=previous_inv_id,
+            out_sum=out_sum,
+            description=description,
+            receipt=receipt,
+        )
+        validate_params(robokassa_params)
+        robokassa_params.signature_value = self._create_signature(
+            inv_id, out_sum, receipt
+        ).value
+        return await self._payment_interface.charge_recurring(
+            robokassa_params, timeout, deadline
+        )
+
+    async def confirm_hold(
+        self,
+        inv_id: Union[int, str],
+        out_sum: Union[float, int, str],
+        receipt: Optional[Union[Receipt, str]] = None,
+        timeout: Optional[TimeoutTypes] = None,
+        deadline: Optional[Deadline] = None,
+    ) -> HoldOperationResult:
+        receipt = encode_receipt(receipt)
+        request = protocol.confirm_hold(
+            self._merchant_login,
+            inv_id,
+            out_sum,
+            self._create_signature(inv_id, out_sum, receipt).value,
+            receipt,
         )
+        return await self._payment_interface.send_hold_operation(
+            request, timeout, deadline
+        )
+
+    async def cancel_hold(
+        self,
+        inv_id: Union[int, str],
+        timeout: Optional[TimeoutTypes] = None,
+        deadline: Optional[Deadline] = None,
+    ) -> HoldOperationResult:
+        # OutSum is empty in signature of cancellation
+        request = protocol.cancel_hold(
+            self._merchant_login, inv_id, self._create_signature(inv_id, "").value
+        )
+        return await self._payment_interface.send_hold_operation(
+            request, timeout, deadline
+        )
+
+    async def settle(
+        self,
+        settlement: HoldSettlement,
+        timeout: Optional[TimeoutTypes] = None,
+        deadline: Optional[Deadline] = None,
+    ) -> HoldOperationResult:
+        if settlement.action is SettlementAction.confirm:
+            return await self.confirm_hold(
+                settlement.inv_id,
+                settlement.out_sum,
+                settlement.receipt,
+                timeout,
+                deadline,
+            )
+        return await self.cancel_hold(settlement.inv_id, timeout, deadline)
+
+    async def settle_holds(
+        self,
+        settlements: Iterable[Union[HoldSettlement, Tuple[Any, ...]]],
+        limiter: AIMDLimiter,
+        rate: Optional[float] = None,
+    ) -> List[BatchItemResult]:
+        rate_limiter = None if rate is None else RateLimiter(rate)
+
+        async def settle(record: Union[HoldSettlement, Tuple[Any, ...]]):
+            settlement = HoldSettlement.from_record(record)
+            if rate_limiter is not None:
+                await rate_limiter.aacquire()
+            return await self.settle(settlement)
+
+        return await run_batch(settlements, settle, limiter)
 
 
 class AsyncPayment:
@@ -135,19 +317,29 @@ class AsyncPayment:
         merchant_login: str,
         password1: str,
         password2: str,
+        invoice_link_cache: Optional[InvoiceLinkCache] = None,
+        script_link_cache: Optional[ScriptLinkCache] = None,
     ) -> None:
         self._is_test = is_test
         self._hash = hash_
         self._merchant_login = merchant_login
         self._password1 = password1
         self._password2 = password2
+        self._invoice_link_cache = invoice_link_cache
+        self._script_link_cache = script_link_cache
 
         self._http = http
 
     @property
     def link(self) -> AsyncPaymentLink:
         return AsyncPaymentLink(
-            self._http, self._is_test, self._hash, self._merchant_login, self._password1
+            self._http,
+            self._is_test,
+            self._hash,
+            self._merchant_login,
+            self._password1,
+            self._invoice_link_cache,
+            self._script_link_cache,
         )
 
     @property
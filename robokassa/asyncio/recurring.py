@@ -0,0 +1,81 @@
+import asyncio
+from typing import Any, AsyncIterable, Iterable, Optional, Tuple, Union
+
+import httpx
+
+from robokassa.exceptions import RobokassaInterfaceError
+from robokassa.recurring import (
+    CHARGE_ERRORS,
+    BaseRecurringRunner,
+    ChargeOutcome,
+    RecurringCharge,
+    RecurringReport,
+    UNCERTAIN_STATUSES,
+)
+
+Record = Union[RecurringCharge, Tuple[Any, ...]]
+
+
+class AsyncRecurringRunner(BaseRecurringRunner):
+    """
+    Runner of recurring charges of async client
+    with `concurrency` worker tasks.
+    Run can be repeated with the same records after crash,
+    already accepted or rejected charges are skipped.
+    """
+
+    async def _reconciled(self, charge: RecurringCharge) -> Optional[ChargeOutcome]:
+        try:
+            state = await self.client.get_operation_state(charge.inv_id)
+        except (RobokassaInterfaceError, httpx.HTTPError):
+            state = None
+        return self._reconciled_outcome(charge, state)
+
+    async def charge(self, charge: RecurringCharge) -> ChargeOutcome:
+        previous = self.journal.claim(charge)
+        outcome = self._outcome_of_claim(charge, previous)
+        if outcome is not None:
+            return outcome
+        if previous in UNCERTAIN_STATUSES:
+            outcome = await self._reconciled(charge)
+            if outcome is not None:
+                return outcome
+
+        try:
+            await self.client.charge_recurring(**charge.params())
+        except CHARGE_ERRORS as exc:
+            return self._finish(charge, exc)
+        return self._finish(charge)
+
+    async def run(
+        self, records: Union[Iterable[Record], AsyncIterable[Record]]
+    ) -> RecurringReport:
+        """
+        Charge all records, only `concurrency` records are read ahead.
+
+        :param records: Charges or `(previous_inv_id, inv_id, out_sum)` tuples
+        """
+        if hasattr(records, "__aiter__"):
+            iterator = records.__aiter__()
+        else:
+            iterator = _aiter(records)
+
+        report = RecurringReport()
+        lock = asyncio.Lock()
+
+        async def worker() -> None:
+            while True:
+                async with lock:
+                    try:
+                        record = await iterator.__anext__()
+                    except StopAsyncIteration:
+                        return
+                report.add(await self.charge(RecurringCharge.from_record(record)))
+
+        await asyncio.gather(*(worker() for _ in range(self.concurrency)))
+        return report
+
+
+async def _aiter(records: Iterable[Record]):
+    for record in records:
+        yield record
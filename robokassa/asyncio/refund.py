@@ -0,0 +1,35 @@
+from typing import Any, Dict, List, Optional, Union
+
+from robokassa import protocol
+from robokassa.asyncio.connection import Requests
+from robokassa.deadline import Deadline, TimeoutTypes
+from robokassa.jwt import JWTSigner
+from robokassa.refund import refund_payload
+from robokassa.responses import RefundCreationResult, RefundStateResult
+
+
+class AsyncRefund:
+    def __init__(self, http: Requests, signer: JWTSigner) -> None:
+        self._http = http.connection
+        self._signer = signer
+
+    async def create(
+        self,
+        op_key: str,
+        refund_sum: Optional[Union[float, int]] = None,
+        invoice_items: Optional[List[Dict[str, Any]]] = None,
+        timeout: Optional[TimeoutTypes] = None,
+        deadline: Optional[Deadline] = None,
+    ) -> RefundCreationResult:
+        token = self._signer.sign(refund_payload(op_key, refund_sum, invoice_items))
+        return await self._http.send(protocol.create_refund(token), timeout, deadline)
+
+    async def get_state(
+        self,
+        request_id: str,
+        timeout: Optional[TimeoutTypes] = None,
+        deadline: Optional[Deadline] = None,
+    ) -> RefundStateResult:
+        return await self._http.send(
+            protocol.get_refund_state(request_id), timeout, deadline
+        )
@@ -0,0 +1,94 @@
+from typing import Optional, Union
+
+from robokassa.asyncio.connection import Requests
+from robokassa.asyncio.merchant import AsyncMerchant
+from robokassa.asyncio.payment import AsyncPayment, AsyncPaymentLink
+from robokassa.deadline import Deadline, TimeoutTypes
+from robokassa.hash import Hash
+from robokassa.receipt import Receipt
+from robokassa.registry import BaseMerchantRegistry, MerchantCredentials
+
+
+class AsyncMerchantRegistry(BaseMerchantRegistry):
+    def _init_http_connection(self) -> Requests:
+        return Requests(timeout=self._timeout)
+
+    def _init_payment(
+        self, credentials: MerchantCredentials, hash_: Hash
+    ) -> AsyncPayment:
+        return AsyncPayment(
+            http=self._http,
+            is_test=credentials.is_test,
+            hash_=hash_,
+            merchant_login=credentials.merchant_login,
+            password1=credentials.password1,
+            password2=credentials.password2,
+            invoice_link_cache=self._invoice_link_cache,
+            script_link_cache=self._script_link_cache,
+        )
+
+    def _init_merchant(self, credentials: MerchantCredentials) -> AsyncMerchant:
+        return AsyncMerchant(
+            http=self._http,
+            merchant_login=credentials.merchant_login,
+            hedging=self._hedging,
+        )
+
+    async def create_link_to_payment_page_by_invoice_id(
+        self,
+        merchant_login: str,
+        inv_id: Optional[Union[str, int]],
+        out_sum: Union[str, int, float],
+        description: str,
+        expiration_date: Optional[str] = None,
+        receipt: Optional[Union[Receipt, str]] = None,
+        step_by_step: bool = False,
+        timeout: Optional[TimeoutTypes] = None,
+        deadline: Optional[Deadline] = None,
+    ) -> str:
+        """
+        Create a link to payment page of merchant by invoice ID.
+
+        :param merchant_login: MerchantLogin of shop
+        :param inv_id:
+        :param out_sum:
+        :param description: Shop description
+        :param expiration_date: ExpirationDate of invoice in ISO 8601
+        :param receipt: Fiscal receipt or its percent-encoded JSON
+        :param step_by_step: Hold money until payment is confirmed or cancelled
+        :param timeout: Timeout of request, seconds or `httpx.Timeout`
+        :param deadline: Deadline of operation, current one is used by default
+        :return: Url to payment page
+        """
+        link: AsyncPaymentLink = self.get(merchant_login).link
+        return await link.create_by_invoice_id(
+            inv_id=inv_id,
+            out_sum=out_sum,
+            description=description,
+            expiration_date=expiration_date,
+            receipt=receipt,
+            step_by_step=step_by_step,
+            timeout=timeout,
+            deadline=deadline,
+        )
+
+    async def get_currencies(
+        self,
+        merchant_login: str,
+        language: str = "en",
+        timeout: Optional[TimeoutTypes] = None,
+        deadline: Optional[Deadline] = None,
+    ) -> dict:
+        """
+        Get available currencies of merchant.
+
+        :param merchant_login: MerchantLogin of shop
+        :param language: `ru` or `en`
+        :param timeout: Timeout of request, seconds or `httpx.Timeout`
+        :param deadline: Deadline of operation, current one is used by default
+        :return: dictionary of currencies
+        """
+        result = await self.get(merchant_login).merchant.get_currencies(
+            language, timeout=timeout, deadline=deadline
+        )
+        return result.as_dict()
@@ -0,0 +1,197 @@
+"""
+Ingestion of ResultURL notifications of Robokassa.
+
+Notification is verified and acknowledged at once, slow fulfilment
+is done later by worker tasks. When queue is full, notifications are
+shed with 503 and Robokassa sends them again later, so latency of
+acknowledgement doesn't grow under burst load:
+
+    queue = robokassa.create_webhook_queue(fulfil_order, workers=8)
+    await queue.start()
+
+    async def result_url(request):  # handler of any web framework
+        response = queue.accept(await request.form())
+        return PlainTextResponse(response.body, status_code=response.status_code)
+"""
+
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Mapping, Optional
+from urllib.parse import parse_qsl
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class Notification:
+    """
+    Verified notification of payment.
+
+    :param additional_params: Params with `shp_` prefix
+    :param params: All fields of notification
+    """
+
+    out_sum: str
+    inv_id: str
+    signature: str
+    additional_params: Dict[str, str] = field(default_factory=dict)
+    params: Dict[str, str] = field(default_factory=dict)
+
+
+@dataclass(frozen=True)
+class WebhookResponse:
+    status_code: int
+    body: str
+
+
+Handler = Callable[[Notification], Awaitable[Any]]
+
+
+class WebhookQueue:
+    """
+    Bounded queue of verified notifications served by worker tasks.
+
+    Notification is acknowledged before it's handled, so Robokassa
+    doesn't send it again. Handler must make its work durable
+    or idempotent by itself, errors of handler are only logged.
+
+    :param checker: Checker of signatures, e.g. `SignaturesChecker`
+    :param handler: Coroutine function which fulfils notification
+    :param workers: Count of worker tasks
+    :param maxsize: Max count of notifications waiting for worker
+    """
+
+    def __init__(
+        self,
+        checker: Any,
+        handler: Handler,
+        workers: int = 4,
+        maxsize: int = 1000,
+    ) -> None:
+        if workers < 1:
+            raise ValueError("Count of workers must be positive")
+        if maxsize < 1:
+            raise ValueError("Max size of queue must be positive")
+
+        self.checker = checker
+        self.handler = handler
+        self.workers = workers
+        self.maxsize = maxsize
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._accepting = False
+
+        self.accepted = 0
+        self.rejected = 0
+        self.shed = 0
+        self.processed = 0
+        self.failed = 0
+
+    def metrics(self) -> Dict[str, int]:
+        return {
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "accepted": self.accepted,
+            "rejected": self.rejected,
+            "shed": self.shed,
+            "processed": self.processed,
+            "failed": self.failed,
+        }
+
+    async def start(self) -> None:
+        if self._tasks:
+            return
+        self._queue = asyncio.Queue(self.maxsize)
+        self._tasks = [asyncio.ensure_future(self._work()) for _ in range(self.workers)]
+        self._accepting = True
+
+    async def stop(self, drain: bool = True) -> None:
+        """
+        Stop accepting notifications and stop workers.
+
+        :param drain: Handle queued notifications before stop
+        """
+        self._accepting = False
+        if drain and self._queue is not None:
+            await self._queue.join()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def __aenter__(self) -> "WebhookQueue":
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        await self.stop()
+
+    async def _work(self) -> None:
+        queue = self._queue
+        while True:
+            notification = await queue.get()
+            try:
+                await self.handler(notification)
+            except Exception:
+                self.failed += 1
+                logger.exception(
+                    "Handler failed on notification of InvId %s", notification.inv_id
+                )
+            else:
+                self.processed += 1
+            finally:
+                queue.task_done()
+
+    def verify(self, form: Mapping[str, str]) -> Optional[Notification]:
+        """
+        :return: Notification if its signature is valid, else None
+        """
+        out_sum = form.get("OutSum")
+        inv_id = form.get("InvId")
+        signature = form.get("SignatureValue")
+        if out_sum is None or inv_id is None or signature is None:
+            return None
+
+        additional_params = {
+            key: value for key, value in form.items() if key.lower().startswith("shp_")
+        }
+        if not self.checker.result_url_signature_is_valid(
+            signature, out_sum, inv_id, **additional_params
+        ):
+            return None
+        return Notification(out_sum, inv_id, signature, additional_params, dict(form))
+
+    def accept(self, form: Mapping[str, str]) -> WebhookResponse:
+        """
+        Verify notification and put it to queue without waiting.
+
+        :param form: Fields of ResultURL request
+        :return: `OK<InvId>` if notification is queued, 400 if it's invalid,
+            503 if queue is full or stopped
+        """
+        notification = self.verify(form)
+        if notification is None:
+            self.rejected += 1
+            return WebhookResponse(400, "bad sign")
+        if not self._accepting:
+            self.shed += 1
+            return WebhookResponse(503, "queue is stopped")
+        try:
+            self._queue.put_nowait(notification)
+        except asyncio.QueueFull:
+            self.shed += 1
+            return WebhookResponse(503, "queue is full")
+        self.accepted += 1
+        return WebhookResponse(200, f"OK{notification.inv_id}")
+
+    def accept_body(self, body: bytes) -> WebhookResponse:
+        """
+        Accept raw form-encoded body of ResultURL request.
+        """
+        return self.accept(dict(parse_qsl(body.decode(), keep_blank_values=True)))
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__name__}(workers={self.workers}, maxsize={self.maxsize})"
+        )
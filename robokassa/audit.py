@@ -0,0 +1,207 @@
+"""
+Offline re-verification of logged notifications of Robokassa.
+
+Log is a file of raw form-encoded bodies of ResultURL (or SuccessURL)
+requests, one body per line:
+
+    OutSum=100.00&InvId=5&SignatureValue=...&Shp_user=1
+
+Files are memory-mapped and split into ranges by byte offsets, ranges
+are checked in a process pool. Bodies are parsed in place in the map,
+only values of fields are copied, so audit is bound by reading of files.
+"""
+
+import mmap
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+from urllib.parse import unquote_plus
+
+from robokassa.hash import Hash
+from robokassa.registry import MerchantCredentials
+from robokassa.signature import SignaturesChecker
+
+# size of range checked by one task
+DEFAULT_CHUNK_SIZE = 64 * 1024 * 1024
+
+_ESCAPED = (b"%", b"+")
+
+
+@dataclass(frozen=True)
+class Mismatch:
+    """
+    Notification which signature doesn't match.
+
+    :param path: Path of log
+    :param offset: Offset of body in log
+    """
+
+    path: str
+    offset: int
+    inv_id: Optional[str]
+    out_sum: Optional[str]
+
+
+@dataclass
+class AuditReport:
+    checked: int = 0
+    valid: int = 0
+    malformed: int = 0
+    mismatches: List[Mismatch] = field(default_factory=list)
+
+    def merge(self, other: "AuditReport") -> None:
+        self.checked += other.checked
+        self.valid += other.valid
+        self.malformed += other.malformed
+        self.mismatches.extend(other.mismatches)
+
+
+def _decode(buffer: mmap.mmap, start: int, end: int) -> str:
+    value = buffer[start:end]
+    if any(char in value for char in _ESCAPED):
+        return unquote_plus(value.decode(), errors="strict")
+    return value.decode()
+
+
+def parse_form(buffer: mmap.mmap, start: int, end: int) -> Dict[str, str]:
+    """
+    Parse form-encoded body between offsets of buffer.
+
+    :raise UnicodeDecodeError: If body, also percent-encoded one, isn't UTF-8
+    """
+    fields = {}
+    position = start
+    while position < end:
+        separator = buffer.find(b"&", position, end)
+        if separator == -1:
+            separator = end
+        equals = buffer.find(b"=", position, separator)
+        if equals != -1:
+            key = _decode(buffer, position, equals)
+            fields[key] = _decode(buffer, equals + 1, separator)
+        position = separator + 1
+    return fields
+
+
+def file_ranges(
+    path: str, chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> List[Tuple[int, int]]:
+    """
+    Split file into ranges of about `chunk_size` bytes ending at line boundaries.
+    """
+    size = os.path.getsize(path)
+    if size == 0:
+        return []
+    with (
+        open(path, "rb") as file,
+        mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buffer,
+    ):
+        ranges = []
+        start = 0
+        while start < size:
+            newline = buffer.find(b"\n", min(start + chunk_size, size) - 1)
+            end = size if newline == -1 else newline + 1
+            ranges.append((start, end))
+            start = end
+    return ranges
+
+
+def _lines(buffer: mmap.mmap, start: int, end: int) -> Iterator[Tuple[int, int]]:
+    position = start
+    while position < end:
+        newline = buffer.find(b"\n", position, end)
+        line_end = end if newline == -1 else newline
+        if line_end > position and buffer[line_end - 1 : line_end] == b"\r":
+            line_end -= 1
+        if line_end > position:
+            yield position, line_end
+        position = (end if newline == -1 else newline) + 1
+
+
+def check_range(
+    path: str,
+    start: int,
+    end: int,
+    credentials: MerchantCredentials,
+    result_url: bool = True,
+) -> AuditReport:
+    """
+    Check signatures of notifications between offsets of log.
+
+    :param result_url: Notifications of ResultURL signed by Password#2,
+        else of SuccessURL or FailURL signed by Password#1
+    """
+    checker = SignaturesChecker(
+        Hash(credentials.algorithm), credentials.password1, credentials.password2
+    )
+    is_valid = (
+        checker.result_url_signature_is_valid
+        if result_url
+        else checker.success_or_fail_url_signature_is_valid
+    )
+
+    report = AuditReport()
+    with (
+        open(path, "rb") as file,
+        mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buffer,
+    ):
+        if hasattr(mmap, "MADV_SEQUENTIAL"):
+            buffer.madvise(mmap.MADV_SEQUENTIAL, 0, len(buffer))
+        for line_start, line_end in _lines(buffer, start, end):
+            try:
+                fields = parse_form(buffer, line_start, line_end)
+            except UnicodeDecodeError:
+                report.malformed += 1
+                continue
+            signature = fields.get("SignatureValue")
+            out_sum = fields.get("OutSum")
+            if signature is None or out_sum is None:
+                report.malformed += 1
+                continue
+
+            report.checked += 1
+            inv_id = fields.get("InvId")
+            additional_params = {
+                key: value
+                for key, value in fields.items()
+                if key.lower().startswith("shp_")
+            }
+            if is_valid(signature, out_sum, inv_id, **additional_params):
+                report.valid += 1
+            else:
+                report.mismatches.append(Mismatch(path, line_start, inv_id, out_sum))
+    return report
+
+
+def _check_task(task: Tuple[str, int, int, MerchantCredentials, bool]) -> AuditReport:
+    return check_range(*task)
+
+
+def audit_logs(
+    paths: Iterable[str],
+    credentials: MerchantCredentials,
+    result_url: bool = True,
+    processes: Optional[int] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> AuditReport:
+    """
+    Check signatures of all notifications of logs in process pool.
+
+    :param paths: Paths of logs
+    :param credentials: Credentials of merchant which logs are checked
+    :param result_url: Logs of ResultURL, else of SuccessURL or FailURL
+    :param processes: Count of processes, count of CPUs by default
+    :param chunk_size: Size of range checked by one task in bytes
+    :return: Summary counts and mismatches in order of logs
+    """
+    tasks: Sequence[Tuple[str, int, int, MerchantCredentials, bool]] = [
+        (path, start, end, credentials, result_url)
+        for path in paths
+        for start, end in file_ranges(path, chunk_size)
+    ]
+    report = AuditReport()
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        for part in executor.map(_check_task, tasks):
+            report.merge(part)
+    return report
@@ -0,0 +1,108 @@
+import asyncio
+import contextvars
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Callable, Iterable, List, Optional, Set, Tuple, Type, TypeVar
+
+import httpx
+
+from robokassa.exceptions import (
+    IncorrectUrlMethodError,
+    RobokassaInterfaceError,
+    UnknownMerchantError,
+    UnusedStrictUrlParameterError,
+)
+from robokassa.types import BatchItemResult
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+# errors of one item, they are reported in its result instead of failing batch
+ITEM_ERRORS: Tuple[Type[Exception], ...] = (
+    httpx.HTTPError,
+    OSError,
+    ValueError,
+    RobokassaInterfaceError,
+    UnknownMerchantError,
+    UnusedStrictUrlParameterError,
+    IncorrectUrlMethodError,
+)
+
+
+class RateLimiter:
+    """
+    Limit of requests per second shared by threads and tasks.
+    Requests are spaced evenly, without bursts.
+    """
+
+    def __init__(self, rate: float) -> None:
+        if rate <= 0:
+            raise ValueError("Rate must be positive")
+        self.rate = rate
+
+        self._interval = 1 / rate
+        self._next_at = 0.0
+        self._lock = threading.Lock()
+
+    def _reserve(self) -> float:
+        with self._lock:
+            now = time.monotonic()
+            at = max(now, self._next_at)
+            self._next_at = at + self._interval
+        return at - now
+
+    def acquire(self) -> None:
+        delay = self._reserve()
+        if delay > 0:
+            time.sleep(delay)
+
+    async def aacquire(self) -> None:
+        delay = self._reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+def run_batch(
+    items: Iterable[T],
+    func: Callable[[T], R],
+    max_workers: int = 8,
+    rate: Optional[float] = None,
+) -> List[BatchItemResult]:
+    """
+    Run `func` for every item in a thread pool.
+    Only `max_workers` items are taken from iterable ahead.
+
+    :param rate: Max calls of `func` per second
+    :return: Results in order of items
+    :raise: Error of `func` which isn't one of `ITEM_ERRORS`
+    """
+    limiter = None if rate is None else RateLimiter(rate)
+    results: List[BatchItemResult] = []
+
+    def run(result: BatchItemResult, item: T) -> None:
+        try:
+            if limiter is not None:
+                limiter.acquire()
+            result.value = func(item)
+        except ITEM_ERRORS as exc:
+            result.error = exc
+
+    with ThreadPoolExecutor(
+        max_workers=max_workers, thread_name_prefix="robokassa-batch"
+    ) as executor:
+        pending: Set[Future] = set()
+        for index, item in enumerate(items):
+            if len(pending) >= max_workers:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    future.result()
+            result = BatchItemResult(index=index)
+            results.append(result)
+            # deadline and other context of caller are current in threads too
+            pending.add(
+                executor.submit(contextvars.copy_context().run, run, result, item)
+            )
+    for future in pending:
+        future.result()
+    return results
@@ -0,0 +1,226 @@
+import hashlib
+import re
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from os import PathLike
+from typing import Any, Dict, Hashable, NamedTuple, Optional, Tuple, Union
+
+from robokassa.storage import connect_sqlite
+
+_FRACTION_PATTERN = re.compile(r"(\.\d{6})\d+")
+
+
+def expiration_to_timestamp(
+    expiration_date: Union[str, datetime, None],
+) -> Optional[float]:
+    """
+    Convert ExpirationDate of invoice to unix timestamp.
+
+    Robokassa uses ISO 8601 dates and may send 7 digits of fraction,
+    so extra digits are dropped before parsing.
+    """
+    if expiration_date is None:
+        return None
+    if isinstance(expiration_date, datetime):
+        return expiration_date.timestamp()
+
+    value = _FRACTION_PATTERN.sub(r"\1", expiration_date.strip())
+    if value.endswith("Z"):
+        value = f"{value[:-1]}+00:00"
+    return datetime.fromisoformat(value).timestamp()
+
+
+class InvoiceLinkCache:
+    """
+    Persistent cache of links to payment page created by invoice ID.
+
+    Links are stored in SQLite database, so they survive restarts and
+    the same file can be shared by several processes (workers).
+    Key of link is built from signed params of invoice, and link
+    lives until ExpirationDate of invoice or `default_ttl` seconds.
+
+    Only invoices with InvId and lifetime are cached: InvId assigned by
+    Robokassa doesn't tell different orders with the same params apart,
+    and link without lifetime would be kept forever.
+    """
+
+    def __init__(
+        self, path: Union[str, PathLike], default_ttl: Optional[float] = None
+    ) -> None:
+        self._path = path
+        self._default_ttl = default_ttl
+
+        self._lock = threading.Lock()
+        self._connection = connect_sqlite(path)
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS invoice_links ("
+            "key TEXT PRIMARY KEY, "
+            "url TEXT NOT NULL, "
+            "expires_at REAL"
+            ")"
+        )
+
+    def accepts(
+        self,
+        inv_id: Optional[Union[str, int]],
+        expiration_date: Union[str, datetime, None] = None,
+    ) -> bool:
+        """
+        :return: True if link of invoice can be cached
+        """
+        if inv_id is None or str(inv_id) in ("", "0"):
+            return False
+        return expiration_date is not None or self._default_ttl is not None
+
+    @staticmethod
+    def make_key(params: Dict[str, Any]) -> str:
+        serialized = "&".join(f"{k}={v}" for k, v in sorted(params.items()))
+        return hashlib.sha256(serialized.encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT url, expires_at FROM invoice_links WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+
+        url, expires_at = row
+        if expires_at is not None and expires_at <= time.time():
+            return None
+        return url
+
+    def set(
+        self,
+        key: str,
+        url: str,
+        expiration_date: Union[str, datetime, None] = None,
+    ) -> None:
+        expires_at = expiration_to_timestamp(expiration_date)
+        if self._default_ttl is not None:
+            ttl_expires_at = time.time() + self._default_ttl
+            if expires_at is None or ttl_expires_at < expires_at:
+                expires_at = ttl_expires_at
+        if expires_at is None:
+            return
+
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO invoice_links (key, url, expires_at) "
+                "VALUES (?, ?, ?)",
+                (key, url, expires_at),
+            )
+
+    def purge_expired(self) -> int:
+        """
+        Remove expired links.
+
+        :return: Count of removed links
+        """
+        with self._lock:
+            cursor = self._connection.execute(
+                "DELETE FROM invoice_links WHERE expires_at <= ?", (time.time(),)
+            )
+        return cursor.rowcount
+
+    def clear(self) -> None:
+        with self._lock:
+            self._connection.execute("DELETE FROM invoice_links")
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(path={self._path!r})"
+
+
+class ScriptLinkCacheInfo(NamedTuple):
+    hits: int
+    misses: int
+    maxsize: int
+    currsize: int
+
+    @property
+    def hit_rate(self) -> float:
+        requests = self.hits + self.misses
+        return self.hits / requests if requests else 0.0
+
+
+class ScriptLinkCache:
+    """
+    Bounded in-memory LRU cache of links created by script,
+    e.g. links of fixed-price catalog with the same params.
+
+    Links are kept per MerchantLogin with fingerprint of credentials
+    which signed them. Links of merchant are dropped as soon as
+    they are requested with other credentials.
+
+    :param maxsize: Max count of cached links
+    """
+
+    def __init__(self, maxsize: int = 10_000) -> None:
+        if maxsize < 1:
+            raise ValueError("Max size of cache must be positive")
+        self.maxsize = maxsize
+
+        self._lock = threading.Lock()
+        self._links: "OrderedDict[Tuple[str, Hashable], str]" = OrderedDict()
+        self._fingerprints: Dict[str, str] = {}
+        self._hits = 0
+        self._misses = 0
+
+    @staticmethod
+    def fingerprint(*credentials: Any) -> str:
+        serialized = ":".join(str(item) for item in credentials)
+        return hashlib.sha256(serialized.encode()).hexdigest()
+
+    def _check_fingerprint(self, merchant_login: str, fingerprint: str) -> None:
+        if self._fingerprints.get(merchant_login, fingerprint) != fingerprint:
+            for key in [key for key in self._links if key[0] == merchant_login]:
+                del self._links[key]
+        self._fingerprints[merchant_login] = fingerprint
+
+    def get(
+        self, merchant_login: str, fingerprint: str, key: Hashable
+    ) -> Optional[str]:
+        with self._lock:
+            self._check_fingerprint(merchant_login, fingerprint)
+            url = self._links.get((merchant_login, key))
+            if url is None:
+                self._misses += 1
+                return None
+            self._links.move_to_end((merchant_login, key))
+            self._hits += 1
+            return url
+
+    def set(
+        self, merchant_login: str, fingerprint: str, key: Hashable, url: str
+    ) -> None:
+        with self._lock:
+            self._check_fingerprint(merchant_login, fingerprint)
+            self._links[(merchant_login, key)] = url
+            self._links.move_to_end((merchant_login, key))
+            if len(self._links) > self.maxsize:
+                self._links.popitem(last=False)
+
+    def cache_info(self) -> ScriptLinkCacheInfo:
+        with self._lock:
+            return ScriptLinkCacheInfo(
+                self._hits, self._misses, self.maxsize, len(self._links)
+            )
+
+    def clear(self) -> None:
+        with self._lock:
+            self._links.clear()
+            self._fingerprints.clear()
+            self._hits = 0
+            self._misses = 0
+
+    def __len__(self) -> int:
+        return len(self._links)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(maxsize={self.maxsize})"
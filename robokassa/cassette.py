@@ -0,0 +1,280 @@
+"""
+Record and replay of HTTP traffic with Robokassa.
+
+Record real traffic once:
+
+    cassette = Cassette("robokassa.jsonl.gz")
+    connection = HttpConnection(transport=RecordingTransport(cassette))
+    ...
+    cassette.save()
+
+and replay it on an offline box, at recorded latency or as fast as possible:
+
+    connection = HttpConnection(
+        transport=ReplayTransport(Cassette.load("robokassa.jsonl.gz"), realtime=True)
+    )
+
+Interactions are matched by method, URL and body of request and replayed
+in recorded order. Cassette is JSON Lines, gzipped if path ends with `.gz`.
+"""
+
+import asyncio
+import base64
+import gzip
+import threading
+import time
+from collections import deque
+from dataclasses import asdict, dataclass
+from os import PathLike
+from typing import IO, Deque, Dict, List, Optional, Tuple, Union
+
+import httpx
+
+from robokassa import codec
+from robokassa.exceptions import CassetteMissError
+
+# body of response is stored decoded
+_SKIPPED_HEADERS = ("content-encoding", "content-length", "transfer-encoding")
+
+
+@dataclass(frozen=True)
+class Interaction:
+    """
+    :param request_content: Base64 of request body
+    :param content: Base64 of response body
+    :param elapsed: Seconds from request to the whole response
+    """
+
+    method: str
+    url: str
+    request_content: str
+    status_code: int
+    headers: List[Tuple[str, str]]
+    content: str
+    elapsed: float
+
+    @property
+    def key(self) -> Tuple[str, str, str]:
+        return self.method, self.url, self.request_content
+
+    def to_response(self) -> httpx.Response:
+        return httpx.Response(
+            self.status_code,
+            headers=self.headers,
+            content=base64.b64decode(self.content),
+        )
+
+
+def _request_key(request: httpx.Request) -> Tuple[str, str, str]:
+    return (
+        request.method,
+        str(request.url),
+        base64.b64encode(request.content).decode(),
+    )
+
+
+def _stored_headers(headers: httpx.Headers) -> List[Tuple[str, str]]:
+    return [
+        (name, value)
+        for name, value in headers.items()
+        if name.lower() not in _SKIPPED_HEADERS
+    ]
+
+
+def _interaction(
+    request: httpx.Request, response: httpx.Response, elapsed: float
+) -> Interaction:
+    method, url, request_content = _request_key(request)
+    return Interaction(
+        method=method,
+        url=url,
+        request_content=request_content,
+        status_code=response.status_code,
+        headers=_stored_headers(response.headers),
+        content=base64.b64encode(response.content).decode(),
+        elapsed=round(elapsed, 6),
+    )
+
+
+class Cassette:
+    """
+    Recorded interactions with Robokassa.
+
+    :param path: Path to cassette file
+    :param cycle: Replay interactions of request again when they run out,
+        so load tests can send more requests than were recorded
+    """
+
+    def __init__(self, path: Union[str, PathLike], cycle: bool = False) -> None:
+        self.path = path
+        self.cycle = cycle
+
+        self._lock = threading.Lock()
+        self._interactions: List[Interaction] = []
+        self._queues: Dict[Tuple[str, str, str], Deque[Interaction]] = {}
+
+    @classmethod
+    def load(cls, path: Union[str, PathLike], cycle: bool = False) -> "Cassette":
+        cassette = cls(path, cycle)
+        with cassette._open("rt") as file:
+            for line in file:
+                if line.strip():
+                    cassette.add(Interaction(**codec.loads(line)))
+        return cassette
+
+    def _open(self, mode: str) -> IO[str]:
+        if str(self.path).endswith(".gz"):
+            return gzip.open(self.path, mode, encoding="utf-8")
+        return open(self.path, mode[0], encoding="utf-8")
+
+    def add(self, interaction: Interaction) -> None:
+        with self._lock:
+            self._interactions.append(interaction)
+            self._queues.setdefault(interaction.key, deque()).append(interaction)
+
+    def save(self) -> None:
+        with self._lock:
+            interactions = list(self._interactions)
+        with self._open("wt") as file:
+            for interaction in interactions:
+                file.write(f"{codec.dumps(asdict(interaction))}\n")
+
+    def play(self, request: httpx.Request) -> Interaction:
+        """
+        :raise CassetteMissError: If request wasn't recorded or its
+            interactions ran out
+        """
+        key = _request_key(request)
+        with self._lock:
+            queue = self._queues.get(key)
+            if not queue:
+                raise CassetteMissError(
+                    f"No recorded response of {request.method} {request.url}"
+                )
+            interaction = queue.popleft()
+            if self.cycle:
+                queue.append(interaction)
+        return interaction
+
+    @property
+    def interactions(self) -> List[Interaction]:
+        with self._lock:
+            return list(self._interactions)
+
+    def __len__(self) -> int:
+        return len(self._interactions)
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__name__}(path={self.path!r}, interactions={len(self)})"
+        )
+
+
+class RecordingTransport(httpx.BaseTransport):
+    """
+    Transport which records interactions of wrapped transport to cassette.
+    """
+
+    def __init__(
+        self, cassette: Cassette, transport: Optional[httpx.BaseTransport] = None
+    ) -> None:
+        self.cassette = cassette
+        self._transport = transport or httpx.HTTPTransport()
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        request.read()
+        started = time.perf_counter()
+        response = self._transport.handle_request(request)
+        try:
+            content = response.read()
+        finally:
+            response.close()
+        elapsed = time.perf_counter() - started
+
+        response = httpx.Response(
+            response.status_code,
+            headers=_stored_headers(response.headers),
+            content=content,
+            extensions=response.extensions,
+        )
+        self.cassette.add(_interaction(request, response, elapsed))
+        return response
+
+    def close(self) -> None:
+        self._transport.close()
+
+
+class ReplayTransport(httpx.BaseTransport):
+    """
+    Transport which responds with interactions of cassette without network.
+
+    :param realtime: Wait recorded latency of every response,
+        else respond as fast as possible
+    """
+
+    def __init__(self, cassette: Cassette, realtime: bool = False) -> None:
+        self.cassette = cassette
+        self.realtime = realtime
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        request.read()
+        interaction = self.cassette.play(request)
+        if self.realtime:
+            time.sleep(interaction.elapsed)
+        return interaction.to_response()
+
+
+class AsyncRecordingTransport(httpx.AsyncBaseTransport):
+    """
+    Transport which records interactions of wrapped async transport to cassette.
+    """
+
+    def __init__(
+        self,
+        cassette: Cassette,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ) -> None:
+        self.cassette = cassette
+        self._transport = transport or httpx.AsyncHTTPTransport()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        await request.aread()
+        started = time.perf_counter()
+        response = await self._transport.handle_async_request(request)
+        try:
+            content = await response.aread()
+        finally:
+            await response.aclose()
+        elapsed = time.perf_counter() - started
+
+        response = httpx.Response(
+            response.status_code,
+            headers=_stored_headers(response.headers),
+            content=content,
+            extensions=response.extensions,
+        )
+        self.cassette.add(_interaction(request, response, elapsed))
+        return response
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+
+class AsyncReplayTransport(httpx.AsyncBaseTransport):
+    """
+    Async transport which responds with interactions of cassette without network.
+
+    :param realtime: Wait recorded latency of every response,
+        else respond as fast as possible
+    """
+
+    def __init__(self, cassette: Cassette, realtime: bool = False) -> None:
+        self.cassette = cassette
+        self.realtime = realtime
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        await request.aread()
+        interaction = self.cassette.play(request)
+        if self.realtime:
+            await asyncio.sleep(interaction.elapsed)
+        return interaction.to_response()
@@ -0,0 +1,359 @@
+"""
+Command line interface of robokassa.
+
+Generate signed payment links for big exports in many processes:
+
+    python -m robokassa links campaign.csv links.csv \\
+        --merchant-login demo --algorithm sha512 --workers 8
+
+Check signatures of logged ResultURL notifications:
+
+    python -m robokassa audit result-2024-*.log --password2 ... > mismatches.jsonl
+
+Password#1 is read from `ROBOKASSA_PASSWORD1` environment variable
+if `--password1` is omitted, Password#2 from `ROBOKASSA_PASSWORD2`.
+
+Input of links is CSV with header, quoted fields may contain line breaks,
+or JSONL, one record per line. Columns `out_sum`, `inv_id`, `description`,
+`receipt`, `merchant_login` and `*_url`/`*_url_method` are link params,
+other columns are additional `shp_` params. Rows with invalid params are
+reported to stderr and leave empty lines in output.
+"""
+
+import argparse
+import contextlib
+import csv
+import dataclasses
+import os
+import sys
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from itertools import islice
+from typing import Any, Dict, Iterator, List, Optional, Sequence, TextIO, Tuple
+
+from robokassa import codec
+from robokassa.audit import DEFAULT_CHUNK_SIZE, audit_logs
+from robokassa.batch import ITEM_ERRORS
+from robokassa.hash import HashAlgorithm, PrefixedHash
+from robokassa.payment import PaymentUrlGenerator
+from robokassa.registry import MerchantCredentials
+
+LINK_PARAMS = (
+    "out_sum",
+    "inv_id",
+    "description",
+    "receipt",
+    "result_url",
+    "success_url",
+    "success_url_method",
+    "fail_url",
+    "fail_url_method",
+)
+
+# generators of worker process, built once by initializer
+_generators: Dict[str, PaymentUrlGenerator] = {}
+_default_prefix = "shp"
+
+
+def _init_worker(credentials: Sequence[MerchantCredentials], prefix: str) -> None:
+    global _default_prefix
+
+    _default_prefix = prefix
+    for item in credentials:
+        # every signature starts with `MerchantLogin:`, its state is hashed once
+        hash_ = PrefixedHash(item.algorithm, f"{item.merchant_login}:")
+        _generators[item.merchant_login] = PaymentUrlGenerator(
+            item.merchant_login, item.password1, item.is_test, hash_
+        )
+
+
+def _parse_lines(lines: List[str], fieldnames: Optional[List[str]]) -> Iterator[dict]:
+    if fieldnames is None:
+        return (codec.loads(line) for line in lines)
+    return csv.DictReader(lines, fieldnames)
+
+
+def _generate_link(record: Dict[str, Any], default_merchant: Optional[str]) -> str:
+    record = {key: value for key, value in record.items() if value not in ("", None)}
+    merchant_login = record.pop("merchant_login", default_merchant)
+    try:
+        generator = _generators[merchant_login]
+    except KeyError:
+        raise ValueError(f"No credentials of merchant {merchant_login!r}") from None
+
+    params = {key: record.pop(key) for key in LINK_PARAMS if key in record}
+    return generator.generate_by_script(
+        default_prefix=_default_prefix, **params, **record
+    )
+
+
+def _generate_chunk(
+    lines: List[str],
+    fieldnames: Optional[List[str]],
+    default_merchant: Optional[str],
+    shard_path: Optional[str],
+) -> Tuple[List[str], int, float, List[Tuple[int, str]]]:
+    """
+    :return: Links if shard isn't written, count of links, CPU time
+        and errors of rejected rows by their index in chunk
+    """
+    started = time.process_time()
+    links = []
+    rejected = []
+    for index, record in enumerate(_parse_lines(lines, fieldnames)):
+        try:
+            links.append(_generate_link(record, default_merchant))
+        except ITEM_ERRORS as exc:
+            links.append("")
+            rejected.append((index, str(exc)))
+    count = len(links) - len(rejected)
+    if shard_path is not None:
+        with open(shard_path, "w", encoding="utf-8") as file:
+            file.writelines(f"{link}\n" for link in links)
+        links = []
+    return links, count, time.process_time() - started, rejected
+
+
+def _read_records(file: TextIO, quoted: bool) -> Iterator[str]:
+    """
+    Raw records of input, lines of CSV record with quoted line breaks are joined,
+    so chunks don't split records. Quotes in field are doubled,
+    so record is complete when count of quotes is even.
+    """
+    record = ""
+    quotes = 0
+    for line in file:
+        if not record and not line.strip():
+            continue
+        record += line
+        if quoted:
+            quotes += line.count('"')
+            if quotes % 2:
+                continue
+        yield record
+        record = ""
+        quotes = 0
+    if record:
+        yield record
+
+
+def _read_chunks(
+    file: TextIO, chunk_size: int, quoted: bool = True
+) -> Iterator[List[str]]:
+    records = _read_records(file, quoted)
+    while True:
+        chunk = list(islice(records, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _load_credentials(args: argparse.Namespace) -> List[MerchantCredentials]:
+    if args.credentials is not None:
+        with open(args.credentials, encoding="utf-8") as file:
+            return [
+                MerchantCredentials.from_dict(item) for item in codec.loads(file.read())
+            ]
+
+    password1 = args.password1 or os.environ.get("ROBOKASSA_PASSWORD1")
+    if args.merchant_login is None or password1 is None:
+        raise SystemExit(
+            "Use --credentials or --merchant-login with --password1 "
+            "(or ROBOKASSA_PASSWORD1)"
+        )
+    return [
+        MerchantCredentials(
+            merchant_login=args.merchant_login,
+            password1=password1,
+            password2="",
+            algorithm=HashAlgorithm(args.algorithm),
+            is_test=args.is_test,
+        )
+    ]
+
+
+def generate_links(args: argparse.Namespace, report: Optional[TextIO] = None) -> int:
+    """
+    :return: Count of generated links
+    """
+    credentials = _load_credentials(args)
+    default_merchant = args.merchant_login or credentials[0].merchant_login
+    workers = args.workers or os.cpu_count() or 1
+
+    with contextlib.ExitStack() as stack:
+        source = stack.enter_context(open(args.input, encoding="utf-8", newline=""))
+        fieldnames = None
+        if not args.input.endswith(".jsonl"):
+            fieldnames = next(csv.reader([source.readline()]))
+
+        output = None
+        if args.sharded:
+            os.makedirs(args.output, exist_ok=True)
+        else:
+            output = stack.enter_context(open(args.output, "w", encoding="utf-8"))
+
+        started = time.perf_counter()
+        count = 0
+        rejected = 0
+        cpu_time = 0.0
+        pending: List[Tuple[int, Future]] = []
+
+        def collect(number: int, future: Future) -> None:
+            nonlocal count, rejected, cpu_time
+            links, chunk_count, chunk_cpu_time, errors = future.result()
+            if output is not None:
+                output.writelines(f"{link}\n" for link in links)
+            for index, error in errors:
+                row = number * args.chunk_size + index + 1
+                (report or sys.stderr).write(f"row {row} is rejected: {error}\n")
+            count += chunk_count
+            rejected += len(errors)
+            cpu_time += chunk_cpu_time
+
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(credentials, args.prefix),
+        ) as executor:
+            chunks = _read_chunks(source, args.chunk_size, fieldnames is not None)
+            for number, chunk in enumerate(chunks):
+                shard_path = None
+                if args.sharded:
+                    shard_path = os.path.join(args.output, f"links-{number:06d}.txt")
+                # chunks are read ahead only while all workers are busy
+                if len(pending) >= workers * 2:
+                    collect(*pending.pop(0))
+                pending.append(
+                    (
+                        number,
+                        executor.submit(
+                            _generate_chunk,
+                            chunk,
+                            fieldnames,
+                            default_merchant,
+                            shard_path,
+                        ),
+                    )
+                )
+            while pending:
+                collect(*pending.pop(0))
+
+    elapsed = time.perf_counter() - started
+    (report or sys.stderr).write(
+        f"{count} links in {elapsed:.2f}s: {count / elapsed:.0f} rows/s, "
+        f"{count / max(cpu_time, 1e-9):.0f} rows/s per core, {workers} workers, "
+        f"{rejected} rejected\n"
+    )
+    return count
+
+
+def audit_notifications(
+    args: argparse.Namespace, report: Optional[TextIO] = None
+) -> int:
+    """
+    :return: Count of mismatches
+    """
+    password1 = args.password1 or os.environ.get("ROBOKASSA_PASSWORD1", "")
+    password2 = args.password2 or os.environ.get("ROBOKASSA_PASSWORD2", "")
+    if not (password1 if args.success_url else password2):
+        raise SystemExit(
+            "Use --password1 (or ROBOKASSA_PASSWORD1) for SuccessURL logs "
+            "and --password2 (or ROBOKASSA_PASSWORD2) for ResultURL logs"
+        )
+    credentials = MerchantCredentials(
+        merchant_login="",
+        password1=password1,
+        password2=password2,
+        algorithm=HashAlgorithm(args.algorithm),
+    )
+
+    started = time.perf_counter()
+    result = audit_logs(
+        args.logs,
+        credentials,
+        result_url=not args.success_url,
+        processes=args.workers,
+        chunk_size=args.chunk_size,
+    )
+    elapsed = time.perf_counter() - started
+
+    with contextlib.ExitStack() as stack:
+        output = sys.stdout
+        if args.output is not None:
+            output = stack.enter_context(open(args.output, "w"))
+        output.writelines(
+            f"{codec.dumps(dataclasses.asdict(mismatch))}\n"
+            for mismatch in result.mismatches
+        )
+    (report or sys.stderr).write(
+        f"{result.checked} checked in {elapsed:.2f}s: {result.valid} valid, "
+        f"{len(result.mismatches)} mismatches, {result.malformed} malformed\n"
+    )
+    return len(result.mismatches)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="robokassa", description=__doc__.strip().split("\n\n")[0]
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    links = commands.add_parser(
+        "links", help="Generate signed links to payment page for CSV or JSONL"
+    )
+    links.add_argument("input", help="CSV with header or JSONL (*.jsonl) of records")
+    links.add_argument(
+        "output", help="File of links in input order or directory of shards"
+    )
+    links.add_argument("--merchant-login")
+    links.add_argument("--password1")
+    links.add_argument(
+        "--algorithm",
+        default=HashAlgorithm.md5.value,
+        choices=[algorithm.value for algorithm in HashAlgorithm],
+    )
+    links.add_argument("--is-test", action="store_true")
+    links.add_argument(
+        "--credentials", help="JSON file of credentials of merchant registry"
+    )
+    links.add_argument("--prefix", default="shp", help="Prefix of additional params")
+    links.add_argument("--workers", type=int, default=None)
+    links.add_argument("--chunk-size", type=int, default=10_000)
+    links.add_argument(
+        "--sharded",
+        action="store_true",
+        help="Write a shard file per chunk to output directory",
+    )
+    links.set_defaults(handler=generate_links)
+
+    audit = commands.add_parser(
+        "audit", help="Check signatures of logged notifications of Robokassa"
+    )
+    audit.add_argument("logs", nargs="+", help="Logs of form-encoded bodies")
+    audit.add_argument("--password1")
+    audit.add_argument("--password2")
+    audit.add_argument(
+        "--algorithm",
+        default=HashAlgorithm.md5.value,
+        choices=[algorithm.value for algorithm in HashAlgorithm],
+    )
+    audit.add_argument(
+        "--success-url",
+        action="store_true",
+        help="Logs of SuccessURL or FailURL signed by Password#1",
+    )
+    audit.add_argument("--workers", type=int, default=None)
+    audit.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    audit.add_argument(
+        "--output", help="JSONL file of mismatches, standard output by default"
+    )
+    audit.set_defaults(handler=audit_notifications)
+    return parser
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    if args.handler(args) and args.command == "audit":
+        # mismatches fail audit
+        return 1
+    return 0
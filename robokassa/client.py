@@ -1,13 +1,37 @@
-from typing import Optional, Union
+from concurrent.futures import Future
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+import httpx
 
+from robokassa.cache import InvoiceLinkCache, ScriptLinkCache
 from robokassa.connection import Requests
-from robokassa.exceptions import (
-    UnusedStrictUrlParameterError,
-    IncorrectUrlMethodError,
-)
+from robokassa.currencies import CurrencyIndex
+from robokassa.deadline import Deadline, TimeoutTypes
+from robokassa.dns import DNSCache
 from robokassa.hash import HashAlgorithm, Hash
+from robokassa.batch import run_batch
+from robokassa.hedging import HedgingPolicy
+from robokassa.invoice import InvoiceApi
+from robokassa.jwt import JWTSigner
 from robokassa.merchant import Merchant
+from robokassa.outbox import InvoiceOutbox, OUTAGE_ERRORS
 from robokassa.payment import Payment
+from robokassa.receipt import Receipt, encode_receipt
+from robokassa.refund import Refund
+from robokassa.settlement import HoldSettlement
+from robokassa.signature import CredentialGeneration, RotatingSignaturesChecker
+from robokassa.types import BatchItemResult, Signature
 
 
 class RobokassaAbstract:
@@ -39,6 +63,25 @@ class BaseRobokassa(RobokassaAbstract):
     def _init_hash(self, algorithm: HashAlgorithm) -> Hash:
         return Hash(algorithm)
 
+    def _init_rotating_checker(
+        self, previous_credentials: Sequence[CredentialGeneration]
+    ) -> RotatingSignaturesChecker:
+        current = CredentialGeneration(
+            password1=self._password1,
+            password2=self._password2,
+            algorithm=self._algorithm,
+            name="current",
+        )
+        return RotatingSignaturesChecker([current, *previous_credentials])
+
+    def _init_jwt_signer(self, password3: Optional[str]) -> Optional[JWTSigner]:
+        if password3 is None:
+            return None
+        return JWTSigner(password3, self._algorithm)
+
+    def _init_invoice_signer(self) -> JWTSigner:
+        return JWTSigner(f"{self._merchant_login}:{self._password1}", self._algorithm)
+
     @property
     def merchant_login(self) -> str:
         return self._merchant_login
@@ -64,6 +107,15 @@ class Robokassa(BaseRobokassa):
         algorithm: HashAlgorithm = HashAlgorithm.md5,
         is_test: bool = False,
         use_standard_naming_of_additional_link_params: bool = True,
+        invoice_link_cache: Optional[InvoiceLinkCache] = None,
+        previous_credentials: Sequence[CredentialGeneration] = (),
+        dns_cache: Optional[DNSCache] = None,
+        timeout: Optional[TimeoutTypes] = None,
+        hedging: Optional[HedgingPolicy] = None,
+        outbox: Optional[InvoiceOutbox] = None,
+        password3: Optional[str] = None,
+        transport: Optional[httpx.BaseTransport] = None,
+        script_link_cache: Optional[ScriptLinkCache] = None,
     ) -> None:
         super().__init__(
             merchant_login=merchant_login,
@@ -73,6 +125,11 @@ class Robokassa(BaseRobokassa):
             is_test=is_test,
             use_standard_naming_of_additional_link_params=use_standard_naming_of_additional_link_params,
         )
+        self._invoice_link_cache = invoice_link_cache
+        self._script_link_cache = script_link_cache
+        self._dns_cache = dns_cache
+        self._timeout = timeout
+        self._transport = transport
 
         self.__http = self._init_http_connection()
 
@@ -83,23 +140,43 @@ class Robokassa(BaseRobokassa):
             password1=self._password1,
             password2=self._password2,
             hash_=self._hash,
+            invoice_link_cache=self._invoice_link_cache,
+            script_link_cache=self._script_link_cache,
         )
         self._merchant = self._init_merchant(
             self.__http,
             self._merchant_login,
+            hedging,
         )
 
         self._link = self._payment.link
         self._checker = self._payment.check
+        self._jwt_signer = self._init_jwt_signer(password3)
+        self._refund = None
+        if self._jwt_signer is not None:
+            self._refund = Refund(self.__http, self._jwt_signer)
+        self._invoice_api = InvoiceApi(
+            self.__http, self._merchant_login, self._init_invoice_signer()
+        )
+        if previous_credentials:
+            # signatures created with old passwords are accepted too
+            self._checker = self._init_rotating_checker(previous_credentials)
+
+        self._outbox = outbox
+        if outbox is not None:
+            # journal could keep invoices which weren't sent before restart
+            outbox.start(self._link.create_link_to_payment_page_by_invoice_id)
 
     def _init_merchant(
         self,
         http: Requests,
         merchant_login: str,
+        hedging: Optional[HedgingPolicy] = None,
     ) -> Merchant:
         return Merchant(
             http=http,
             merchant_login=merchant_login,
+            hedging=hedging,
         )
 
     def _init_payment(
@@ -110,6 +187,8 @@ class Robokassa(BaseRobokassa):
         password1: str,
         password2: str,
         hash_: Hash,
+        invoice_link_cache: Optional[InvoiceLinkCache] = None,
+        script_link_cache: Optional[ScriptLinkCache] = None,
     ) -> Payment:
         return Payment(
             http=http,
@@ -118,10 +197,33 @@ class Robokassa(BaseRobokassa):
             password1=password1,
             password2=password2,
             hash_=hash_,
+            invoice_link_cache=invoice_link_cache,
+            script_link_cache=script_link_cache,
         )
 
     def _init_http_connection(self) -> Requests:
-        return Requests()
+        return Requests(
+            dns_cache=self._dns_cache, timeout=self._timeout, transport=self._transport
+        )
+
+    def warmup(self, connections: int = 1) -> int:
+        """
+        Open connections to Robokassa before the first request,
+        so the first payments don't wait for DNS, TCP and TLS.
+
+        :param connections: Count of pooled connections to open
+        :raise ValueError: If count of connections is negative
+        :return: Count of successfully opened connections
+        """
+        return self.__http.connection.warmup(connections)
+
+    def close(self) -> None:
+        """
+        Close pooled connections and outbox of client.
+        """
+        if self._outbox is not None:
+            self._outbox.stop()
+        self.__http.connection.close()
 
     def create_link_to_payment_page_by_script(
         self,
@@ -134,6 +236,8 @@ class Robokassa(BaseRobokassa):
         fail_url_method: Optional[str] = None,
         inv_id: Optional[int] = 0,
         description: Optional[str] = None,
+        receipt: Optional[Union[Receipt, str]] = None,
+        step_by_step: bool = False,
         **kwargs,
     ) -> str:
         """
@@ -145,6 +249,8 @@ class Robokassa(BaseRobokassa):
 
         All link params user can see, but cannot edit them.
         If you want to hide these params you need to use by invoice ID method.
+        If client has `script_link_cache`, link with the same params
+        is taken from it without hashing.
 
 
         :param out_sum:
@@ -156,20 +262,11 @@ class Robokassa(BaseRobokassa):
         :param fail_url_method: FailUrlMethod2
         :param inv_id:
         :param description: Shop description
+        :param receipt: Fiscal receipt or its percent-encoded JSON
+        :param step_by_step: Hold money until payment is confirmed or cancelled
         :param kwargs: Any additional params without `shp_` prefix
         :return: Link to payment page
         """
-        available_http_methods = ("GET", "POST", None)
-
-        if (success_url is not None) != (success_url_method is not None):
-            raise UnusedStrictUrlParameterError(
-                "If you use URL, you also need to choose a HTTP method"
-            )
-        if (
-            success_url_method not in available_http_methods
-            or fail_url_method not in available_http_methods
-        ):
-            raise IncorrectUrlMethodError("You can use only GET or POST methods")
 
         payment_link = self._link.generate_by_script(
             default_prefix=default_prefix,
@@ -181,6 +278,8 @@ class Robokassa(BaseRobokassa):
             fail_url_method=fail_url_method,
             inv_id=inv_id,
             description=description,
+            receipt=receipt,
+            step_by_step=step_by_step,
             **kwargs,
         )
         return payment_link
@@ -190,6 +289,11 @@ class Robokassa(BaseRobokassa):
         inv_id: Optional[Union[str, int]],
         out_sum: Union[str, int, float],
         description: str,
+        expiration_date: Optional[str] = None,
+        receipt: Optional[Union[Receipt, str]] = None,
+        step_by_step: bool = False,
+        timeout: Optional[TimeoutTypes] = None,
+        deadline: Optional[Deadline] = None,
     ) -> str:
         """
         Create a link to payment page by invoice ID.
@@ -199,17 +303,309 @@ class Robokassa(BaseRobokassa):
 
         `https://auth.robokassa.ru/Merchant/Index/41734593-dc97-dc5f-d329-a73158e4cb29`
 
+        If client has `invoice_link_cache` and invoice has InvId,
+        link is taken from it until ExpirationDate of invoice.
+
 
         :param inv_id:
         :param out_sum:
         :param description: Shop description
+        :param expiration_date: ExpirationDate of invoice in ISO 8601
+        :param receipt: Fiscal receipt or its percent-encoded JSON
+        :param step_by_step: Hold money until payment is confirmed or cancelled
+        :param timeout: Timeout of request, seconds or `httpx.Timeout`
+        :param deadline: Deadline of operation, current one is used by default
         :return: Url to payment page
         """
         return self._link.create_link_to_payment_page_by_invoice_id(
             inv_id=inv_id,
             out_sum=out_sum,
             description=description,
+            expiration_date=expiration_date,
+            receipt=receipt,
+            step_by_step=step_by_step,
+            timeout=timeout,
+            deadline=deadline,
+        )
+
+    def charge_recurring(
+        self,
+        previous_inv_id: Union[str, int],
+        inv_id: Union[str, int],
+        out_sum: Union[str, int, float],
+        description: Optional[str] = None,
+        receipt: Optional[Union[Receipt, str]] = None,
+        timeout: Optional[TimeoutTypes] = None,
+        deadline: Optional[Deadline] = None,
+    ) -> str:
+        """
+        Charge subscriber by recurring payment of previous invoice.
+        Robokassa accepts the charge and reports its result to ResultURL.
+
+        :param previous_inv_id: InvId of the first payment of subscription
+        :param inv_id: InvId of new payment
+        :param out_sum:
+        :param description: Shop description
+        :param receipt: Fiscal receipt or its percent-encoded JSON
+        :param timeout: Timeout of request, seconds or `httpx.Timeout`
+        :param deadline: Deadline of operation, current one is used by default
+        :raise RobokassaInterfaceError: If Robokassa rejected the charge
+        :return: InvoiceID of accepted charge
+        """
+        return self._link.charge_recurring(
+            previous_inv_id=previous_inv_id,
+            inv_id=inv_id,
+            out_sum=out_sum,
+            description=description,
+            receipt=receipt,
+            timeout=timeout,
+            deadline=deadline,
+        ).invoice_id
+
+    def confirm_hold(
+        self,
+        inv_id: Union[str, int],
+        out_sum: Union[str, int, float],
+        receipt: Optional[Union[Receipt, str]] = None,
+        timeout: Optional[TimeoutTypes] = None,
+        deadline: Optional[Deadline] = None,
+    ) -> dict:
+        """
+        Confirm payment held by StepByStep link, money is charged.
+
+        :param inv_id: InvId of held payment
+        :param out_sum: Sum to charge, not greater than held one
+        :param receipt: Final fiscal receipt or its percent-encoded JSON
+        :param timeout: Timeout of request, seconds or `httpx.Timeout`
+        :param deadline: Deadline of operation, current one is used by default
+        :raise RobokassaInterfaceError: If Robokassa rejected confirmation
+        :return: Response of Robokassa
+        """
+        return self._link.confirm_hold(
+            inv_id, out_sum, receipt, timeout=timeout, deadline=deadline
+        ).as_dict()
+
+    def cancel_hold(
+        self,
+        inv_id: Union[str, int],
+        timeout: Optional[TimeoutTypes] = None,
+        deadline: Optional[Deadline] = None,
+    ) -> dict:
+        """
+        Cancel payment held by StepByStep link, money is released.
+
+        :param inv_id: InvId of held payment
+        :param timeout: Timeout of request, seconds or `httpx.Timeout`
+        :param deadline: Deadline of operation, current one is used by default
+        :raise RobokassaInterfaceError: If Robokassa rejected cancellation
+        :return: Response of Robokassa
+        """
+        return self._link.cancel_hold(
+            inv_id, timeout=timeout, deadline=deadline
+        ).as_dict()
+
+    def settle_holds(
+        self,
+        settlements: Iterable[Union[HoldSettlement, Tuple[Any, ...]]],
+        max_workers: int = 8,
+        rate: Optional[float] = None,
+    ) -> List[BatchItemResult]:
+        """
+        Confirm and cancel many held payments concurrently.
+
+        :param settlements: Settlements or `(inv_id, action, out_sum)` tuples
+        :param max_workers: Count of concurrent requests
+        :param rate: Max requests per second
+        :return: Result for every settlement in order of settlements
+        """
+        return self._link.settle_holds(settlements, max_workers, rate)
+
+    def _get_refund(self) -> Refund:
+        if self._refund is None:
+            raise ValueError("Refunds require password3 of client")
+        return self._refund
+
+    def create_refund(
+        self,
+        op_key: str,
+        refund_sum: Optional[Union[float, int]] = None,
+        invoice_items: Optional[List[Dict[str, Any]]] = None,
+        timeout: Optional[TimeoutTypes] = None,
+        deadline: Optional[Deadline] = None,
+    ) -> str:
+        """
+        Create refund of operation, JWT of request is signed by Password#3.
+
+        :param op_key: OpKey of operation, it's returned by `get_operation_state`
+        :param refund_sum: Sum to refund, the whole sum of operation by default
+        :param invoice_items: Refunded items of receipt
+        :param timeout: Timeout of request, seconds or `httpx.Timeout`
+        :param deadline: Deadline of operation, current one is used by default
+        :raise RobokassaInterfaceError: If Robokassa didn't accept refund
+        :return: ID of refund request
+        """
+        result = self._get_refund().create(
+            op_key, refund_sum, invoice_items, timeout=timeout, deadline=deadline
+        )
+        return result.request_id
+
+    def get_refund_state(
+        self,
+        request_id: str,
+        timeout: Optional[TimeoutTypes] = None,
+        deadline: Optional[Deadline] = None,
+    ) -> dict:
+        """
+        Get state of refund.
+
+        :param request_id: ID of refund request
+        :param timeout: Timeout of request, seconds or `httpx.Timeout`
+        :param deadline: Deadline of operation, current one is used by default
+        :return: dictionary of refund state
+        """
+        result = self._get_refund().get_state(
+            request_id, timeout=timeout, deadline=deadline
+        )
+        return result.as_dict()
+
+    def create_refunds(
+        self,
+        refunds: Iterable[Mapping[str, Any]],
+        max_workers: int = 8,
+        rate: Optional[float] = None,
+    ) -> List[BatchItemResult]:
+        """
+        Create many refunds concurrently.
+
+        :param refunds: Params of `create_refund`
+        :param max_workers: Count of concurrent requests
+        :param rate: Max requests per second
+        :return: ID of refund request or error for every refund in order of refunds
+        """
+        self._get_refund()
+        return run_batch(
+            refunds, lambda refund: self.create_refund(**refund), max_workers, rate
+        )
+
+    def create_invoice(
+        self,
+        out_sum: Union[str, int, float],
+        inv_id: Optional[Union[str, int]] = None,
+        description: Optional[str] = None,
+        invoice_type: str = "OneTime",
+        timeout: Optional[TimeoutTypes] = None,
+        deadline: Optional[Deadline] = None,
+        **params: Any,
+    ) -> dict:
+        """
+        Create invoice by Invoice API, JWT of request is signed by
+        MerchantLogin:Password#1.
+
+        :param out_sum:
+        :param inv_id: Store account number
+        :param description: Shop description
+        :param invoice_type: `OneTime` or `Reusable`
+        :param timeout: Timeout of request, seconds or `httpx.Timeout`
+        :param deadline: Deadline of operation, current one is used by default
+        :param params: Other params of invoice, e.g. `invoice_items`, `user_fields`
+        :raise RobokassaInterfaceError: If Robokassa didn't create invoice
+        :return: Response of Robokassa with `url` and `id` of invoice
+        """
+        result = self._invoice_api.create(
+            out_sum,
+            timeout=timeout,
+            deadline=deadline,
+            inv_id=inv_id,
+            description=description,
+            invoice_type=invoice_type,
+            **params,
         )
+        return result.as_dict()
+
+    def deactivate_invoice(
+        self,
+        inv_id: Optional[Union[str, int]] = None,
+        id_: Optional[str] = None,
+        encoded_id: Optional[str] = None,
+        timeout: Optional[TimeoutTypes] = None,
+        deadline: Optional[Deadline] = None,
+    ) -> None:
+        """
+        Deactivate invoice created by Invoice API, it can't be paid anymore.
+
+        :param inv_id: Store account number
+        :param id_: ID of invoice returned by `create_invoice`
+        :param encoded_id: ID of invoice from its link
+        :param timeout: Timeout of request, seconds or `httpx.Timeout`
+        :param deadline: Deadline of operation, current one is used by default
+        :raise RobokassaInterfaceError: If Robokassa didn't deactivate invoice
+        """
+        self._invoice_api.deactivate(
+            inv_id, id_, encoded_id, timeout=timeout, deadline=deadline
+        )
+
+    def iter_invoices(
+        self,
+        page_size: int = 100,
+        timeout: Optional[TimeoutTypes] = None,
+        **filters: Any,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Lazily iterate over invoices of Invoice API.
+        Next page is fetched while current one is consumed,
+        memory doesn't depend on count of invoices.
+
+        :param page_size: Count of invoices in one request
+        :param timeout: Timeout of every request, seconds or `httpx.Timeout`
+        :param filters: `statuses`, `invoice_types`, `keywords`, `date_from`,
+            `date_to`, `is_ascending`
+        :raise RobokassaInterfaceError: If Robokassa rejected listing
+        :return: Iterator of invoices
+        """
+        return self._invoice_api.iter_invoices(page_size, timeout, **filters)
+
+    def defer_link_to_payment_page_by_invoice_id(
+        self,
+        inv_id: Optional[Union[str, int]],
+        out_sum: Union[str, int, float],
+        description: str,
+        expiration_date: Optional[str] = None,
+        receipt: Optional[Union[Receipt, str]] = None,
+        step_by_step: bool = False,
+    ) -> Future:
+        """
+        Create a link to payment page by invoice ID or, while Robokassa
+        is unavailable, put the invoice to outbox of client.
+        Outbox sends the invoice when Robokassa recovers.
+
+        :param inv_id:
+        :param out_sum:
+        :param description: Shop description
+        :param expiration_date: ExpirationDate of invoice in ISO 8601
+        :param receipt: Fiscal receipt or its percent-encoded JSON
+        :param step_by_step: Hold money until payment is confirmed or cancelled
+        :return: Future with url to payment page
+        """
+        if self._outbox is None:
+            raise ValueError("Client was created without outbox")
+
+        params = {
+            "inv_id": inv_id,
+            "out_sum": out_sum,
+            "description": description,
+            "expiration_date": expiration_date,
+            # outbox journal keeps JSON, so receipt is stored encoded
+            "receipt": encode_receipt(receipt),
+            "step_by_step": step_by_step,
+        }
+        try:
+            url = self.create_link_to_payment_page_by_invoice_id(**params)
+        except OUTAGE_ERRORS:
+            return self._outbox.future(self._outbox.enqueue(params))
+
+        future = Future()
+        future.set_result(url)
+        return future
 
     def success_or_fail_signature_is_valid(
         self,
@@ -228,7 +624,7 @@ class Robokassa(BaseRobokassa):
         :return: True if signature is valid, else False
         """
         return self._checker.success_or_fail_url_signature_is_valid(
-            signature=signature, out_sum=out_sum, inv_id=inv_id, **kwargs
+            success_signature=signature, out_sum=out_sum, inv_id=inv_id, **kwargs
         )
 
     def result_signature_is_valid(
@@ -248,25 +644,71 @@ class Robokassa(BaseRobokassa):
         :return: True if signature is valid, else False
         """
         return self._checker.result_url_signature_is_valid(
-            signature=signature, out_sum=out_sum, inv_id=inv_id, **kwargs
+            result_signature=signature, out_sum=out_sum, inv_id=inv_id, **kwargs
         )
 
-    def get_currencies(self, language: str = "en") -> dict:
+    def get_currencies(
+        self,
+        language: str = "en",
+        timeout: Optional[TimeoutTypes] = None,
+        deadline: Optional[Deadline] = None,
+    ) -> dict:
         """
         Get available currencies of merchant.
 
         :param language: `ru` or `en`
+        :param timeout: Timeout of request, seconds or `httpx.Timeout`
+        :param deadline: Deadline of operation, current one is used by default
         :return: dictionary of currencies
         """
-        return self._merchant.get_currencies(language=language)
-
-    # def get_operation_state(self, invoice_id: Union[str, int]) -> dict:
-    #     signature = Signature(
-    #         merchant_login=self._merchant_login,
-    #         inv_id=invoice_id,
-    #         password=self._password2,
-    #         hash_=self._hash,
-    #     )
-    #     return self._merchant.get_operation_state(
-    #         invoice_id=invoice_id, signature_value=signature.value
-    #     )
+        return self._merchant.get_currencies(
+            language=language, timeout=timeout, deadline=deadline
+        ).as_dict()
+
+    def get_currency_index(
+        self,
+        language: str = "en",
+        timeout: Optional[TimeoutTypes] = None,
+        deadline: Optional[Deadline] = None,
+    ) -> CurrencyIndex:
+        """
+        Get available currencies of merchant indexed by label, group and
+        amount. Index is immutable, keep it between refreshes and share it.
+
+        :param language: `ru` or `en`
+        :param timeout: Timeout of request, seconds or `httpx.Timeout`
+        :param deadline: Deadline of operation, current one is used by default
+        :return: Index of currencies
+        """
+        return CurrencyIndex.from_result(
+            self._merchant.get_currencies(
+                language=language, timeout=timeout, deadline=deadline
+            )
+        )
+
+    def get_operation_state(
+        self,
+        invoice_id: Union[str, int],
+        timeout: Optional[TimeoutTypes] = None,
+        deadline: Optional[Deadline] = None,
+    ) -> dict:
+        """
+        Get state of operation by invoice ID.
+
+        :param invoice_id: Store account number
+        :param timeout: Timeout of request, seconds or `httpx.Timeout`
+        :param deadline: Deadline of operation, current one is used by default
+        :return: dictionary of operation state
+        """
+        signature = Signature(
+            merchant_login=self._merchant_login,
+            inv_id=invoice_id,
+            password=self._password2,
+            hash_=self._hash,
+        )
+        return self._merchant.get_operation_state(
+            invoice_id=invoice_id,
+            signature_value=signature.value,
+            timeout=timeout,
+            deadline=deadline,
+        ).as_dict()
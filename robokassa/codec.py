@@ -0,0 +1,111 @@
+import json
+from typing import Any, Dict, Optional, Union
+
+
+class JSONCodec:
+    """
+    Encoder and decoder of JSON used for responses and request payloads.
+
+    Output of all codecs is compact and not escaped to ASCII,
+    but it isn't identical: e.g. orjson writes `1e16` where json writes
+    `1e+16` and rejects non-str keys. Output of one codec decodes
+    to the same value with any other, and signed payloads, e.g. receipt,
+    are sent exactly as they were encoded for signature.
+    """
+
+    name = "json"
+
+    def dumps(self, obj: Any) -> str:
+        return json.dumps(obj, separators=(",", ":"), ensure_ascii=False)
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        """
+        :raise ValueError: If data is not valid JSON
+        """
+        return json.loads(data)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}()"
+
+
+class OrjsonCodec(JSONCodec):
+    name = "orjson"
+
+    def __init__(self) -> None:
+        import orjson
+
+        self._orjson = orjson
+
+    def dumps(self, obj: Any) -> str:
+        return self._orjson.dumps(obj).decode()
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        return self._orjson.loads(data)
+
+
+class UjsonCodec(JSONCodec):
+    name = "ujson"
+
+    def __init__(self) -> None:
+        import ujson
+
+        self._ujson = ujson
+
+    def dumps(self, obj: Any) -> str:
+        return self._ujson.dumps(obj, ensure_ascii=False, escape_forward_slashes=False)
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        return self._ujson.loads(data)
+
+
+def available_codecs() -> Dict[str, JSONCodec]:
+    """
+    Get all codecs which can be used in this environment, the fastest first.
+    """
+    codecs = {}
+    for codec_class in (OrjsonCodec, UjsonCodec):
+        try:
+            codecs[codec_class.name] = codec_class()
+        except ImportError:
+            continue
+    codecs[JSONCodec.name] = JSONCodec()
+    return codecs
+
+
+_codec: JSONCodec = next(iter(available_codecs().values()))
+
+
+def get_codec() -> JSONCodec:
+    return _codec
+
+
+def set_codec(codec: Optional[Union[JSONCodec, str]] = None) -> JSONCodec:
+    """
+    Replace codec used by library.
+
+    :param codec: Codec, name of installed codec or None for the fastest one
+    :raise ValueError: If codec with this name is not installed
+    :return: Previous codec
+    """
+    global _codec
+
+    codecs = available_codecs()
+    if codec is None:
+        codec = next(iter(codecs.values()))
+    elif isinstance(codec, str):
+        if codec not in codecs:
+            raise ValueError(
+                f"JSON codec {codec!r} is not installed, available: {', '.join(codecs)}"
+            )
+        codec = codecs[codec]
+
+    previous, _codec = _codec, codec
+    return previous
+
+
+def dumps(obj: Any) -> str:
+    return _codec.dumps(obj)
+
+
+def loads(data: Union[bytes, str]) -> Any:
+    return _codec.loads(data)
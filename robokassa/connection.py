@@ -1,6 +1,36 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional
 
-from httpx import Client
+import httpx
+from httpx import Client, Limits
+
+from robokassa.deadline import Deadline, TimeoutTypes, resolve_timeout
+from robokassa.dns import DNSCache, DNSCachingTransport
+from robokassa.exceptions import DeadlineExceededError, DeadlineExceededInFlightError
+from robokassa.protocol import R, RobokassaRequest
+
+
+def _read(response: httpx.Response, deadline: Optional[Deadline]) -> bytes:
+    """
+    :raise DeadlineExceededInFlightError: If deadline passed after request was sent
+    """
+    if deadline is None:
+        return response.read()
+    # every phase of request is limited by remaining time separately,
+    # so deadline is checked between them to limit the whole request
+    try:
+        deadline.check()
+        chunks = []
+        for chunk in response.iter_bytes():
+            if chunks:
+                deadline.check()
+            chunks.append(chunk)
+    except DeadlineExceededError:
+        raise DeadlineExceededInFlightError(
+            "Deadline of operation is exceeded while waiting for response"
+        ) from None
+    return b"".join(chunks)
 
 
 class BaseHttpConnection:
@@ -8,17 +38,126 @@ class BaseHttpConnection:
 
 
 class HttpConnection(BaseHttpConnection):
-    def __init__(self, base_url: str = "") -> None:
+    """
+    Connection which keeps one pooled client,
+    so keep-alive connections are reused between requests and threads.
+
+    Custom `transport`, e.g. replay of `robokassa.cassette`,
+    is used instead of network one.
+    """
+
+    def __init__(
+        self,
+        base_url: str = "",
+        limits: Optional[Limits] = None,
+        dns_cache: Optional[DNSCache] = None,
+        timeout: Optional[TimeoutTypes] = None,
+        transport: Optional[httpx.BaseTransport] = None,
+    ) -> None:
         self.base_url: str = base_url
+        self.limits = limits
+        self.dns_cache = dns_cache
+        self.transport = transport
+        self.timeout = resolve_timeout(httpx.Timeout(5.0), timeout)
 
+        self._lock = threading.Lock()
         self._sync_client: Optional[Client] = None
 
+    def _create_client(self) -> Client:
+        kwargs = {}
+        if self.limits is not None:
+            kwargs["limits"] = self.limits
+        if self.transport is not None:
+            kwargs["transport"] = self.transport
+        elif self.dns_cache is not None:
+            kwargs["transport"] = DNSCachingTransport(
+                self.dns_cache, limits=self.limits
+            )
+        return Client(base_url=self.base_url, timeout=self.timeout, **kwargs)
+
+    def _get_client(self) -> Client:
+        client = self._sync_client
+        if client is None or client.is_closed:
+            with self._lock:
+                if self._sync_client is None or self._sync_client.is_closed:
+                    self._sync_client = self._create_client()
+                client = self._sync_client
+        return client
+
     def __enter__(self) -> Client:
-        self._sync_client = Client(base_url=self.base_url)
-        return self._sync_client
+        return self._get_client()
 
     def __exit__(self, exc_type, exc_val, exc_tb) -> None:
-        self._sync_client.close()
+        # client stays open to keep connections in the pool
+        pass
+
+    def request_timeout(
+        self,
+        timeout: Optional[TimeoutTypes] = None,
+        deadline: Optional[Deadline] = None,
+    ) -> httpx.Timeout:
+        """
+        Timeout of request with respect to timeout of call and deadline.
+        """
+        return resolve_timeout(self.timeout, timeout, deadline)
+
+    def send(
+        self,
+        request: RobokassaRequest[R],
+        timeout: Optional[TimeoutTypes] = None,
+        deadline: Optional[Deadline] = None,
+    ) -> R:
+        """
+        Send request built by `robokassa.protocol` and parse its response.
+
+        :raise DeadlineExceededError: If deadline passed before request was sent
+        :raise DeadlineExceededInFlightError: If deadline passed after request
+            was sent, outcome of request is unknown
+        """
+        deadline = deadline or Deadline.current()
+        request_timeout = self.request_timeout(timeout, deadline)
+        with self as conn:
+            with conn.stream(
+                request.method,
+                request.url,
+                data=request.data,
+                content=request.content,
+                params=request.params,
+                headers=request.headers,
+                timeout=request_timeout,
+            ) as response:
+                content = _read(response, deadline)
+        return request.parse(response.status_code, content)
+
+    def warmup(self, connections: int = 1) -> int:
+        """
+        Open connections of pool before the first request.
+
+        :param connections: Count of connections to open
+        :raise ValueError: If count of connections is negative
+        :return: Count of successfully opened connections
+        """
+        if connections < 0:
+            raise ValueError("Count of connections must not be negative")
+        if connections == 0:
+            return 0
+        client = self._get_client()
+
+        def touch() -> bool:
+            try:
+                client.head("")
+            except httpx.TransportError:
+                return False
+            return True
+
+        with ThreadPoolExecutor(max_workers=connections) as executor:
+            return sum(executor.map(lambda _: touch(), range(connections)))
+
+    def close(self) -> None:
+        with self._lock:
+            if self._sync_client is not None:
+                self._sync_client.close()
+                self._sync_client = None
 
 
 class BaseRequests:
@@ -27,4 +166,18 @@ class BaseRequests:
 
 class Requests(BaseRequests):
     _base_url = "https://auth.robokassa.ru/Merchant"
-    connection = HttpConnection(base_url=_base_url)
+
+    def __init__(
+        self,
+        limits: Optional[Limits] = None,
+        dns_cache: Optional[DNSCache] = None,
+        timeout: Optional[TimeoutTypes] = None,
+        transport: Optional[httpx.BaseTransport] = None,
+    ) -> None:
+        self.connection = HttpConnection(
+            base_url=self._base_url,
+            limits=limits,
+            dns_cache=dns_cache,
+            timeout=timeout,
+            transport=transport,
+        )
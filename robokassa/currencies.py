@@ -0,0 +1,202 @@
+"""
+Index of currencies of merchant.
+
+Response of `GetCurrencies` is indexed once, then checkout pages filter
+payment methods by amount without walking the response:
+
+    index = robokassa.get_currency_index("ru")  # on refresh of cache
+    ...
+    labels = [currency.label for currency in index.for_amount(cart_total)]
+
+Index is immutable, so one index is shared by all threads and requests.
+"""
+
+from bisect import bisect_left
+from dataclasses import dataclass
+from decimal import Decimal, InvalidOperation
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Sequence, Tuple, Union
+
+from robokassa.responses import CurrenciesResult
+
+Amount = Union[str, int, float, Decimal]
+
+
+def _to_decimal(value: Optional[Amount]) -> Optional[Decimal]:
+    if value is None or value == "":
+        return None
+    try:
+        return Decimal(str(value))
+    except InvalidOperation:
+        raise ValueError(f"Amount is invalid: {value!r}") from None
+
+
+def _as_list(value: Any) -> list:
+    if value is None:
+        return []
+    return value if isinstance(value, list) else [value]
+
+
+@dataclass(frozen=True)
+class Currency:
+    """
+    Currency (payment method) of merchant.
+
+    :param label: IncCurrLabel of currency
+    :param group_code: Code of group of currency
+    :param min_value: Min sum of payment, None if it isn't limited
+    :param max_value: Max sum of payment, None if it isn't limited
+    """
+
+    label: str
+    alias: Optional[str]
+    name: Optional[str]
+    group_code: Optional[str]
+    min_value: Optional[Decimal] = None
+    max_value: Optional[Decimal] = None
+
+    def accepts(self, amount: Amount) -> bool:
+        value = _to_decimal(amount)
+        return (self.min_value is None or self.min_value <= value) and (
+            self.max_value is None or value <= self.max_value
+        )
+
+
+@dataclass(frozen=True)
+class CurrencyGroup:
+    code: Optional[str]
+    description: Optional[str]
+    currencies: Tuple[Currency, ...] = ()
+
+
+class CurrencyIndex:
+    """
+    Currencies of merchant with lookup by label, by group and by amount.
+
+    Bounds of currencies split amounts into intervals, currencies which
+    accept every interval are computed on build, so lookup by amount
+    is a binary search.
+    """
+
+    def __init__(self, groups: Sequence[CurrencyGroup]) -> None:
+        self._groups: Dict[Optional[str], CurrencyGroup] = {
+            group.code: group for group in groups
+        }
+        self._currencies: Tuple[Currency, ...] = tuple(
+            currency for group in groups for currency in group.currencies
+        )
+        self._by_label: Dict[str, Currency] = {
+            currency.label: currency for currency in self._currencies
+        }
+
+        # bounds[i] is accepted by points[i], amounts between bounds[i - 1]
+        # and bounds[i] are accepted by gaps[i]
+        self._bounds: List[Decimal] = sorted(
+            {
+                bound
+                for currency in self._currencies
+                for bound in (currency.min_value, currency.max_value)
+                if bound is not None
+            }
+        )
+        self._points: List[Tuple[Currency, ...]] = [
+            self._accepting(bound) for bound in self._bounds
+        ]
+        self._gaps: List[Tuple[Currency, ...]] = [
+            self._accepting_between(index) for index in range(len(self._bounds) + 1)
+        ]
+
+    def _accepting(self, amount: Decimal) -> Tuple[Currency, ...]:
+        return tuple(
+            currency for currency in self._currencies if currency.accepts(amount)
+        )
+
+    def _accepting_between(self, index: int) -> Tuple[Currency, ...]:
+        lower = self._bounds[index - 1] if index > 0 else None
+        upper = self._bounds[index] if index < len(self._bounds) else None
+        return tuple(
+            currency
+            for currency in self._currencies
+            if (
+                currency.min_value is None
+                or (lower is not None and currency.min_value <= lower)
+            )
+            and (
+                currency.max_value is None
+                or (upper is not None and upper <= currency.max_value)
+            )
+        )
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any]) -> "CurrencyIndex":
+        """
+        Build index of parsed response of `GetCurrencies`.
+        """
+        groups = []
+        for group in _as_list((data.get("Groups") or {}).get("Group")):
+            code = group.get("Code")
+            currencies = tuple(
+                Currency(
+                    label=item["Label"],
+                    alias=item.get("Alias"),
+                    name=item.get("Name"),
+                    group_code=code,
+                    min_value=_to_decimal(item.get("MinValue")),
+                    max_value=_to_decimal(item.get("MaxValue")),
+                )
+                for item in _as_list((group.get("Items") or {}).get("Currency"))
+            )
+            groups.append(CurrencyGroup(code, group.get("Description"), currencies))
+        return cls(groups)
+
+    @classmethod
+    def from_result(cls, result: CurrenciesResult) -> "CurrencyIndex":
+        return cls.from_dict(result.data)
+
+    def get(self, label: str) -> Optional[Currency]:
+        return self._by_label.get(label)
+
+    def group(self, code: str) -> Optional[CurrencyGroup]:
+        return self._groups.get(code)
+
+    @property
+    def groups(self) -> List[CurrencyGroup]:
+        return list(self._groups.values())
+
+    def for_amount(
+        self, amount: Amount, group: Optional[str] = None
+    ) -> Tuple[Currency, ...]:
+        """
+        Currencies which accept payment of amount, in order of response.
+
+        :param amount: Sum of payment
+        :param group: Code of group to filter currencies
+        """
+        value = _to_decimal(amount)
+        index = bisect_left(self._bounds, value)
+        if index < len(self._bounds) and self._bounds[index] == value:
+            currencies = self._points[index]
+        else:
+            currencies = self._gaps[index]
+        if group is None:
+            return currencies
+        return tuple(
+            currency for currency in currencies if currency.group_code == group
+        )
+
+    def __getitem__(self, label: str) -> Currency:
+        return self._by_label[label]
+
+    def __contains__(self, label: object) -> bool:
+        return label in self._by_label
+
+    def __iter__(self) -> Iterator[Currency]:
+        return iter(self._currencies)
+
+    def __len__(self) -> int:
+        return len(self._currencies)
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__name__}(groups={len(self._groups)}, "
+            f"currencies={len(self)})"
+        )
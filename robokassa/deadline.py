@@ -0,0 +1,100 @@
+import time
+from contextvars import ContextVar, Token
+from typing import Optional, Union
+
+import httpx
+
+from robokassa.exceptions import DeadlineExceededError
+
+TimeoutTypes = Union[float, httpx.Timeout]
+
+_current_deadline: ContextVar[Optional["Deadline"]] = ContextVar(
+    "robokassa_deadline", default=None
+)
+
+
+class Deadline:
+    """
+    Latency budget of operation which consists of many requests.
+
+    Deadline can be passed to methods directly or set for a block of code:
+
+    `with Deadline(2.5): robokassa.create_link_to_payment_page_by_invoice_id(...)`
+
+    Every request of the block gets timeout not longer than remaining time.
+    """
+
+    def __init__(self, timeout: float) -> None:
+        self.expires_at = time.monotonic() + timeout
+
+        self._tokens = []
+
+    @classmethod
+    def current(cls) -> Optional["Deadline"]:
+        return _current_deadline.get()
+
+    def remaining(self) -> float:
+        return self.expires_at - time.monotonic()
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+    def check(self) -> float:
+        """
+        :return: Remaining seconds
+        :raise DeadlineExceededError: If there is no time left
+        """
+        remaining = self.remaining()
+        if remaining <= 0:
+            raise DeadlineExceededError("Deadline of operation is exceeded")
+        return remaining
+
+    def __enter__(self) -> "Deadline":
+        current = _current_deadline.get()
+        if current is not None and current.expires_at < self.expires_at:
+            # nested deadline cannot extend budget of outer one
+            self.expires_at = current.expires_at
+        self._tokens.append(_current_deadline.set(self))
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        token: Token = self._tokens.pop()
+        _current_deadline.reset(token)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(remaining={self.remaining():.3f})"
+
+
+def resolve_timeout(
+    default: httpx.Timeout,
+    timeout: Optional[TimeoutTypes] = None,
+    deadline: Optional[Deadline] = None,
+) -> httpx.Timeout:
+    """
+    Get timeout of request from timeout of client, timeout of call
+    and deadline (given or current one).
+
+    Every phase (connect, write, read, pool) is capped by remaining time,
+    connections also limit the whole request by deadline.
+    """
+    if timeout is not None:
+        default = (
+            timeout if isinstance(timeout, httpx.Timeout) else httpx.Timeout(timeout)
+        )
+
+    deadline = deadline or Deadline.current()
+    if deadline is None:
+        return default
+
+    remaining = deadline.check()
+
+    def cap(value: Optional[float]) -> float:
+        return remaining if value is None else min(value, remaining)
+
+    return httpx.Timeout(
+        connect=cap(default.connect),
+        read=cap(default.read),
+        write=cap(default.write),
+        pool=cap(default.pool),
+    )
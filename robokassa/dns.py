@@ -0,0 +1,308 @@
+import socket
+import ssl
+import threading
+import time
+from contextlib import contextmanager
+from typing import (
+    Any,
+    AsyncIterable,
+    AsyncIterator,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
+
+import anyio
+import httpcore
+import httpx
+from httpx import Limits
+
+VerifyTypes = Union[str, bool, ssl.SSLContext]
+CertTypes = Union[str, Tuple[str, str], Tuple[str, str, str]]
+
+
+class DNSCache:
+    """
+    Cache of resolved addresses of hosts with time to live.
+
+    Connections to Robokassa are opened to already resolved address,
+    TLS still checks certificate of host name.
+    """
+
+    def __init__(self, ttl: float = 60.0) -> None:
+        self.ttl = ttl
+
+        self._lock = threading.Lock()
+        self._entries: Dict[Tuple[str, int], Tuple[float, List[str]]] = {}
+
+    def _get(self, host: str, port: int) -> Optional[List[str]]:
+        entry = self._entries.get((host, port))
+        if entry is None or entry[0] <= time.monotonic():
+            return None
+        return entry[1]
+
+    def _set(self, host: str, port: int, addresses: List[str]) -> List[str]:
+        # keep order of resolver, but without duplicates for each socket type
+        addresses = list(dict.fromkeys(addresses))
+        with self._lock:
+            self._entries[(host, port)] = (time.monotonic() + self.ttl, addresses)
+        return addresses
+
+    def resolve(self, host: str, port: int) -> List[str]:
+        addresses = self._get(host, port)
+        if addresses is not None:
+            return addresses
+
+        info = socket.getaddrinfo(host, port, type=socket.SOCK_STREAM)
+        return self._set(host, port, [item[4][0] for item in info])
+
+    async def aresolve(self, host: str, port: int) -> List[str]:
+        addresses = self._get(host, port)
+        if addresses is not None:
+            return addresses
+
+        info = await anyio.getaddrinfo(host, port, type=socket.SOCK_STREAM)
+        return self._set(host, port, [item[4][0] for item in info])
+
+    def invalidate(self, host: str, port: int) -> None:
+        with self._lock:
+            self._entries.pop((host, port), None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+class CachingNetworkBackend(httpcore.SyncBackend):
+    def __init__(self, dns_cache: DNSCache) -> None:
+        self._dns_cache = dns_cache
+
+    def connect_tcp(
+        self, host, port, timeout=None, local_address=None, socket_options=None
+    ):
+        error = None
+        for address in self._dns_cache.resolve(host, port):
+            try:
+                return super().connect_tcp(
+                    address, port, timeout, local_address, socket_options
+                )
+            except httpcore.ConnectError as exc:
+                error = exc
+        # address could be changed, it will be resolved again next time
+        self._dns_cache.invalidate(host, port)
+        raise error
+
+
+class AsyncCachingNetworkBackend(httpcore.AnyIOBackend):
+    def __init__(self, dns_cache: DNSCache) -> None:
+        self._dns_cache = dns_cache
+
+    async def connect_tcp(
+        self, host, port, timeout=None, local_address=None, socket_options=None
+    ):
+        error = None
+        for address in await self._dns_cache.aresolve(host, port):
+            try:
+                return await super().connect_tcp(
+                    address, port, timeout, local_address, socket_options
+                )
+            except httpcore.ConnectError as exc:
+                error = exc
+        # address could be changed, it will be resolved again next time
+        self._dns_cache.invalidate(host, port)
+        raise error
+
+
+# errors of httpcore by errors of httpx, more specific first
+_MAPPED_ERRORS = (
+    (httpcore.ConnectTimeout, httpx.ConnectTimeout),
+    (httpcore.ReadTimeout, httpx.ReadTimeout),
+    (httpcore.WriteTimeout, httpx.WriteTimeout),
+    (httpcore.PoolTimeout, httpx.PoolTimeout),
+    (httpcore.TimeoutException, httpx.TimeoutException),
+    (httpcore.ConnectError, httpx.ConnectError),
+    (httpcore.ReadError, httpx.ReadError),
+    (httpcore.WriteError, httpx.WriteError),
+    (httpcore.NetworkError, httpx.NetworkError),
+    (httpcore.ProxyError, httpx.ProxyError),
+    (httpcore.UnsupportedProtocol, httpx.UnsupportedProtocol),
+    (httpcore.LocalProtocolError, httpx.LocalProtocolError),
+    (httpcore.RemoteProtocolError, httpx.RemoteProtocolError),
+    (httpcore.ProtocolError, httpx.ProtocolError),
+)
+_HTTPCORE_ERRORS = tuple(error for error, _ in _MAPPED_ERRORS)
+
+DEFAULT_LIMITS = Limits(max_connections=100, max_keepalive_connections=20)
+
+
+@contextmanager
+def _map_errors() -> Iterator[None]:
+    try:
+        yield
+    except _HTTPCORE_ERRORS as exc:
+        for error, mapped in _MAPPED_ERRORS:
+            if isinstance(exc, error):
+                raise mapped(str(exc)) from exc
+        raise
+
+
+def _to_core_request(request: httpx.Request, stream: Any) -> httpcore.Request:
+    return httpcore.Request(
+        method=request.method,
+        url=httpcore.URL(
+            scheme=request.url.raw_scheme,
+            host=request.url.raw_host,
+            port=request.url.port,
+            target=request.url.raw_path,
+        ),
+        headers=request.headers.raw,
+        content=stream,
+        extensions=request.extensions,
+    )
+
+
+def _pool_kwargs(
+    verify: VerifyTypes,
+    cert: Optional[CertTypes],
+    http1: bool,
+    http2: bool,
+    limits: Limits,
+    trust_env: bool,
+    retries: int,
+) -> Dict[str, Any]:
+    return {
+        "ssl_context": httpx.create_ssl_context(
+            verify=verify, cert=cert, trust_env=trust_env
+        ),
+        "max_connections": limits.max_connections,
+        "max_keepalive_connections": limits.max_keepalive_connections,
+        "keepalive_expiry": limits.keepalive_expiry,
+        "http1": http1,
+        "http2": http2,
+        "retries": retries,
+    }
+
+
+class _ResponseStream(httpx.SyncByteStream):
+    def __init__(self, stream: Iterable[bytes]) -> None:
+        self._stream = stream
+
+    def __iter__(self) -> Iterator[bytes]:
+        with _map_errors():
+            yield from self._stream
+
+    def close(self) -> None:
+        if hasattr(self._stream, "close"):
+            self._stream.close()
+
+
+class _AsyncResponseStream(httpx.AsyncByteStream):
+    def __init__(self, stream: AsyncIterable[bytes]) -> None:
+        self._stream = stream
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        with _map_errors():
+            async for part in self._stream:
+                yield part
+
+    async def aclose(self) -> None:
+        if hasattr(self._stream, "aclose"):
+            await self._stream.aclose()
+
+
+class DNSCachingTransport(httpx.BaseTransport):
+    """
+    Transport which opens connections to addresses of `DNSCache`.
+
+    Settings of TLS, limits, protocols and retries have the same meaning
+    as settings of `httpx.HTTPTransport`. Proxy, if it's given, is resolved
+    by the cache too.
+    """
+
+    def __init__(
+        self,
+        dns_cache: DNSCache,
+        verify: VerifyTypes = True,
+        cert: Optional[CertTypes] = None,
+        http1: bool = True,
+        http2: bool = False,
+        limits: Optional[Limits] = None,
+        trust_env: bool = True,
+        retries: int = 0,
+        proxy: Optional[str] = None,
+    ) -> None:
+        kwargs = _pool_kwargs(
+            verify, cert, http1, http2, limits or DEFAULT_LIMITS, trust_env, retries
+        )
+        backend = CachingNetworkBackend(dns_cache)
+        if proxy is None:
+            self._pool = httpcore.ConnectionPool(network_backend=backend, **kwargs)
+        else:
+            self._pool = httpcore.HTTPProxy(
+                proxy_url=proxy, network_backend=backend, **kwargs
+            )
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        with _map_errors():
+            response = self._pool.handle_request(
+                _to_core_request(request, request.stream)
+            )
+        return httpx.Response(
+            status_code=response.status,
+            headers=response.headers,
+            stream=_ResponseStream(response.stream),
+            extensions=response.extensions,
+        )
+
+    def close(self) -> None:
+        self._pool.close()
+
+
+class AsyncDNSCachingTransport(httpx.AsyncBaseTransport):
+    """
+    Async transport which opens connections to addresses of `DNSCache`.
+
+    Settings have the same meaning as settings of `DNSCachingTransport`.
+    """
+
+    def __init__(
+        self,
+        dns_cache: DNSCache,
+        verify: VerifyTypes = True,
+        cert: Optional[CertTypes] = None,
+        http1: bool = True,
+        http2: bool = False,
+        limits: Optional[Limits] = None,
+        trust_env: bool = True,
+        retries: int = 0,
+        proxy: Optional[str] = None,
+    ) -> None:
+        kwargs = _pool_kwargs(
+            verify, cert, http1, http2, limits or DEFAULT_LIMITS, trust_env, retries
+        )
+        backend = AsyncCachingNetworkBackend(dns_cache)
+        if proxy is None:
+            self._pool = httpcore.AsyncConnectionPool(network_backend=backend, **kwargs)
+        else:
+            self._pool = httpcore.AsyncHTTPProxy(
+                proxy_url=proxy, network_backend=backend, **kwargs
+            )
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        with _map_errors():
+            response = await self._pool.handle_async_request(
+                _to_core_request(request, request.stream)
+            )
+        return httpx.Response(
+            status_code=response.status,
+            headers=response.headers,
+            stream=_AsyncResponseStream(response.stream),
+            extensions=response.extensions,
+        )
+
+    async def aclose(self) -> None:
+        await self._pool.aclose()
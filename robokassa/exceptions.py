@@ -12,3 +12,36 @@ class IncorrectUrlMethodError(Exception):
 
 class RobokassaInterfaceError(Exception):
     pass
+
+
+class UnknownMerchantError(Exception):
+    pass
+
+
+class DeadlineExceededError(RobokassaInterfaceError):
+    """
+    Deadline passed before request was sent.
+    """
+
+    sent = False
+
+
+class DeadlineExceededInFlightError(DeadlineExceededError):
+    """
+    Deadline passed while waiting for response, request could be
+    already processed by Robokassa, so outcome of operation is unknown.
+    """
+
+    sent = True
+
+
+class RobokassaUnavailableError(RobokassaInterfaceError):
+    pass
+
+
+class CassetteMissError(Exception):
+    pass
+
+
+class InvalidParameterError(ValueError):
+    pass
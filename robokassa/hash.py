@@ -42,3 +42,31 @@ class Hash:
             raise UnresolvedAlgorithmTypeError("Cannot define algorithm for hashing")
 
         return result
+
+    def new(self, data: bytes = b"") -> "hashlib._Hash":
+        """
+        Create hash object of algorithm.
+        State of object can be copied to hash many strings with common prefix.
+        """
+        return hashlib.new(self.algorithm.value, data)
+
+
+class PrefixedHash(Hash):
+    """
+    Hash of strings with common prefix, e.g. `MerchantLogin:` of link signatures.
+    State of prefix is built once and copied for every string.
+    Strings without the prefix are hashed as usual.
+    """
+
+    def __init__(self, algorithm: HashAlgorithm, prefix: str) -> None:
+        super().__init__(algorithm)
+        self.prefix = prefix
+
+        self._state = self.new(prefix.encode())
+
+    def hash_data(self, data: str) -> str:
+        if not data.startswith(self.prefix):
+            return super().hash_data(data)
+        state = self._state.copy()
+        state.update(data[len(self.prefix) :].encode())
+        return state.hexdigest()
@@ -0,0 +1,212 @@
+import asyncio
+import contextvars
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Awaitable, Callable, Deque, Dict, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+class HedgingPolicy:
+    """
+    Policy of hedged requests for idempotent endpoints.
+
+    If request didn't get response in `percentile` of observed latency,
+    the second same request is sent and the first response is used.
+    Hedged requests are limited by `max_hedge_rate` of all requests.
+
+    :param percentile: Percentile of latency after which request is hedged
+    :param max_hedge_rate: Max share of requests which can be hedged
+    :param initial_delay: Delay of hedge before `min_samples` latencies are observed
+    :param min_samples: Count of latencies required to use percentile
+    :param window: Count of the last latencies and requests to keep
+    :param max_workers: Threads for hedges of sync client, the first requests
+        run in their own threads and aren't limited by it
+    """
+
+    def __init__(
+        self,
+        percentile: float = 0.95,
+        max_hedge_rate: float = 0.1,
+        initial_delay: float = 1.0,
+        min_samples: int = 20,
+        window: int = 1000,
+        max_workers: int = 16,
+    ) -> None:
+        if not 0 < percentile < 1:
+            raise ValueError("Percentile must be between 0 and 1")
+
+        self.percentile = percentile
+        self.max_hedge_rate = max_hedge_rate
+        self.initial_delay = initial_delay
+        self.min_samples = min_samples
+        self.window = window
+        self.max_workers = max_workers
+
+        self._lock = threading.Lock()
+        self._latencies: Dict[str, Deque[float]] = {}
+        self._hedged: Deque[bool] = deque(maxlen=window)
+        self._hedged_count = 0
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+        self.requests = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+
+    def delay(self, key: str) -> float:
+        with self._lock:
+            latencies = self._latencies.get(key)
+            if latencies is None or len(latencies) < self.min_samples:
+                return self.initial_delay
+            ordered = sorted(latencies)
+        return ordered[min(int(len(ordered) * self.percentile), len(ordered) - 1)]
+
+    def record(self, key: str, latency: float) -> None:
+        with self._lock:
+            latencies = self._latencies.get(key)
+            if latencies is None:
+                latencies = self._latencies[key] = deque(maxlen=self.window)
+            latencies.append(latency)
+
+    def _start_request(self) -> None:
+        with self._lock:
+            self.requests += 1
+            if len(self._hedged) == self._hedged.maxlen and self._hedged[0]:
+                self._hedged_count -= 1
+            self._hedged.append(False)
+
+    def _record_win(self, key: str, original_started: float) -> None:
+        # original request took at least this long, without it percentile
+        # would only see latencies of winners and sink after every hedge
+        self.record(key, time.monotonic() - original_started)
+        with self._lock:
+            self.hedge_wins += 1
+
+    def _acquire_hedge(self) -> bool:
+        with self._lock:
+            if self._hedged_count + 1 > self.max_hedge_rate * len(self._hedged):
+                return False
+            self._hedged[-1] = True
+            self._hedged_count += 1
+            self.hedges += 1
+            return True
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.max_workers,
+                        thread_name_prefix="robokassa-hedge",
+                    )
+        return self._executor
+
+    def run(self, key: str, request: Callable[[], T]) -> T:
+        """
+        Run sync request with hedging.
+        Request which lost is not interrupted, its response is ignored.
+        """
+        self._start_request()
+
+        def timed() -> Tuple[T, float]:
+            started = time.monotonic()
+            result = request()
+            return result, time.monotonic() - started
+
+        # the first request doesn't wait in queue of executor, otherwise
+        # time in queue would be taken for latency and hedge load
+        first: Future = Future()
+        started = time.monotonic()
+        threading.Thread(
+            target=contextvars.copy_context().run,
+            args=(_complete, first, timed),
+            name="robokassa-request",
+            daemon=True,
+        ).start()
+        done, _ = wait([first], timeout=self.delay(key))
+        if done or not self._acquire_hedge():
+            result, latency = first.result()
+            self.record(key, latency)
+            return result
+
+        second = self._get_executor().submit(contextvars.copy_context().run, timed)
+        pending = {first, second}
+        error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is not None:
+                    error = future.exception()
+                    continue
+                for other in pending:
+                    other.cancel()
+                result, latency = future.result()
+                self.record(key, latency)
+                if future is second:
+                    self._record_win(key, started)
+                return result
+        raise error
+
+    async def arun(self, key: str, request: Callable[[], Awaitable[T]]) -> T:
+        """
+        Run async request with hedging.
+        Request which lost is cancelled.
+        """
+        self._start_request()
+
+        async def timed() -> Tuple[T, float]:
+            started = time.monotonic()
+            result = await request()
+            return result, time.monotonic() - started
+
+        started = time.monotonic()
+        first = asyncio.ensure_future(timed())
+        pending = {first}
+        try:
+            done, _ = await asyncio.wait(pending, timeout=self.delay(key))
+            if done or not self._acquire_hedge():
+                result, latency = await first
+                self.record(key, latency)
+                return result
+
+            second = asyncio.ensure_future(timed())
+            pending.add(second)
+            error = None
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.exception() is not None:
+                        error = task.exception()
+                        continue
+                    result, latency = task.result()
+                    self.record(key, latency)
+                    if task is second:
+                        self._record_win(key, started)
+                    return result
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__name__}(requests={self.requests}, "
+            f"hedges={self.hedges}, hedge_wins={self.hedge_wins})"
+        )
+
+
+def _complete(future: Future, function: Callable[[], T]) -> None:
+    future.set_running_or_notify_cancel()
+    try:
+        future.set_result(function())
+    except BaseException as exc:  # noqa: BLE001 - it's raised by waiter of future
+        future.set_exception(exc)
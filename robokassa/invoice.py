@@ -0,0 +1,211 @@
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Union
+
+from robokassa import protocol
+from robokassa.connection import Requests
+from robokassa.deadline import Deadline, TimeoutTypes
+from robokassa.jwt import JWTSigner
+from robokassa.responses import InvoiceApiResult, InvoiceListResult
+
+
+def invoice_payload(
+    merchant_login: str,
+    out_sum: Union[float, int, str],
+    inv_id: Optional[Union[int, str]] = None,
+    description: Optional[str] = None,
+    invoice_type: str = "OneTime",
+    culture: Optional[str] = None,
+    merchant_comments: Optional[str] = None,
+    invoice_items: Optional[List[Dict[str, Any]]] = None,
+    user_fields: Optional[Dict[str, Any]] = None,
+    **extra: Any,
+) -> Dict[str, Any]:
+    """
+    :param invoice_type: `OneTime` or `Reusable`
+    :param invoice_items: Items of fiscal receipt
+    :param user_fields: Additional `shp_` params of invoice
+    :param extra: Other params of Invoice API, e.g. `ExpirationDate`
+    """
+    payload: Dict[str, Any] = {
+        "MerchantLogin": merchant_login,
+        "InvoiceType": invoice_type,
+        "OutSum": out_sum,
+    }
+    optional = {
+        "InvId": inv_id,
+        "Description": description,
+        "Culture": culture,
+        "MerchantComments": merchant_comments,
+        "InvoiceItems": invoice_items,
+        "UserFields": user_fields,
+    }
+    payload.update((key, value) for key, value in optional.items() if value is not None)
+    payload.update(extra)
+    return payload
+
+
+def deactivation_payload(
+    merchant_login: str,
+    inv_id: Optional[Union[int, str]] = None,
+    id_: Optional[str] = None,
+    encoded_id: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Invoice is found by one of InvId, ID or encoded ID from its link.
+    """
+    if inv_id is None and id_ is None and encoded_id is None:
+        raise ValueError("Deactivation requires inv_id, id or encoded_id of invoice")
+    payload: Dict[str, Any] = {"MerchantLogin": merchant_login}
+    if inv_id is not None:
+        payload["InvId"] = inv_id
+    if id_ is not None:
+        payload["Id"] = id_
+    if encoded_id is not None:
+        payload["EncodedId"] = encoded_id
+    return payload
+
+
+def list_payload(
+    merchant_login: str,
+    page: int,
+    page_size: int,
+    statuses: Optional[Sequence[str]] = None,
+    invoice_types: Optional[Sequence[str]] = None,
+    keywords: Optional[str] = None,
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+    is_ascending: bool = False,
+    **extra: Any,
+) -> Dict[str, Any]:
+    """
+    :param page: Number of page starting from 1
+    :param statuses: `paid`, `expired`, `notpaid`, all by default
+    :param invoice_types: `onetime`, `reusable`, all by default
+    :param date_from: ISO date of the first invoice
+    :param date_to: ISO date of the last invoice
+    """
+    payload: Dict[str, Any] = {
+        "MerchantLogin": merchant_login,
+        "CurrentPage": page,
+        "PageSize": page_size,
+        "InvoiceStatuses": list(statuses or ("paid", "expired", "notpaid")),
+        "InvoiceTypes": list(invoice_types or ("onetime", "reusable")),
+        "IsAscending": is_ascending,
+    }
+    optional = {"Keywords": keywords, "DateFrom": date_from, "DateTo": date_to}
+    payload.update((key, value) for key, value in optional.items() if value is not None)
+    payload.update(extra)
+    return payload
+
+
+def _checked(result: InvoiceApiResult) -> InvoiceApiResult:
+    result.raise_for_error()
+    return result
+
+
+class InvoiceApi:
+    """
+    Invoice API of Robokassa, JWT of requests is signed by MerchantLogin:Password#1.
+    """
+
+    def __init__(self, http: Requests, merchant_login: str, signer: JWTSigner) -> None:
+        self._http = http.connection
+        self._merchant_login = merchant_login
+        self._signer = signer
+
+    def create(
+        self,
+        out_sum: Union[float, int, str],
+        timeout: Optional[TimeoutTypes] = None,
+        deadline: Optional[Deadline] = None,
+        **params: Any,
+    ) -> InvoiceApiResult:
+        """
+        :param params: Params of `invoice_payload`
+        """
+        token = self._signer.sign(
+            invoice_payload(self._merchant_login, out_sum, **params)
+        )
+        request = protocol.create_invoice_by_api(token)
+        return _checked(self._http.send(request, timeout, deadline))
+
+    def deactivate(
+        self,
+        inv_id: Optional[Union[int, str]] = None,
+        id_: Optional[str] = None,
+        encoded_id: Optional[str] = None,
+        timeout: Optional[TimeoutTypes] = None,
+        deadline: Optional[Deadline] = None,
+    ) -> InvoiceApiResult:
+        token = self._signer.sign(
+            deactivation_payload(self._merchant_login, inv_id, id_, encoded_id)
+        )
+        request = protocol.deactivate_invoice(token)
+        return _checked(self._http.send(request, timeout, deadline))
+
+    def get_page(
+        self,
+        page: int,
+        page_size: int,
+        timeout: Optional[TimeoutTypes] = None,
+        deadline: Optional[Deadline] = None,
+        **filters: Any,
+    ) -> InvoiceListResult:
+        """
+        :param filters: Filters of `list_payload`
+        """
+        token = self._signer.sign(
+            list_payload(self._merchant_login, page, page_size, **filters)
+        )
+        request = protocol.list_invoices(token)
+        return _checked(self._http.send(request, timeout, deadline))
+
+    def iter_invoices(
+        self,
+        page_size: int = 100,
+        timeout: Optional[TimeoutTypes] = None,
+        **filters: Any,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Lazily iterate over invoices page by page.
+        Next page is fetched in background thread while current one
+        is consumed, so at most two pages are kept in memory.
+        Listing stops at the first page shorter than `page_size`.
+        """
+        if page_size < 1:
+            raise ValueError("Page size must be positive")
+
+        executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="robokassa-invoices"
+        )
+        page = 1
+        # deadline of consumer is current one of prefetch too
+        future = executor.submit(
+            contextvars.copy_context().run,
+            self.get_page,
+            page,
+            page_size,
+            timeout,
+            **filters,
+        )
+        try:
+            while True:
+                invoices = future.result().invoices
+                if len(invoices) < page_size:
+                    yield from invoices
+                    return
+                page += 1
+                future = executor.submit(
+                    contextvars.copy_context().run,
+                    self.get_page,
+                    page,
+                    page_size,
+                    timeout,
+                    **filters,
+                )
+                yield from invoices
+        finally:
+            # iterator can be closed before prefetched page is consumed
+            future.cancel()
+            executor.shutdown(wait=False)
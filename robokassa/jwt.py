@@ -0,0 +1,47 @@
+import base64
+import hmac
+from typing import Any, Dict
+
+from robokassa import codec
+from robokassa.hash import Hash, HashAlgorithm
+
+JWT_ALGORITHMS = {
+    HashAlgorithm.md5: "MD5",
+    HashAlgorithm.ripemd160: "RIPEMD160",
+    HashAlgorithm.sha1: "SHA1",
+    HashAlgorithm.sha256: "HS256",
+    HashAlgorithm.sha384: "HS384",
+    HashAlgorithm.sha512: "HS512",
+}
+
+
+def b64url(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+
+class JWTSigner:
+    """
+    Signer of JWT for Robokassa services (refunds, invoices).
+
+    Header of token is encoded once and HMAC is keyed once,
+    so only payload of every token is encoded and hashed.
+
+    :param key: Secret key of merchant, Password#3 for refunds
+    :param algorithm: Hash algorithm of HMAC
+    """
+
+    def __init__(self, key: str, algorithm: HashAlgorithm) -> None:
+        self.algorithm = algorithm
+
+        header = {"typ": "JWT", "alg": JWT_ALGORITHMS[algorithm]}
+        self._header = b64url(codec.dumps(header).encode())
+        self._hmac = hmac.new(key.encode(), digestmod=Hash(algorithm).new)
+
+    def sign(self, payload: Dict[str, Any]) -> str:
+        signing_input = f"{self._header}.{b64url(codec.dumps(payload).encode())}"
+        mac = self._hmac.copy()
+        mac.update(signing_input.encode())
+        return f"{signing_input}.{b64url(mac.digest())}"
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(algorithm={self.algorithm.name})"
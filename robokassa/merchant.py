@@ -1,7 +1,11 @@
-from typing import Union
+from typing import Optional, Union
 
+from robokassa import protocol
 from robokassa.connection import Requests
-from robokassa.utils import HttpResponseValidator
+from robokassa.deadline import Deadline, TimeoutTypes
+from robokassa.hedging import HedgingPolicy
+from robokassa.protocol import R, RobokassaRequest
+from robokassa.responses import CurrenciesResult, OperationStateResult
 
 
 class BaseMerchant:
@@ -9,45 +13,58 @@ class BaseMerchant:
 
 
 class Merchant(BaseMerchant):
-    def __init__(self, http: Requests, merchant_login: str) -> None:
+    def __init__(
+        self,
+        http: Requests,
+        merchant_login: str,
+        hedging: Optional[HedgingPolicy] = None,
+    ) -> None:
         self._http = http.connection
 
         self._merchant_login = merchant_login
+        self._hedging = hedging
 
-    def get_currencies(self, language: str) -> dict:
-        with self._http as conn:
-            response = conn.post(
-                url="WebService/Service.asmx/GetCurrencies",
-                data={
-                    "MerchantLogin": self._merchant_login,
-                    "Language": language,
-                },
-            )
-            validated_response = HttpResponseValidator(
-                response, False
-            ).validate_http_response()
-            return validated_response
+    def _send(
+        self,
+        request: RobokassaRequest[R],
+        timeout: Optional[TimeoutTypes] = None,
+        deadline: Optional[Deadline] = None,
+    ) -> R:
+        if self._hedging is None or not request.idempotent:
+            return self._http.send(request, timeout, deadline)
+        return self._hedging.run(
+            request.url, lambda: self._http.send(request, timeout, deadline)
+        )
+
+    def get_currencies(
+        self,
+        language: str,
+        timeout: Optional[TimeoutTypes] = None,
+        deadline: Optional[Deadline] = None,
+    ) -> CurrenciesResult:
+        return self._send(
+            protocol.get_currencies(self._merchant_login, language), timeout, deadline
+        )
 
     def get_operation_state(
-        self, signature_value: str, invoice_id: Union[int, str]
-    ) -> dict:
+        self,
+        signature_value: str,
+        invoice_id: Union[int, str],
+        timeout: Optional[TimeoutTypes] = None,
+        deadline: Optional[Deadline] = None,
+    ) -> OperationStateResult:
         """
         Get state of operation.
         :param signature_value: MerchantLogin:InvoiceID:Password#2
         :param invoice_id: Store account number
-        :return: dict
+        :param timeout: Timeout of request
+        :param deadline: Deadline of operation
+        :return: Lazy result of operation state
         """
-        with self._http as conn:
-            response = conn.post(
-                url="WebService/Service.asmx/OpStateExt",
-                data={
-                    "MerchantLogin": self._merchant_login,
-                    "InvoiceID": invoice_id,
-                    "Signature": signature_value,
-                },
-            )
-            validated_response = HttpResponseValidator(
-                response, False
-            ).validate_http_response()
-
-            return validated_response
+        return self._send(
+            protocol.get_operation_state(
+                self._merchant_login, invoice_id, signature_value
+            ),
+            timeout,
+            deadline,
+        )
@@ -0,0 +1,293 @@
+import asyncio
+import logging
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass
+from os import PathLike
+from typing import Any, Awaitable, Callable, Dict, Optional, Union
+
+import httpx
+
+from robokassa import codec
+from robokassa.exceptions import RobokassaInterfaceError, RobokassaUnavailableError
+from robokassa.storage import connect_sqlite
+
+OUTAGE_ERRORS = (RobokassaUnavailableError, httpx.TransportError)
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class OutboxJob:
+    id: int
+    params: Dict[str, Any]
+    attempts: int
+
+
+class InvoiceOutbox:
+    """
+    Durable queue of invoices which couldn't be created
+    while Robokassa was unavailable.
+
+    Jobs are kept in SQLite journal, so they are not lost on restart,
+    and are sent by drainer at most `rate` invoices per second
+    in order of enqueueing. While Robokassa is still unavailable,
+    the whole queue waits `retry_interval` seconds before the next try.
+
+    :param path: Path to journal file
+    :param rate: Invoices per second sent by drainer
+    :param retry_interval: Seconds the queue waits after try during outage
+    :param lease: Seconds after which job taken by crashed worker is sent again
+    :param on_complete: Callback `(job_id, url, error)` called for every finished job
+    """
+
+    def __init__(
+        self,
+        path: Union[str, PathLike],
+        rate: float = 5.0,
+        retry_interval: float = 30.0,
+        lease: float = 60.0,
+        on_complete: Optional[
+            Callable[[int, Optional[str], Optional[BaseException]], None]
+        ] = None,
+    ) -> None:
+        self._path = path
+        self.rate = rate
+        self.retry_interval = retry_interval
+        self.lease = lease
+        self.on_complete = on_complete
+
+        self._lock = threading.Lock()
+        self._connection = connect_sqlite(path)
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS invoice_outbox ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, "
+            "params TEXT NOT NULL, "
+            "status TEXT NOT NULL DEFAULT 'pending', "
+            "url TEXT, "
+            "error TEXT, "
+            "attempts INTEGER NOT NULL DEFAULT 0, "
+            "next_attempt_at REAL NOT NULL DEFAULT 0"
+            ")"
+        )
+
+        self._futures: Dict[int, Future] = {}
+        self._stop = threading.Event()
+        self._drainer: Optional[threading.Thread] = None
+        self._async_drainer: Optional[asyncio.Task] = None
+
+    def enqueue(self, params: Dict[str, Any]) -> int:
+        """
+        Put params of invoice to journal.
+
+        :param params: Params of `create_link_to_payment_page_by_invoice_id`
+        :return: ID of job
+        """
+        with self._lock:
+            cursor = self._connection.execute(
+                "INSERT INTO invoice_outbox (params) VALUES (?)",
+                (codec.dumps(params),),
+            )
+            self._futures[cursor.lastrowid] = Future()
+        return cursor.lastrowid
+
+    def future(self, job_id: int) -> Future:
+        """
+        Get future with link to payment page of job enqueued by this process.
+        """
+        return self._futures[job_id]
+
+    def pending_count(self) -> int:
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT COUNT(*) FROM invoice_outbox "
+                "WHERE status IN ('pending', 'sending')"
+            ).fetchone()
+        return row[0]
+
+    def result(self, job_id: int) -> Optional[str]:
+        """
+        Get link of job which was finished, also after restart.
+
+        :raise RobokassaInterfaceError: If Robokassa rejected the invoice
+        """
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT status, url, error FROM invoice_outbox WHERE id = ?",
+                (job_id,),
+            ).fetchone()
+        if row is None:
+            raise KeyError(job_id)
+
+        status, url, error = row
+        if status == "failed":
+            raise RobokassaInterfaceError(error)
+        return url
+
+    def _claim(self) -> Optional[OutboxJob]:
+        now = time.time()
+        with self._lock:
+            self._connection.execute("BEGIN IMMEDIATE")
+            try:
+                # the oldest job blocks the queue, so jobs are replayed
+                # in order and postponed job postpones the whole queue
+                row = self._connection.execute(
+                    "SELECT id, params, attempts, status, next_attempt_at "
+                    "FROM invoice_outbox WHERE status IN ('pending', 'sending') "
+                    "ORDER BY id LIMIT 1"
+                ).fetchone()
+                if row is not None:
+                    due_at = row[4] + (self.lease if row[3] == "sending" else 0)
+                    if due_at > now:
+                        row = None
+                if row is not None:
+                    self._connection.execute(
+                        "UPDATE invoice_outbox SET status = 'sending', "
+                        "attempts = attempts + 1, next_attempt_at = ? WHERE id = ?",
+                        (now, row[0]),
+                    )
+                self._connection.execute("COMMIT")
+            except BaseException:
+                self._connection.execute("ROLLBACK")
+                raise
+        if row is None:
+            return None
+        return OutboxJob(id=row[0], params=codec.loads(row[1]), attempts=row[2] + 1)
+
+    def _postpone(self, job: OutboxJob) -> None:
+        with self._lock:
+            self._connection.execute(
+                "UPDATE invoice_outbox SET status = 'pending', next_attempt_at = ? "
+                "WHERE id = ?",
+                (time.time() + self.retry_interval, job.id),
+            )
+
+    def _finish(
+        self,
+        job: OutboxJob,
+        url: Optional[str] = None,
+        error: Optional[BaseException] = None,
+    ) -> None:
+        with self._lock:
+            self._connection.execute(
+                "UPDATE invoice_outbox SET status = ?, url = ?, error = ? WHERE id = ?",
+                (
+                    "failed" if error else "done",
+                    url,
+                    str(error) if error else None,
+                    job.id,
+                ),
+            )
+            future = self._futures.pop(job.id, None)
+
+        if future is not None:
+            if error is None:
+                future.set_result(url)
+            else:
+                future.set_exception(error)
+        if self.on_complete is not None:
+            self.on_complete(job.id, url, error)
+
+    def drain_once(self, send: Callable[..., str]) -> bool:
+        """
+        Send one job.
+
+        :return: False if there was nothing to send or Robokassa is unavailable
+        """
+        job = self._claim()
+        if job is None:
+            return False
+        try:
+            url = send(**job.params)
+        except OUTAGE_ERRORS:
+            self._postpone(job)
+            return False
+        except RobokassaInterfaceError as exc:
+            self._finish(job, error=exc)
+        except Exception as exc:  # noqa: BLE001 - job must not stay claimed
+            logger.exception("Job %s of outbox failed", job.id)
+            self._finish(job, error=exc)
+        else:
+            self._finish(job, url=url)
+        return True
+
+    async def adrain_once(self, send: Callable[..., Awaitable[str]]) -> bool:
+        """
+        Send one job by async sender.
+
+        :return: False if there was nothing to send or Robokassa is unavailable
+        """
+        job = self._claim()
+        if job is None:
+            return False
+        try:
+            url = await send(**job.params)
+        except OUTAGE_ERRORS:
+            self._postpone(job)
+            return False
+        except RobokassaInterfaceError as exc:
+            self._finish(job, error=exc)
+        except Exception as exc:  # noqa: BLE001 - job must not stay claimed
+            logger.exception("Job %s of outbox failed", job.id)
+            self._finish(job, error=exc)
+        else:
+            self._finish(job, url=url)
+        return True
+
+    def start(self, send: Callable[..., str], idle_interval: float = 1.0) -> None:
+        """
+        Start drainer in a daemon thread.
+        """
+        if self._drainer is not None:
+            return
+
+        def drain() -> None:
+            while not self._stop.is_set():
+                try:
+                    sent = self.drain_once(send)
+                except Exception:  # noqa: BLE001 - e.g. journal is locked
+                    logger.exception("Drainer of outbox failed")
+                    sent = False
+                self._stop.wait(1 / self.rate if sent else idle_interval)
+
+        self._stop.clear()
+        self._drainer = threading.Thread(target=drain, daemon=True)
+        self._drainer.start()
+
+    def astart(
+        self, send: Callable[..., Awaitable[str]], idle_interval: float = 1.0
+    ) -> None:
+        """
+        Start drainer as a task of running event loop.
+        """
+        if self._async_drainer is not None and not self._async_drainer.done():
+            return
+
+        async def drain() -> None:
+            while True:
+                try:
+                    sent = await self.adrain_once(send)
+                except Exception:  # noqa: BLE001 - e.g. journal is locked
+                    logger.exception("Drainer of outbox failed")
+                    sent = False
+                await asyncio.sleep(1 / self.rate if sent else idle_interval)
+
+        self._async_drainer = asyncio.ensure_future(drain())
+
+    def stop(self) -> None:
+        if self._drainer is not None:
+            self._stop.set()
+            self._drainer.join()
+            self._drainer = None
+        if self._async_drainer is not None:
+            self._async_drainer.cancel()
+            self._async_drainer = None
+
+    def close(self) -> None:
+        self.stop()
+        with self._lock:
+            self._connection.close()
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(path={self._path!r})"
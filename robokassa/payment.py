@@ -1,50 +1,108 @@
-from typing import Dict, Any, Optional, Union
+from typing import Dict, Any, Iterable, List, Optional, Tuple, Union
 from urllib.parse import urlencode
 
-from httpx import Response
-
-from robokassa.connection import Requests
+from robokassa import protocol
+from robokassa.cache import InvoiceLinkCache, ScriptLinkCache
+from robokassa.connection import Requests, HttpConnection
+from robokassa.deadline import Deadline, TimeoutTypes
 from robokassa.hash import Hash
+from robokassa.receipt import Receipt, encode_receipt
+from robokassa.protocol import RobokassaRequest
+from robokassa.responses import HoldOperationResult, RecurringResult
+from robokassa.batch import run_batch
+from robokassa.settlement import HoldSettlement, SettlementAction
 from robokassa.signature import SignaturesChecker
-from robokassa.types import Signature, RobokassaParams
-from robokassa.utils import HttpResponseValidator
+from robokassa.types import BatchItemResult, Signature, RobokassaParams
+from robokassa.validation import validate_params, validate_script_link
 
 
 class PaymentRequests:
-    def __init__(self, http: Requests) -> None:
+    def __init__(self, http: HttpConnection) -> None:
         self.connection = http
-        self.payment_url = "https://auth.robokassa.ru/Merchant/Index"
-
-    def _serialize_payment_url(self, invoice_id: str) -> str:
-        return f"{self.payment_url}/{invoice_id}"
+        self.payment_url = protocol.PAYMENT_URL
 
-    def _make_post_request(self, data: dict) -> Response:
-        with self.connection as conn:
-            response = conn.post("Indexjson.aspx/?", data=data)
-            return response
+    def create_url_to_payment_page(
+        self,
+        robokassa_params: RobokassaParams,
+        timeout: Optional[TimeoutTypes] = None,
+        deadline: Optional[Deadline] = None,
+    ) -> str:
+        result = self.connection.send(
+            protocol.create_invoice(robokassa_params), timeout, deadline
+        )
+        return protocol.payment_page_url(result)
 
-    def create_url_to_payment_page(self, robokassa_params: RobokassaParams) -> str:
-        response = self._make_post_request(robokassa_params.as_dict())
-        validated_response = HttpResponseValidator(response).validate_http_response()
+    def charge_recurring(
+        self,
+        robokassa_params: RobokassaParams,
+        timeout: Optional[TimeoutTypes] = None,
+        deadline: Optional[Deadline] = None,
+    ) -> RecurringResult:
+        return self.connection.send(
+            protocol.charge_recurring(robokassa_params), timeout, deadline
+        )
 
-        invoice_id = validated_response["invoiceID"]
-        return self._serialize_payment_url(invoice_id)
+    def send_hold_operation(
+        self,
+        request: RobokassaRequest[HoldOperationResult],
+        timeout: Optional[TimeoutTypes] = None,
+        deadline: Optional[Deadline] = None,
+    ) -> HoldOperationResult:
+        result = self.connection.send(request, timeout, deadline)
+        result.raise_for_error()
+        return result
 
 
 class PaymentInterface:
     def __init__(self, http: Requests) -> None:
-        self._payment_requests = PaymentRequests(http)
+        self._payment_requests = PaymentRequests(http.connection)
 
-    def create_url_to_payment_page(self, robokassa_params: RobokassaParams) -> str:
-        return self._payment_requests.create_url_to_payment_page(robokassa_params)
+    def create_url_to_payment_page(
+        self,
+        robokassa_params: RobokassaParams,
+        timeout: Optional[TimeoutTypes] = None,
+        deadline: Optional[Deadline] = None,
+    ) -> str:
+        return self._payment_requests.create_url_to_payment_page(
+            robokassa_params, timeout, deadline
+        )
+
+    def charge_recurring(
+        self,
+        robokassa_params: RobokassaParams,
+        timeout: Optional[TimeoutTypes] = None,
+        deadline: Optional[Deadline] = None,
+    ) -> RecurringResult:
+        return self._payment_requests.charge_recurring(
+            robokassa_params, timeout, deadline
+        )
+
+    def send_hold_operation(
+        self,
+        request: RobokassaRequest[HoldOperationResult],
+        timeout: Optional[TimeoutTypes] = None,
+        deadline: Optional[Deadline] = None,
+    ) -> HoldOperationResult:
+        return self._payment_requests.send_hold_operation(request, timeout, deadline)
 
 
 class PaymentUrlGenerator:
-    def __init__(self, merchant_login: str, password: str, is_test: bool, hash_: Hash):
+    def __init__(
+        self,
+        merchant_login: str,
+        password: str,
+        is_test: bool,
+        hash_: Hash,
+        script_link_cache: Optional[ScriptLinkCache] = None,
+    ):
         self._merchant_login = merchant_login
         self._password = password
         self._is_test = is_test
         self._hash = hash_
+        self._script_link_cache = script_link_cache
+        self._fingerprint = ScriptLinkCache.fingerprint(
+            merchant_login, password, hash_.algorithm.value, is_test
+        )
 
         self._STATIC_URL = "https://auth.robokassa.ru/Merchant/Index.aspx"
 
@@ -82,8 +140,93 @@ class PaymentUrlGenerator:
         fail_url_method: Optional[str] = None,
         inv_id: Optional[int] = 0,
         description: Optional[str] = None,
+        receipt: Optional[Union[Receipt, str]] = None,
+        step_by_step: bool = False,
         **kwargs,
     ):
+        validate_script_link(
+            out_sum,
+            inv_id,
+            description,
+            result_url,
+            success_url,
+            success_url_method,
+            fail_url,
+            fail_url_method,
+        )
+        receipt = encode_receipt(receipt)
+        if self._script_link_cache is None:
+            return self._build_link(
+                out_sum,
+                default_prefix,
+                result_url,
+                success_url,
+                success_url_method,
+                fail_url,
+                fail_url_method,
+                inv_id,
+                description,
+                receipt,
+                step_by_step,
+                kwargs,
+            )
+
+        # params are compared as they are serialized to signature and link
+        key = (
+            *(
+                None if value is None else str(value)
+                for value in (
+                    out_sum,
+                    default_prefix,
+                    result_url,
+                    success_url,
+                    success_url_method,
+                    fail_url,
+                    fail_url_method,
+                    inv_id,
+                    description,
+                    receipt,
+                )
+            ),
+            bool(step_by_step),
+            *sorted((k, str(v)) for k, v in kwargs.items()),
+        )
+        url = self._script_link_cache.get(self._merchant_login, self._fingerprint, key)
+        if url is None:
+            url = self._build_link(
+                out_sum,
+                default_prefix,
+                result_url,
+                success_url,
+                success_url_method,
+                fail_url,
+                fail_url_method,
+                inv_id,
+                description,
+                receipt,
+                step_by_step,
+                kwargs,
+            )
+            self._script_link_cache.set(
+                self._merchant_login, self._fingerprint, key, url
+            )
+        return url
+
+    def _build_link(
+        self,
+        out_sum: Union[str, int, float],
+        default_prefix: str,
+        result_url: Optional[str],
+        success_url: Optional[str],
+        success_url_method: Optional[str],
+        fail_url: Optional[str],
+        fail_url_method: Optional[str],
+        inv_id: Optional[Union[str, int]],
+        description: Optional[str],
+        receipt: Optional[str],
+        step_by_step: bool,
+        kwargs: Dict[str, Any],
+    ) -> str:
         params = self._serialize_additional_params(default_prefix, kwargs)
         additional_params_for_url = sorted([f"{k}={v}" for k, v in params.items()])
 
@@ -91,6 +234,7 @@ class PaymentUrlGenerator:
             merchant_login=self._merchant_login,
             out_sum=out_sum,
             inv_id=inv_id,
+            receipt=receipt,
             password=self._password,
             result_url2=result_url,
             success_url2=success_url,
@@ -117,6 +261,8 @@ class PaymentUrlGenerator:
                 ("OutSum", out_sum),
                 ("InvId", inv_id),
                 ("Description", description),
+                ("Receipt", receipt),
+                ("StepByStep", "true" if step_by_step else None),
                 *urls_plus_methods.items(),
                 ("SignatureValue", signature),
                 ("IsTest", int(self._is_test)),
@@ -137,10 +283,14 @@ class PaymentLink:
         hash_: Hash,
         merchant_login: str,
         password1: str,
+        invoice_link_cache: Optional[InvoiceLinkCache] = None,
+        script_link_cache: Optional[ScriptLinkCache] = None,
     ) -> None:
         self._is_test = is_test
         self._merchant_login = merchant_login
         self._password = password1
+        self._invoice_link_cache = invoice_link_cache
+        self._script_link_cache = script_link_cache
 
         self._hash: Hash = hash_
 
@@ -152,18 +302,23 @@ class PaymentLink:
             password=password1,
             is_test=is_test,
             hash_=self._hash,
+            script_link_cache=script_link_cache,
         )
 
         self._STATIC_URL = "https://auth.robokassa.ru/Merchant/Index.aspx"
 
     def _create_signature(
-        self, inv_id: Union[str, int], out_sum: Union[str, int, float]
+        self,
+        inv_id: Union[str, int],
+        out_sum: Union[str, int, float],
+        receipt: Optional[str] = None,
     ) -> Signature:
         return Signature(
             merchant_login=self._merchant_login,
             password=self._password,
             inv_id=inv_id,
             out_sum=out_sum,
+            receipt=receipt,
             hash_=self._hash,
         )
 
@@ -178,6 +333,8 @@ class PaymentLink:
         fail_url_method: Optional[str] = None,
         inv_id: Optional[int] = 0,
         description: Optional[str] = None,
+        receipt: Optional[Union[Receipt, str]] = None,
+        step_by_step: bool = False,
         **kwargs,
     ) -> str:
         return self._payment_generator.generate_by_script(
@@ -190,6 +347,8 @@ class PaymentLink:
             fail_url_method=fail_url_method,
             inv_id=inv_id,
             description=description,
+            receipt=receipt,
+            step_by_step=step_by_step,
             **kwargs,
         )
 
@@ -198,16 +357,127 @@ class PaymentLink:
         inv_id: Optional[Union[int, str]],
         out_sum: Union[float, int, str],
         description: str,
+        expiration_date: Optional[str] = None,
+        receipt: Optional[Union[Receipt, str]] = None,
+        step_by_step: bool = False,
+        timeout: Optional[TimeoutTypes] = None,
+        deadline: Optional[Deadline] = None,
     ) -> str:
-        return self._payment_interface.create_url_to_payment_page(
-            RobokassaParams(
-                inv_id=inv_id,
-                out_sum=out_sum,
-                description=description,
-                merchant_login=self._merchant_login,
-                is_test=self._is_test,
-                signature_value=self._create_signature(inv_id, out_sum).value,
+        receipt = encode_receipt(receipt)
+        robokassa_params = RobokassaParams(
+            inv_id=inv_id,
+            out_sum=out_sum,
+            description=description,
+            merchant_login=self._merchant_login,
+            is_test=self._is_test,
+            expiration_date=expiration_date,
+            receipt=receipt,
+            step_by_step="true" if step_by_step else None,
+        )
+        validate_params(robokassa_params)
+        robokassa_params.signature_value = self._create_signature(
+            inv_id, out_sum, receipt
+        ).value
+        if self._invoice_link_cache is None or not self._invoice_link_cache.accepts(
+            inv_id, expiration_date
+        ):
+            return self._payment_interface.create_url_to_payment_page(
+                robokassa_params, timeout, deadline
+            )
+
+        key = self._invoice_link_cache.make_key(robokassa_params.as_dict())
+        url = self._invoice_link_cache.get(key)
+        if url is None:
+            url = self._payment_interface.create_url_to_payment_page(
+                robokassa_params, timeout, deadline
+            )
+            self._invoice_link_cache.set(key, url, expiration_date)
+        return url
+
+    def charge_recurring(
+        self,
+        previous_inv_id: Union[int, str],
+        inv_id: Union[int, str],
+        out_sum: Union[float, int, str],
+        description: Optional[str] = None,
+        receipt: Optional[Union[Receipt, str]] = None,
+        timeout: Optional[TimeoutTypes] = None,
+        deadline: Optional[Deadline] = None,
+    ) -> RecurringResult:
+        receipt = encode_receipt(receipt)
+        robokassa_params = RobokassaParams(
+            merchant_login=self._merchant_login,
+            inv_id=inv_id,
+            previous_inv_id=previous_inv_id,
+            out_sum=out_sum,
+            description=description,
+            receipt=receipt,
+        )
+        validate_params(robokassa_params)
+        robokassa_params.signature_value = self._create_signature(
+            inv_id, out_sum, receipt
+        ).value
+        return self._payment_interface.charge_recurring(
+            robokassa_params, timeout, deadline
+        )
+
+    def confirm_hold(
+        self,
+        inv_id: Union[int, str],
+        out_sum: Union[float, int, str],
+        receipt: Optional[Union[Receipt, str]] = None,
+        timeout: Optional[TimeoutTypes] = None,
+        deadline: Optional[Deadline] = None,
+    ) -> HoldOperationResult:
+        receipt = encode_receipt(receipt)
+        request = protocol.confirm_hold(
+            self._merchant_login,
+            inv_id,
+            out_sum,
+            self._create_signature(inv_id, out_sum, receipt).value,
+            receipt,
+        )
+        return self._payment_interface.send_hold_operation(request, timeout, deadline)
+
+    def cancel_hold(
+        self,
+        inv_id: Union[int, str],
+        timeout: Optional[TimeoutTypes] = None,
+        deadline: Optional[Deadline] = None,
+    ) -> HoldOperationResult:
+        # OutSum is empty in signature of cancellation
+        request = protocol.cancel_hold(
+            self._merchant_login, inv_id, self._create_signature(inv_id, "").value
+        )
+        return self._payment_interface.send_hold_operation(request, timeout, deadline)
+
+    def settle(
+        self,
+        settlement: HoldSettlement,
+        timeout: Optional[TimeoutTypes] = None,
+        deadline: Optional[Deadline] = None,
+    ) -> HoldOperationResult:
+        if settlement.action is SettlementAction.confirm:
+            return self.confirm_hold(
+                settlement.inv_id,
+                settlement.out_sum,
+                settlement.receipt,
+                timeout,
+                deadline,
             )
+        return self.cancel_hold(settlement.inv_id, timeout, deadline)
+
+    def settle_holds(
+        self,
+        settlements: Iterable[Union[HoldSettlement, Tuple[Any, ...]]],
+        max_workers: int = 8,
+        rate: Optional[float] = None,
+    ) -> List[BatchItemResult]:
+        return run_batch(
+            settlements,
+            lambda record: self.settle(HoldSettlement.from_record(record)),
+            max_workers,
+            rate,
         )
 
 
@@ -220,12 +490,16 @@ class Payment:
         merchant_login: str,
         password1: str,
         password2: str,
+        invoice_link_cache: Optional[InvoiceLinkCache] = None,
+        script_link_cache: Optional[ScriptLinkCache] = None,
     ) -> None:
         self._is_test = is_test
         self._hash = hash_
         self._merchant_login = merchant_login
         self._password1 = password1
         self._password2 = password2
+        self._invoice_link_cache = invoice_link_cache
+        self._script_link_cache = script_link_cache
 
         self.__http = http
 
@@ -237,6 +511,8 @@ class Payment:
             hash_=self._hash,
             merchant_login=self._merchant_login,
             password1=self._password1,
+            invoice_link_cache=self._invoice_link_cache,
+            script_link_cache=self._script_link_cache,
         )
 
     @property
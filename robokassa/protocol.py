@@ -0,0 +1,242 @@
+"""
+Sans-IO core of Robokassa protocol.
+
+Functions of this module turn intents into request descriptors
+and descriptors parse status code and raw content of response
+into results. Nothing here does I/O, so the same core is used
+by sync and async connections and can be driven by any other
+transport or event loop:
+
+    request = protocol.get_currencies("demo", "en")
+    response = my_transport.post(request.url, data=request.data)
+    result = request.parse(response.status_code, response.content)
+"""
+
+from typing import Any, Dict, Generic, Optional, Type, TypeVar, Union
+
+from robokassa import codec
+from robokassa.exceptions import RobokassaUnavailableError
+from robokassa.responses import (
+    CurrenciesResult,
+    HoldOperationResult,
+    InvoiceApiResult,
+    InvoiceCreationResult,
+    InvoiceListResult,
+    LazyResult,
+    OperationStateResult,
+    RecurringResult,
+    RefundCreationResult,
+    RefundStateResult,
+)
+from robokassa.types import RobokassaParams
+
+R = TypeVar("R", bound=LazyResult)
+
+PAYMENT_URL = "https://auth.robokassa.ru/Merchant/Index"
+REFUND_URL = "https://services.robokassa.ru/RefundService/Refund"
+INVOICE_API_URL = "https://services.robokassa.ru/InvoiceServiceWebApi/api"
+
+
+class RobokassaRequest(Generic[R]):
+    """
+    Descriptor of request to Robokassa.
+
+    :param url: URL relative to `https://auth.robokassa.ru/Merchant` or absolute one
+    :param data: Form data of POST request
+    :param result_class: Class of result which response is parsed to
+    :param idempotent: If request can be safely sent again
+    :param method: HTTP method
+    :param content: Raw body used instead of form data
+    :param params: Query params
+    :param headers: HTTP headers
+    """
+
+    __slots__ = (
+        "url",
+        "data",
+        "result_class",
+        "idempotent",
+        "method",
+        "content",
+        "params",
+        "headers",
+    )
+
+    def __init__(
+        self,
+        url: str,
+        data: Optional[Dict[str, Any]],
+        result_class: Type[R],
+        idempotent: bool = False,
+        method: str = "POST",
+        content: Optional[bytes] = None,
+        params: Optional[Dict[str, Any]] = None,
+        headers: Optional[Dict[str, str]] = None,
+    ) -> None:
+        self.url = url
+        self.data = data
+        self.result_class = result_class
+        self.idempotent = idempotent
+        self.method = method
+        self.content = content
+        self.params = params
+        self.headers = headers
+
+    def parse(self, status_code: int, content: bytes) -> R:
+        """
+        :raise RobokassaUnavailableError: If Robokassa didn't process request
+        """
+        if status_code != 200:
+            raise RobokassaUnavailableError(
+                "RobokassaInterface servers are unavailable. Please try again later."
+            )
+        return self.result_class(content)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self.method} {self.url})"
+
+
+def create_invoice(
+    robokassa_params: RobokassaParams,
+) -> RobokassaRequest[InvoiceCreationResult]:
+    return RobokassaRequest(
+        "Indexjson.aspx", robokassa_params.as_dict(), InvoiceCreationResult
+    )
+
+
+def payment_page_url(result: InvoiceCreationResult) -> str:
+    """
+    :raise RobokassaInterfaceError: If Robokassa didn't create invoice
+    """
+    return f"{PAYMENT_URL}/{result.invoice_id}"
+
+
+def get_currencies(
+    merchant_login: str, language: str
+) -> RobokassaRequest[CurrenciesResult]:
+    return RobokassaRequest(
+        "WebService/Service.asmx/GetCurrencies",
+        {"MerchantLogin": merchant_login, "Language": language},
+        CurrenciesResult,
+        idempotent=True,
+    )
+
+
+def get_operation_state(
+    merchant_login: str, invoice_id: Union[int, str], signature_value: str
+) -> RobokassaRequest[OperationStateResult]:
+    """
+    :param signature_value: MerchantLogin:InvoiceID:Password#2
+    """
+    return RobokassaRequest(
+        "WebService/Service.asmx/OpStateExt",
+        {
+            "MerchantLogin": merchant_login,
+            "InvoiceID": invoice_id,
+            "Signature": signature_value,
+        },
+        OperationStateResult,
+        idempotent=True,
+    )
+
+
+def charge_recurring(
+    robokassa_params: RobokassaParams,
+) -> RobokassaRequest[RecurringResult]:
+    """
+    :param robokassa_params: Params of new invoice with `previous_inv_id`
+    """
+    data = robokassa_params.as_dict()
+    # test mode is not supported by recurring payments
+    data.pop("IsTest", None)
+    data["InvoiceID"] = data.pop("InvId")
+    return RobokassaRequest("Recurring", data, RecurringResult)
+
+
+def confirm_hold(
+    merchant_login: str,
+    invoice_id: Union[int, str],
+    out_sum: Union[float, int, str],
+    signature_value: str,
+    receipt: Optional[str] = None,
+) -> RobokassaRequest[HoldOperationResult]:
+    """
+    :param signature_value: MerchantLogin:OutSum:InvoiceID[:Receipt]:Password#1
+    """
+    data = {
+        "MerchantLogin": merchant_login,
+        "InvoiceID": invoice_id,
+        "OutSum": out_sum,
+        "SignatureValue": signature_value,
+    }
+    if receipt is not None:
+        data["Receipt"] = receipt
+    return RobokassaRequest("Payment/Confirm", data, HoldOperationResult)
+
+
+def cancel_hold(
+    merchant_login: str, invoice_id: Union[int, str], signature_value: str
+) -> RobokassaRequest[HoldOperationResult]:
+    """
+    :param signature_value: MerchantLogin::InvoiceID:Password#1
+    """
+    return RobokassaRequest(
+        "Payment/Cancel",
+        {
+            "MerchantLogin": merchant_login,
+            "InvoiceID": invoice_id,
+            "SignatureValue": signature_value,
+        },
+        HoldOperationResult,
+    )
+
+
+def create_refund(token: str) -> RobokassaRequest[RefundCreationResult]:
+    """
+    :param token: JWT with OpKey, RefundSum and InvoiceItems signed by Password#3
+    """
+    return RobokassaRequest(
+        f"{REFUND_URL}/Create", None, RefundCreationResult, content=token.encode()
+    )
+
+
+def get_refund_state(request_id: str) -> RobokassaRequest[RefundStateResult]:
+    return RobokassaRequest(
+        f"{REFUND_URL}/GetState",
+        None,
+        RefundStateResult,
+        idempotent=True,
+        method="GET",
+        params={"id": request_id},
+    )
+
+
+def _invoice_api_request(
+    method: str, token: str, result_class: Type[R], idempotent: bool = False
+) -> RobokassaRequest[R]:
+    # token is sent as JSON string
+    return RobokassaRequest(
+        f"{INVOICE_API_URL}/{method}",
+        None,
+        result_class,
+        idempotent=idempotent,
+        content=codec.dumps(token).encode(),
+        headers={"Content-Type": "application/json"},
+    )
+
+
+def create_invoice_by_api(token: str) -> RobokassaRequest[InvoiceApiResult]:
+    """
+    :param token: JWT with params of invoice signed by MerchantLogin:Password#1
+    """
+    return _invoice_api_request("CreateInvoice", token, InvoiceApiResult)
+
+
+def deactivate_invoice(token: str) -> RobokassaRequest[InvoiceApiResult]:
+    return _invoice_api_request("DeactivateInvoice", token, InvoiceApiResult)
+
+
+def list_invoices(token: str) -> RobokassaRequest[InvoiceListResult]:
+    return _invoice_api_request(
+        "GetInvoiceInformationList", token, InvoiceListResult, idempotent=True
+    )
@@ -0,0 +1,143 @@
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple, Union
+from urllib.parse import quote
+
+from robokassa import codec
+
+
+def _encode(value: str) -> str:
+    return quote(value, safe="")
+
+
+@dataclass(frozen=True)
+class ReceiptItem:
+    """
+    Catalog item of fiscal receipt (54-FZ).
+    Fields of item which don't depend on order.
+
+    :param name: Name of item, up to 128 characters
+    :param tax: `none`, `vat0`, `vat10`, `vat110`, `vat20`, `vat120`
+    :param payment_method: `full_prepayment`, `full_payment`, etc.
+    :param payment_object: `commodity`, `service`, etc.
+    :param extra: Other fields of item, like `nomenclature_code`
+    """
+
+    name: str
+    tax: str
+    payment_method: Optional[str] = None
+    payment_object: Optional[str] = None
+    extra: Tuple[Tuple[str, Any], ...] = field(default=())
+
+    def as_dict(self) -> Dict[str, Any]:
+        data = {
+            "name": self.name,
+            "payment_method": self.payment_method,
+            "payment_object": self.payment_object,
+            "tax": self.tax,
+            **dict(self.extra),
+        }
+        return {k: v for k, v in data.items() if v is not None}
+
+
+class ReceiptTemplateCache:
+    """
+    Cache of serialized and percent-encoded catalog items.
+
+    JSON of item is opened fragment without quantity and sum,
+    so it's encoded once and only numbers of order are encoded
+    for every receipt. Percent-encoding is done per character,
+    so encoded fragments can be joined as is.
+
+    :param maxsize: Max count of cached items
+    """
+
+    def __init__(self, maxsize: Optional[int] = 10_000) -> None:
+        self.maxsize = maxsize
+        self.fragment = lru_cache(maxsize=maxsize)(self._compile)
+
+    @staticmethod
+    def _compile(item: ReceiptItem) -> str:
+        # drop closing brace, quantity and sum are added by receipt
+        return _encode(codec.dumps(item.as_dict())[:-1])
+
+    def cache_info(self):
+        return self.fragment.cache_info()
+
+    def clear(self) -> None:
+        self.fragment.cache_clear()
+
+
+_default_template_cache = ReceiptTemplateCache()
+
+
+class Receipt:
+    """
+    Fiscal receipt which is sent as `Receipt` param of payment.
+
+    :param sno: Tax system of shop, `osn`, `usn_income`, etc.
+    :param template_cache: Cache of catalog items, shared one by default
+    """
+
+    def __init__(
+        self,
+        sno: Optional[str] = None,
+        template_cache: Optional[ReceiptTemplateCache] = None,
+    ) -> None:
+        self.sno = sno
+        self._template_cache = template_cache or _default_template_cache
+        self._items: List[Tuple[ReceiptItem, Union[int, float], float]] = []
+
+    def add(
+        self, item: ReceiptItem, quantity: Union[int, float], sum_: float
+    ) -> "Receipt":
+        """
+        Add item to receipt.
+
+        :param item: Catalog item
+        :param quantity: Quantity of item
+        :param sum_: Total sum of position in rubles
+        """
+        self._items.append((item, quantity, sum_))
+        return self
+
+    def as_dict(self) -> Dict[str, Any]:
+        data: Dict[str, Any] = {} if self.sno is None else {"sno": self.sno}
+        data["items"] = [
+            {**item.as_dict(), "quantity": quantity, "sum": sum_}
+            for item, quantity, sum_ in self._items
+        ]
+        return data
+
+    def encode(self) -> str:
+        """
+        Percent-encoded JSON of receipt, the same for link and signature.
+        """
+        fragment = self._template_cache.fragment
+        items = _encode(",").join(
+            fragment(item)
+            + _encode(
+                f',"quantity":{codec.dumps(quantity)},"sum":{codec.dumps(sum_)}}}'
+            )
+            for item, quantity, sum_ in self._items
+        )
+        if self.sno is None:
+            head = '{"items":['
+        else:
+            head = f'{{"sno":{codec.dumps(self.sno)},"items":['
+        return f"{_encode(head)}{items}{_encode(']}')}"
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(sno={self.sno!r}, items={len(self)})"
+
+
+def encode_receipt(receipt: Optional[Union[Receipt, str]]) -> Optional[str]:
+    """
+    :param receipt: Receipt or already percent-encoded JSON of receipt
+    """
+    if receipt is None or isinstance(receipt, str):
+        return receipt
+    return receipt.encode()
@@ -0,0 +1,400 @@
+import contextvars
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from enum import Enum
+from os import PathLike
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple, Union
+
+import httpx
+
+from robokassa.exceptions import (
+    DeadlineExceededError,
+    RobokassaInterfaceError,
+    RobokassaUnavailableError,
+)
+from robokassa.storage import connect_sqlite
+
+# request of these errors surely didn't reach Robokassa,
+# DeadlineExceededError is such one only unless it's `sent`
+NOT_SENT_ERRORS = (
+    httpx.ConnectError,
+    httpx.ConnectTimeout,
+    httpx.PoolTimeout,
+)
+
+# errors of one charge, others stop the run and charge stays `sending`
+CHARGE_ERRORS = (httpx.HTTPError, OSError, ValueError, RobokassaInterfaceError)
+
+# OpStateExt result code of unknown InvoiceID
+OPERATION_NOT_FOUND = 3
+
+
+class ChargeStatus(Enum):
+    pending = "pending"
+    sending = "sending"
+    accepted = "accepted"
+    rejected = "rejected"
+    unknown = "unknown"
+
+
+# charge could reach Robokassa, it's sent again only if Robokassa doesn't know it
+UNCERTAIN_STATUSES = (ChargeStatus.sending, ChargeStatus.unknown)
+
+
+@dataclass(frozen=True)
+class RecurringCharge:
+    """
+    Charge of subscriber by recurring payment.
+
+    :param previous_inv_id: InvId of the first payment of subscription
+    :param inv_id: InvId of new payment, unique for every charge
+    :param out_sum:
+    :param description: Shop description
+    :param receipt: Percent-encoded JSON of fiscal receipt
+    """
+
+    previous_inv_id: Union[int, str]
+    inv_id: Union[int, str]
+    out_sum: Union[float, int, str]
+    description: Optional[str] = None
+    receipt: Optional[str] = None
+
+    @classmethod
+    def from_record(
+        cls, record: Union["RecurringCharge", Tuple[Any, ...]]
+    ) -> "RecurringCharge":
+        if isinstance(record, cls):
+            return record
+        return cls(*record)
+
+    def params(self) -> Dict[str, Any]:
+        return {
+            "previous_inv_id": self.previous_inv_id,
+            "inv_id": self.inv_id,
+            "out_sum": self.out_sum,
+            "description": self.description,
+            "receipt": self.receipt,
+        }
+
+
+@dataclass
+class ChargeOutcome:
+    inv_id: Union[int, str]
+    status: ChargeStatus
+    error: Optional[BaseException] = None
+    skipped: bool = False
+
+
+@dataclass
+class RecurringReport:
+    """
+    Counts of charges processed by one run.
+    Charges which were finished by earlier runs are `skipped`.
+    """
+
+    statuses: Dict[ChargeStatus, int] = field(default_factory=dict)
+    skipped: int = 0
+
+    def add(self, outcome: ChargeOutcome) -> None:
+        if outcome.skipped:
+            self.skipped += 1
+        else:
+            self.statuses[outcome.status] = self.statuses.get(outcome.status, 0) + 1
+
+    def __getitem__(self, status: ChargeStatus) -> int:
+        return self.statuses.get(status, 0)
+
+
+class RecurringJournal:
+    """
+    Checkpoint journal of recurring charges.
+
+    Charge is marked `sending` before request, so after crash it's
+    known which charges could be sent. Such charges are not sent
+    again until Robokassa confirms it doesn't know about them.
+    `updated_at` of such charges is time of the last send.
+    One journal is used by one runner at a time.
+
+    :param path: Path to journal file
+    """
+
+    def __init__(self, path: Union[str, PathLike]) -> None:
+        self._path = path
+
+        self._lock = threading.Lock()
+        self._connection = connect_sqlite(path)
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS recurring_charges ("
+            "inv_id TEXT PRIMARY KEY, "
+            "previous_inv_id TEXT NOT NULL, "
+            "out_sum TEXT NOT NULL, "
+            "status TEXT NOT NULL, "
+            "error TEXT, "
+            "attempts INTEGER NOT NULL DEFAULT 0, "
+            "updated_at REAL NOT NULL"
+            ")"
+        )
+
+    def claim(self, charge: RecurringCharge) -> Optional[ChargeStatus]:
+        """
+        Mark new or pending charge as `sending`.
+
+        :return: Status of charge before claim, None for new charge
+        """
+        with self._lock:
+            self._connection.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._connection.execute(
+                    "SELECT status FROM recurring_charges WHERE inv_id = ?",
+                    (str(charge.inv_id),),
+                ).fetchone()
+                previous = None if row is None else ChargeStatus(row[0])
+                if previous is None:
+                    self._connection.execute(
+                        "INSERT INTO recurring_charges "
+                        "(inv_id, previous_inv_id, out_sum, status, attempts, updated_at) "
+                        "VALUES (?, ?, ?, 'sending', 1, ?)",
+                        (
+                            str(charge.inv_id),
+                            str(charge.previous_inv_id),
+                            str(charge.out_sum),
+                            time.time(),
+                        ),
+                    )
+                elif previous is ChargeStatus.pending:
+                    self._connection.execute(
+                        "UPDATE recurring_charges SET status = 'sending', "
+                        "attempts = attempts + 1, updated_at = ? WHERE inv_id = ?",
+                        (time.time(), str(charge.inv_id)),
+                    )
+                self._connection.execute("COMMIT")
+            except BaseException:
+                self._connection.execute("ROLLBACK")
+                raise
+        return previous
+
+    def finish(
+        self,
+        inv_id: Union[int, str],
+        status: ChargeStatus,
+        error: Optional[BaseException] = None,
+        touch: bool = True,
+    ) -> None:
+        """
+        :param touch: Update `updated_at`, status set by reconciliation
+            keeps time of the last send
+        """
+        with self._lock:
+            self._connection.execute(
+                "UPDATE recurring_charges SET status = ?, error = ?, "
+                "updated_at = COALESCE(?, updated_at) WHERE inv_id = ?",
+                (
+                    status.value,
+                    None if error is None else f"{type(error).__name__}: {error}",
+                    time.time() if touch else None,
+                    str(inv_id),
+                ),
+            )
+
+    def status(self, inv_id: Union[int, str]) -> Optional[ChargeStatus]:
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT status FROM recurring_charges WHERE inv_id = ?",
+                (str(inv_id),),
+            ).fetchone()
+        return None if row is None else ChargeStatus(row[0])
+
+    def updated_at(self, inv_id: Union[int, str]) -> Optional[float]:
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT updated_at FROM recurring_charges WHERE inv_id = ?",
+                (str(inv_id),),
+            ).fetchone()
+        return None if row is None else row[0]
+
+    def charges(self, status: ChargeStatus) -> List[str]:
+        """
+        InvId of charges with status, e.g. `unknown` ones for manual check.
+        """
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT inv_id FROM recurring_charges WHERE status = ? ORDER BY rowid",
+                (status.value,),
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def counts(self) -> Dict[ChargeStatus, int]:
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT status, COUNT(*) FROM recurring_charges GROUP BY status"
+            ).fetchall()
+        return {ChargeStatus(status): count for status, count in rows}
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(path={self._path!r})"
+
+
+class BaseRecurringRunner:
+    """
+    :param client: Sync or async Robokassa client
+    :param journal: Checkpoint journal of charges
+    :param concurrency: Max count of charges sent at the same time
+    :param reconcile: Ask OpStateExt about charges interrupted by crash
+        or failed with unknown result, before sending them again
+    :param not_found_grace: Seconds since the last send during which
+        charge unknown by OpStateExt stays `unknown` instead of being sent again,
+        Robokassa may not know yet about charge which is still processed
+    """
+
+    def __init__(
+        self,
+        client: Any,
+        journal: RecurringJournal,
+        concurrency: int = 8,
+        reconcile: bool = True,
+        not_found_grace: float = 900.0,
+    ) -> None:
+        if concurrency < 1:
+            raise ValueError("Concurrency must be positive")
+
+        self.client = client
+        self.journal = journal
+        self.concurrency = concurrency
+        self.reconcile = reconcile
+        self.not_found_grace = not_found_grace
+
+    @staticmethod
+    def _status_of_error(error: BaseException) -> ChargeStatus:
+        if isinstance(error, NOT_SENT_ERRORS):
+            return ChargeStatus.pending
+        if isinstance(error, DeadlineExceededError):
+            # charge could be accepted while response was awaited
+            return ChargeStatus.unknown if error.sent else ChargeStatus.pending
+        if isinstance(error, (RobokassaUnavailableError, httpx.TransportError)):
+            # request could be processed before connection was lost
+            return ChargeStatus.unknown
+        if isinstance(error, RobokassaInterfaceError):
+            return ChargeStatus.rejected
+        return ChargeStatus.unknown
+
+    def _status_of_state(
+        self, charge: RecurringCharge, state: Dict[str, Any]
+    ) -> Optional[ChargeStatus]:
+        """
+        :return: None if Robokassa doesn't know the charge and it can be sent
+        """
+        code = int((state.get("Result") or {}).get("Code", -1))
+        if code == 0:
+            return ChargeStatus.accepted
+        if code == OPERATION_NOT_FOUND:
+            sent_at = self.journal.updated_at(charge.inv_id)
+            if sent_at is None or time.time() - sent_at >= self.not_found_grace:
+                return None
+        return ChargeStatus.unknown
+
+    def _reconciled_outcome(
+        self, charge: RecurringCharge, state: Optional[Dict[str, Any]]
+    ) -> Optional[ChargeOutcome]:
+        """
+        :param state: Result of OpStateExt, None if it failed
+        :return: None if charge can be sent again
+        """
+        status = (
+            ChargeStatus.unknown
+            if state is None
+            else self._status_of_state(charge, state)
+        )
+        if status is None:
+            return None
+        self.journal.finish(charge.inv_id, status, touch=False)
+        return ChargeOutcome(charge.inv_id, status)
+
+    def _outcome_of_claim(
+        self, charge: RecurringCharge, previous: Optional[ChargeStatus]
+    ) -> Optional[ChargeOutcome]:
+        """
+        :return: Outcome of charge which must not be sent
+        """
+        if previous is None or previous is ChargeStatus.pending:
+            return None
+        if previous in UNCERTAIN_STATUSES and self.reconcile:
+            return None
+        if previous is ChargeStatus.sending:
+            self.journal.finish(charge.inv_id, ChargeStatus.unknown)
+            return ChargeOutcome(charge.inv_id, ChargeStatus.unknown)
+        return ChargeOutcome(charge.inv_id, previous, skipped=True)
+
+    def _finish(
+        self, charge: RecurringCharge, error: Optional[BaseException] = None
+    ) -> ChargeOutcome:
+        status = (
+            ChargeStatus.accepted if error is None else self._status_of_error(error)
+        )
+        self.journal.finish(charge.inv_id, status, error)
+        return ChargeOutcome(charge.inv_id, status, error)
+
+
+class RecurringRunner(BaseRecurringRunner):
+    """
+    Runner of recurring charges of sync client in a thread pool.
+    Run can be repeated with the same records after crash,
+    already accepted or rejected charges are skipped.
+    """
+
+    def _reconciled(self, charge: RecurringCharge) -> Optional[ChargeOutcome]:
+        try:
+            state = self.client.get_operation_state(charge.inv_id)
+        except (RobokassaInterfaceError, httpx.HTTPError):
+            state = None
+        return self._reconciled_outcome(charge, state)
+
+    def charge(self, charge: RecurringCharge) -> ChargeOutcome:
+        previous = self.journal.claim(charge)
+        outcome = self._outcome_of_claim(charge, previous)
+        if outcome is not None:
+            return outcome
+        if previous in UNCERTAIN_STATUSES:
+            outcome = self._reconciled(charge)
+            if outcome is not None:
+                return outcome
+
+        try:
+            self.client.charge_recurring(**charge.params())
+        except CHARGE_ERRORS as exc:
+            return self._finish(charge, exc)
+        return self._finish(charge)
+
+    def run(
+        self, records: Iterable[Union[RecurringCharge, Tuple[Any, ...]]]
+    ) -> RecurringReport:
+        """
+        Charge all records, only `concurrency` records are read ahead.
+
+        :param records: Charges or `(previous_inv_id, inv_id, out_sum)` tuples
+        """
+        report = RecurringReport()
+        with ThreadPoolExecutor(
+            max_workers=self.concurrency, thread_name_prefix="robokassa-recurring"
+        ) as executor:
+            pending: Set[Future] = set()
+            for record in records:
+                if len(pending) >= self.concurrency:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        report.add(future.result())
+                pending.add(
+                    executor.submit(
+                        contextvars.copy_context().run,
+                        self.charge,
+                        RecurringCharge.from_record(record),
+                    )
+                )
+            for future in wait(pending).done:
+                report.add(future.result())
+        return report
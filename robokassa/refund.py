@@ -0,0 +1,50 @@
+from typing import Any, Dict, List, Optional, Union
+
+from robokassa import protocol
+from robokassa.connection import Requests
+from robokassa.deadline import Deadline, TimeoutTypes
+from robokassa.jwt import JWTSigner
+from robokassa.responses import RefundCreationResult, RefundStateResult
+
+
+def refund_payload(
+    op_key: str,
+    refund_sum: Optional[Union[float, int]] = None,
+    invoice_items: Optional[List[Dict[str, Any]]] = None,
+) -> Dict[str, Any]:
+    """
+    :param op_key: OpKey of operation, it's returned by OpStateExt
+    :param refund_sum: Sum to refund, the whole sum of operation by default
+    :param invoice_items: Refunded items of receipt
+    """
+    payload: Dict[str, Any] = {"OpKey": op_key}
+    if refund_sum is not None:
+        payload["RefundSum"] = refund_sum
+    if invoice_items is not None:
+        payload["InvoiceItems"] = invoice_items
+    return payload
+
+
+class Refund:
+    def __init__(self, http: Requests, signer: JWTSigner) -> None:
+        self._http = http.connection
+        self._signer = signer
+
+    def create(
+        self,
+        op_key: str,
+        refund_sum: Optional[Union[float, int]] = None,
+        invoice_items: Optional[List[Dict[str, Any]]] = None,
+        timeout: Optional[TimeoutTypes] = None,
+        deadline: Optional[Deadline] = None,
+    ) -> RefundCreationResult:
+        token = self._signer.sign(refund_payload(op_key, refund_sum, invoice_items))
+        return self._http.send(protocol.create_refund(token), timeout, deadline)
+
+    def get_state(
+        self,
+        request_id: str,
+        timeout: Optional[TimeoutTypes] = None,
+        deadline: Optional[Deadline] = None,
+    ) -> RefundStateResult:
+        return self._http.send(protocol.get_refund_state(request_id), timeout, deadline)
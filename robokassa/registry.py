@@ -0,0 +1,348 @@
+import json
+import os
+import threading
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from os import PathLike
+from typing import Any, Dict, Iterable, Optional, Union
+
+from robokassa.cache import InvoiceLinkCache, ScriptLinkCache
+from robokassa.deadline import Deadline, TimeoutTypes
+from robokassa.connection import Requests
+from robokassa.exceptions import UnknownMerchantError
+from robokassa.hash import Hash, HashAlgorithm
+from robokassa.hedging import HedgingPolicy
+from robokassa.merchant import Merchant
+from robokassa.payment import Payment, PaymentLink
+from robokassa.receipt import Receipt
+from robokassa.signature import SignaturesChecker
+
+
+@dataclass(frozen=True)
+class MerchantCredentials:
+    merchant_login: str
+    password1: str
+    password2: str
+    algorithm: HashAlgorithm = HashAlgorithm.md5
+    is_test: bool = False
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "MerchantCredentials":
+        return cls(
+            merchant_login=data["merchant_login"],
+            password1=data["password1"],
+            password2=data["password2"],
+            algorithm=HashAlgorithm(data.get("algorithm", HashAlgorithm.md5.value)),
+            is_test=bool(data.get("is_test", False)),
+        )
+
+
+@dataclass(frozen=True)
+class MerchantEntry:
+    credentials: MerchantCredentials
+    payment: Any
+    link: Any
+    check: SignaturesChecker
+    merchant: Any
+
+
+class BaseMerchantRegistry(ABC):
+    """
+    Registry of many shops which share one connection pool
+    and one set of hash engines.
+
+    Entries are kept in a dict which is replaced as a whole on reload,
+    so lookups by MerchantLogin don't take any locks.
+    """
+
+    def __init__(
+        self,
+        credentials: Iterable[MerchantCredentials] = (),
+        path: Optional[Union[str, PathLike]] = None,
+        invoice_link_cache: Optional[InvoiceLinkCache] = None,
+        timeout: Optional[TimeoutTypes] = None,
+        hedging: Optional[HedgingPolicy] = None,
+        script_link_cache: Optional[ScriptLinkCache] = None,
+    ) -> None:
+        self._path = path
+        self._invoice_link_cache = invoice_link_cache
+        self._script_link_cache = script_link_cache
+        self._timeout = timeout
+        self._hedging = hedging
+
+        self._http = self._init_http_connection()
+        self._hashes: Dict[HashAlgorithm, Hash] = {
+            algorithm: Hash(algorithm) for algorithm in HashAlgorithm
+        }
+
+        self._reload_lock = threading.Lock()
+        self._mtime: Optional[float] = None
+        self._watcher: Optional[threading.Thread] = None
+        self._stop_watching = threading.Event()
+
+        self._entries: Dict[str, MerchantEntry] = {}
+        if path is not None:
+            self.reload()
+        else:
+            self.replace(credentials)
+
+    @classmethod
+    def from_file(cls, path: Union[str, PathLike], **kwargs: Any):
+        """
+        Create registry from JSON file with list of credentials:
+
+        `[{"merchant_login": "shop", "password1": "...", "password2": "...",
+        "algorithm": "sha256", "is_test": false}]`
+        """
+        return cls(path=path, **kwargs)
+
+    @abstractmethod
+    def _init_http_connection(self) -> Any:
+        pass
+
+    @abstractmethod
+    def _init_payment(self, credentials: MerchantCredentials, hash_: Hash) -> Any:
+        pass
+
+    @abstractmethod
+    def _init_merchant(self, credentials: MerchantCredentials) -> Any:
+        pass
+
+    def _build_entry(self, credentials: MerchantCredentials) -> MerchantEntry:
+        payment = self._init_payment(credentials, self._hashes[credentials.algorithm])
+        return MerchantEntry(
+            credentials=credentials,
+            payment=payment,
+            link=payment.link,
+            check=payment.check,
+            merchant=self._init_merchant(credentials),
+        )
+
+    def replace(self, credentials: Iterable[MerchantCredentials]) -> None:
+        """
+        Replace all merchants of registry.
+        Entries of merchants with unchanged credentials are reused.
+        """
+        with self._reload_lock:
+            current = self._entries
+            entries = {}
+            for item in credentials:
+                entry = current.get(item.merchant_login)
+                if entry is None or entry.credentials != item:
+                    entry = self._build_entry(item)
+                entries[item.merchant_login] = entry
+            self._entries = entries
+
+    def reload(self) -> None:
+        """
+        Read credentials from file of registry.
+        """
+        if self._path is None:
+            raise ValueError("Registry was created without a credentials file")
+
+        mtime = os.stat(self._path).st_mtime
+        with open(self._path, encoding="utf-8") as file:
+            data = json.load(file)
+        self.replace(MerchantCredentials.from_dict(item) for item in data)
+        self._mtime = mtime
+
+    def reload_if_changed(self) -> bool:
+        """
+        Reload credentials if file was modified after the last reading.
+
+        :return: True if credentials were reloaded
+        """
+        if self._path is None or os.stat(self._path).st_mtime == self._mtime:
+            return False
+        self.reload()
+        return True
+
+    def start_auto_reload(self, interval: float = 5.0) -> None:
+        """
+        Check credentials file for changes every `interval` seconds
+        in a daemon thread.
+        """
+        if self._watcher is not None:
+            return
+
+        def watch() -> None:
+            while not self._stop_watching.wait(interval):
+                try:
+                    self.reload_if_changed()
+                except (OSError, ValueError, KeyError):
+                    # keep serving old credentials until file is fixed
+                    continue
+
+        self._stop_watching.clear()
+        self._watcher = threading.Thread(target=watch, daemon=True)
+        self._watcher.start()
+
+    def stop_auto_reload(self) -> None:
+        if self._watcher is None:
+            return
+        self._stop_watching.set()
+        self._watcher.join()
+        self._watcher = None
+
+    def get(self, merchant_login: str) -> MerchantEntry:
+        try:
+            return self._entries[merchant_login]
+        except KeyError:
+            raise UnknownMerchantError(
+                f"Merchant {merchant_login!r} is not registered"
+            ) from None
+
+    def credentials(self, merchant_login: str) -> MerchantCredentials:
+        return self.get(merchant_login).credentials
+
+    def __contains__(self, merchant_login: str) -> bool:
+        return merchant_login in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def success_or_fail_signature_is_valid(
+        self,
+        merchant_login: str,
+        signature: str,
+        out_sum: Union[str, int, float],
+        inv_id: Optional[Union[str, int]],
+        **kwargs: Any,
+    ) -> bool:
+        """
+        Check success or fail signature of merchant is valid.
+
+        :param merchant_login: MerchantLogin of shop
+        :param signature: Output signature
+        :param out_sum:
+        :param inv_id:
+        :param kwargs: Additional params with `shp_` prefix
+        :return: True if signature is valid, else False
+        """
+        return self.get(merchant_login).check.success_or_fail_url_signature_is_valid(
+            success_signature=signature, out_sum=out_sum, inv_id=inv_id, **kwargs
+        )
+
+    def result_signature_is_valid(
+        self,
+        merchant_login: str,
+        signature: str,
+        out_sum: Union[str, int, float],
+        inv_id: Optional[Union[str, int]],
+        **kwargs: Any,
+    ) -> bool:
+        """
+        Check result signature of merchant is valid.
+
+        :param merchant_login: MerchantLogin of shop
+        :param signature: Output signature
+        :param out_sum:
+        :param inv_id:
+        :param kwargs: Additional params with `shp_` prefix
+        :return: True if signature is valid, else False
+        """
+        return self.get(merchant_login).check.result_url_signature_is_valid(
+            result_signature=signature, out_sum=out_sum, inv_id=inv_id, **kwargs
+        )
+
+    def create_link_to_payment_page_by_script(
+        self, merchant_login: str, out_sum: float, **kwargs: Any
+    ) -> str:
+        """
+        Create a link to payment page of merchant by common params with signature.
+
+        :param merchant_login: MerchantLogin of shop
+        :param out_sum:
+        :param kwargs: Params of `generate_by_script`
+        :return: Link to payment page
+        """
+        return self.get(merchant_login).link.generate_by_script(
+            out_sum=out_sum, **kwargs
+        )
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(merchants={len(self)})"
+
+
+class MerchantRegistry(BaseMerchantRegistry):
+    def _init_http_connection(self) -> Requests:
+        return Requests(timeout=self._timeout)
+
+    def _init_payment(self, credentials: MerchantCredentials, hash_: Hash) -> Payment:
+        return Payment(
+            http=self._http,
+            is_test=credentials.is_test,
+            hash_=hash_,
+            merchant_login=credentials.merchant_login,
+            password1=credentials.password1,
+            password2=credentials.password2,
+            invoice_link_cache=self._invoice_link_cache,
+            script_link_cache=self._script_link_cache,
+        )
+
+    def _init_merchant(self, credentials: MerchantCredentials) -> Merchant:
+        return Merchant(
+            http=self._http,
+            merchant_login=credentials.merchant_login,
+            hedging=self._hedging,
+        )
+
+    def create_link_to_payment_page_by_invoice_id(
+        self,
+        merchant_login: str,
+        inv_id: Optional[Union[str, int]],
+        out_sum: Union[str, int, float],
+        description: str,
+        expiration_date: Optional[str] = None,
+        receipt: Optional[Union[Receipt, str]] = None,
+        step_by_step: bool = False,
+        timeout: Optional[TimeoutTypes] = None,
+        deadline: Optional[Deadline] = None,
+    ) -> str:
+        """
+        Create a link to payment page of merchant by invoice ID.
+
+        :param merchant_login: MerchantLogin of shop
+        :param inv_id:
+        :param out_sum:
+        :param description: Shop description
+        :param expiration_date: ExpirationDate of invoice in ISO 8601
+        :param receipt: Fiscal receipt or its percent-encoded JSON
+        :param step_by_step: Hold money until payment is confirmed or cancelled
+        :param timeout: Timeout of request, seconds or `httpx.Timeout`
+        :param deadline: Deadline of operation, current one is used by default
+        :return: Url to payment page
+        """
+        link: PaymentLink = self.get(merchant_login).link
+        return link.create_link_to_payment_page_by_invoice_id(
+            inv_id=inv_id,
+            out_sum=out_sum,
+            description=description,
+            expiration_date=expiration_date,
+            receipt=receipt,
+            step_by_step=step_by_step,
+            timeout=timeout,
+            deadline=deadline,
+        )
+
+    def get_currencies(
+        self,
+        merchant_login: str,
+        language: str = "en",
+        timeout: Optional[TimeoutTypes] = None,
+        deadline: Optional[Deadline] = None,
+    ) -> dict:
+        """
+        Get available currencies of merchant.
+
+        :param merchant_login: MerchantLogin of shop
+        :param language: `ru` or `en`
+        :param timeout: Timeout of request, seconds or `httpx.Timeout`
+        :param deadline: Deadline of operation, current one is used by default
+        :return: dictionary of currencies
+        """
+        return (
+            self.get(merchant_login)
+            .merchant.get_currencies(language, timeout=timeout, deadline=deadline)
+            .as_dict()
+        )
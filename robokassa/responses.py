@@ -0,0 +1,271 @@
+import re
+import xml.etree.ElementTree as Et
+from abc import ABC, abstractmethod
+from typing import Any, List, Optional
+
+from robokassa import codec
+from robokassa.exceptions import RobokassaInterfaceError
+from robokassa.utils import xml_to_dict
+
+_UNSET = object()
+
+# successful response of Indexjson.aspx is a flat object,
+# so its fields are found without decoding the whole document
+_INVOICE_ID_PATTERN = re.compile(rb'"invoiceID"\s*:\s*"([^"\\]*)"')
+_NO_ERROR_PATTERN = re.compile(rb'"errorCode"\s*:\s*0\s*[,}]')
+# Payment/Confirm and Payment/Cancel answer `OK`, like Recurring `OK+InvoiceID`
+_HOLD_ACCEPTED_PATTERN = re.compile(r"OK(?:\+\S*)?", re.IGNORECASE)
+
+
+class LazyResult(ABC):
+    """
+    Result of Robokassa method which keeps raw content of response
+    and parses it only on the first access to data.
+    """
+
+    __slots__ = ("content", "_data")
+
+    def __init__(self, content: bytes) -> None:
+        self.content = content
+        self._data: Any = _UNSET
+
+    @abstractmethod
+    def _parse(self) -> Any:
+        pass
+
+    @property
+    def data(self) -> Any:
+        if self._data is _UNSET:
+            self._data = self._parse()
+        return self._data
+
+    def as_dict(self) -> dict:
+        return self.data
+
+    def __repr__(self) -> str:
+        parsed = self._data is not _UNSET
+        return f"{self.__class__.__name__}(size={len(self.content)}, parsed={parsed})"
+
+
+class JsonResult(LazyResult):
+    __slots__ = ()
+
+    def _parse(self) -> dict:
+        try:
+            return codec.loads(self.content)
+        except ValueError:
+            raise RobokassaInterfaceError("Internal Robokassa server error") from None
+
+
+class XmlResult(LazyResult):
+    __slots__ = ()
+
+    def _parse(self) -> dict:
+        return xml_to_dict(Et.fromstring(self.content))
+
+    @property
+    def result_code(self) -> Optional[int]:
+        result = self.data.get("Result") or {}
+        code = result.get("Code")
+        return None if code is None else int(code)
+
+
+class InvoiceCreationResult(JsonResult):
+    """
+    Result of `Indexjson.aspx`.
+    """
+
+    __slots__ = ()
+
+    @property
+    def error_code(self) -> Optional[int]:
+        return self.data.get("errorCode")
+
+    @property
+    def error_message(self) -> Optional[str]:
+        return self.data.get("errorMessage")
+
+    def raise_for_error(self) -> None:
+        if self.error_code not in (0, None):
+            raise RobokassaInterfaceError(
+                f"Error code: {self.error_code}, error message: {self.error_message}"
+            )
+
+    @property
+    def invoice_id(self) -> str:
+        """
+        :raise RobokassaInterfaceError: If Robokassa didn't create invoice
+        """
+        if self._data is _UNSET and _NO_ERROR_PATTERN.search(self.content):
+            match = _INVOICE_ID_PATTERN.search(self.content)
+            if match is not None:
+                return match.group(1).decode()
+        self.raise_for_error()
+        return self.data["invoiceID"]
+
+
+class CurrenciesResult(XmlResult):
+    """
+    Result of `GetCurrencies`.
+    """
+
+    __slots__ = ()
+
+    @property
+    def groups(self) -> List[dict]:
+        groups = (self.data.get("Groups") or {}).get("Group") or []
+        return groups if isinstance(groups, list) else [groups]
+
+
+class OperationStateResult(XmlResult):
+    """
+    Result of `OpStateExt`.
+    """
+
+    __slots__ = ()
+
+    @property
+    def state_code(self) -> Optional[int]:
+        state = self.data.get("State") or {}
+        code = state.get("Code")
+        return None if code is None else int(code)
+
+    @property
+    def info(self) -> dict:
+        return self.data.get("Info") or {}
+
+
+class RecurringResult(LazyResult):
+    """
+    Result of `Recurring`, `OK+InvoiceID` if charge was accepted.
+    Robokassa reports the final state of payment to ResultURL.
+    """
+
+    __slots__ = ()
+
+    def _parse(self) -> str:
+        return self.content.decode("utf-8", "replace").strip()
+
+    def as_dict(self) -> dict:
+        return {"accepted": self.accepted, "response": self.data}
+
+    @property
+    def accepted(self) -> bool:
+        return self.data.startswith("OK")
+
+    @property
+    def invoice_id(self) -> str:
+        """
+        :raise RobokassaInterfaceError: If Robokassa rejected the charge
+        """
+        if not self.accepted:
+            raise RobokassaInterfaceError(f"Recurring charge rejected: {self.data}")
+        return self.data[2:].lstrip("+")
+
+
+class HoldOperationResult(LazyResult):
+    """
+    Result of `Payment/Confirm` and `Payment/Cancel` of held payment.
+    Only `OK` answer is accepted, anything else, e.g. error page
+    of proxy or empty body, is an error.
+    """
+
+    __slots__ = ()
+
+    def _parse(self) -> str:
+        return self.content.decode("utf-8", "replace").strip()
+
+    def as_dict(self) -> dict:
+        return {"accepted": self.accepted, "response": self.data}
+
+    @property
+    def accepted(self) -> bool:
+        return _HOLD_ACCEPTED_PATTERN.fullmatch(self.data) is not None
+
+    def raise_for_error(self) -> None:
+        """
+        :raise RobokassaInterfaceError: If Robokassa rejected the operation
+        """
+        if not self.accepted:
+            raise RobokassaInterfaceError(f"Hold operation rejected: {self.data}")
+
+
+class RefundCreationResult(JsonResult):
+    """
+    Result of `RefundService/Refund/Create`.
+    """
+
+    __slots__ = ()
+
+    @property
+    def success(self) -> bool:
+        return bool(self.data.get("success"))
+
+    @property
+    def request_id(self) -> str:
+        """
+        :raise RobokassaInterfaceError: If Robokassa didn't accept refund
+        """
+        if not self.success:
+            raise RobokassaInterfaceError(
+                f"Refund rejected: {self.data.get('message')}"
+            )
+        return self.data["requestId"]
+
+
+class RefundStateResult(JsonResult):
+    """
+    Result of `RefundService/Refund/GetState`.
+    """
+
+    __slots__ = ()
+
+    @property
+    def label(self) -> Optional[str]:
+        """
+        `finished`, `processing` or `canceled`
+        """
+        return self.data.get("label")
+
+    @property
+    def amount(self) -> Optional[float]:
+        return self.data.get("amount")
+
+
+class InvoiceApiResult(JsonResult):
+    """
+    Result of Invoice API method.
+    """
+
+    __slots__ = ()
+
+    @property
+    def is_success(self) -> bool:
+        return bool(self.data.get("isSuccess"))
+
+    @property
+    def error_message(self) -> Optional[str]:
+        return self.data.get("errorMessage")
+
+    def raise_for_error(self) -> None:
+        """
+        :raise RobokassaInterfaceError: If Robokassa didn't process request
+        """
+        if not self.is_success:
+            raise RobokassaInterfaceError(f"Invoice API error: {self.error_message}")
+
+    @property
+    def url(self) -> Optional[str]:
+        return self.data.get("url")
+
+
+class InvoiceListResult(InvoiceApiResult):
+    """
+    Result of `GetInvoiceInformationList`, one page of invoices.
+    """
+
+    __slots__ = ()
+
+    @property
+    def invoices(self) -> List[dict]:
+        return self.data.get("invoices") or []
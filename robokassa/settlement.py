@@ -0,0 +1,39 @@
+from dataclasses import dataclass
+from enum import Enum
+from typing import Any, Optional, Tuple, Union
+
+
+class SettlementAction(Enum):
+    confirm = "confirm"
+    cancel = "cancel"
+
+
+@dataclass(frozen=True)
+class HoldSettlement:
+    """
+    Confirmation or cancellation of held (StepByStep) payment.
+
+    :param inv_id: InvId of held payment
+    :param action: Confirm or cancel payment
+    :param out_sum: Sum to confirm, required for confirmation
+    :param receipt: Percent-encoded JSON of final fiscal receipt
+    """
+
+    inv_id: Union[int, str]
+    action: SettlementAction
+    out_sum: Optional[Union[float, int, str]] = None
+    receipt: Optional[str] = None
+
+    def __post_init__(self) -> None:
+        if not isinstance(self.action, SettlementAction):
+            object.__setattr__(self, "action", SettlementAction(self.action))
+        if self.action is SettlementAction.confirm and self.out_sum is None:
+            raise ValueError(f"Confirmation of {self.inv_id} requires out_sum")
+
+    @classmethod
+    def from_record(
+        cls, record: Union["HoldSettlement", Tuple[Any, ...]]
+    ) -> "HoldSettlement":
+        if isinstance(record, cls):
+            return record
+        return cls(*record)
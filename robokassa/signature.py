@@ -1,7 +1,11 @@
-from typing import Optional, Union, Any
+import hmac
+import threading
+from collections import Counter
+from dataclasses import dataclass
+from typing import Optional, Union, Any, Dict, Sequence, Tuple
 
 from robokassa.types import Signature
-from robokassa.hash import Hash
+from robokassa.hash import Hash, HashAlgorithm
 
 
 class SignaturesChecker:
@@ -51,3 +55,137 @@ class SignaturesChecker:
         )
 
         return old_signature == new_signature
+
+
+@dataclass(frozen=True)
+class CredentialGeneration:
+    """
+    Pair of passwords which was used by shop in some period.
+    """
+
+    password1: str
+    password2: str
+    algorithm: HashAlgorithm = HashAlgorithm.md5
+    name: Optional[str] = None
+
+
+class RotatingSignaturesChecker:
+    """
+    Checker of signatures for shops which rotate their passwords.
+
+    Generations are tried in order, so put the newest one first.
+    Common part of signature string is hashed once for each algorithm
+    and the hash state is copied for every generation.
+    """
+
+    def __init__(self, generations: Sequence[CredentialGeneration]) -> None:
+        if not generations:
+            raise ValueError("At least one generation of credentials is required")
+
+        self._generations = tuple(generations)
+        self._hashes: Dict[HashAlgorithm, Hash] = {
+            generation.algorithm: Hash(generation.algorithm)
+            for generation in self._generations
+        }
+        self._matches: Counter = Counter()
+        self._matches_lock = threading.Lock()
+
+    @property
+    def matches(self) -> Counter:
+        """
+        Count of matched signatures by name of generation,
+        e.g. to find out when the old password isn't used anymore.
+        """
+        with self._matches_lock:
+            return self._matches.copy()
+
+    @property
+    def generations(self) -> Tuple[CredentialGeneration, ...]:
+        return self._generations
+
+    def _serialize_params(
+        self,
+        out_sum: Union[str, float, int],
+        inv_id: Optional[Union[str, int]],
+        additional_params: Dict[str, Any],
+    ) -> Tuple[bytes, bytes]:
+        inv_id = "" if inv_id is None else inv_id
+        prefix = "".join(f"{i}:" for i in (out_sum, inv_id) if i is not None)
+        suffix = "".join(
+            f":{i}" for i in sorted(f"{k}={v}" for k, v in additional_params.items())
+        )
+        return prefix.encode(), suffix.encode()
+
+    def _match(
+        self,
+        signature: str,
+        out_sum: Union[str, float, int],
+        inv_id: Optional[Union[str, int]],
+        additional_params: Dict[str, Any],
+        use_password2: bool,
+    ) -> Optional[CredentialGeneration]:
+        prefix, suffix = self._serialize_params(out_sum, inv_id, additional_params)
+        states = {
+            algorithm: hash_.new(prefix) for algorithm, hash_ in self._hashes.items()
+        }
+        # bytes are compared, str with non-ASCII characters is not supported
+        signature = signature.lower().encode()
+
+        for generation in self._generations:
+            password = generation.password2 if use_password2 else generation.password1
+            state = states[generation.algorithm].copy()
+            state.update(password.encode())
+            state.update(suffix)
+            if hmac.compare_digest(state.hexdigest().encode(), signature):
+                with self._matches_lock:
+                    self._matches[generation.name] += 1
+                return generation
+        return None
+
+    def match_success_or_fail_url_signature(
+        self,
+        success_signature: str,
+        out_sum: Union[str, float, int],
+        inv_id: Optional[Union[str, int]] = None,
+        **kwargs: Any,
+    ) -> Optional[CredentialGeneration]:
+        """
+        :return: Generation which signature was created with, else None
+        """
+        return self._match(success_signature, out_sum, inv_id, kwargs, False)
+
+    def match_result_url_signature(
+        self,
+        result_signature: str,
+        out_sum: Union[str, float, int],
+        inv_id: Optional[Union[str, int]] = None,
+        **kwargs: Any,
+    ) -> Optional[CredentialGeneration]:
+        """
+        :return: Generation which signature was created with, else None
+        """
+        return self._match(result_signature, out_sum, inv_id, kwargs, True)
+
+    def success_or_fail_url_signature_is_valid(
+        self,
+        success_signature: str,
+        out_sum: Union[str, float, int],
+        inv_id: Optional[Union[str, int]] = None,
+        **kwargs: Any,
+    ) -> bool:
+        generation = self.match_success_or_fail_url_signature(
+            success_signature, out_sum, inv_id, **kwargs
+        )
+        return generation is not None
+
+    def result_url_signature_is_valid(
+        self,
+        result_signature: str,
+        out_sum: Union[str, float, int],
+        inv_id: Optional[Union[str, int]] = None,
+        **kwargs: Any,
+    ) -> bool:
+        generation = self.match_result_url_signature(
+            result_signature, out_sum, inv_id, **kwargs
+        )
+        return generation is not None
@@ -0,0 +1,27 @@
+import sqlite3
+from typing import Union
+from os import PathLike
+
+
+def connect_sqlite(
+    path: Union[str, PathLike], timeout: float = 30.0
+) -> sqlite3.Connection:
+    """
+    Open SQLite database which can be shared by several processes.
+
+    WAL journal lets readers work while other process is writing,
+    `timeout` is how long writer waits for a lock of another process.
+
+    :param path: Path to database file
+    :param timeout: Seconds to wait for a lock
+    :return: Connection in autocommit mode
+    """
+    connection = sqlite3.connect(
+        str(path),
+        timeout=timeout,
+        isolation_level=None,
+        check_same_thread=False,
+    )
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("PRAGMA synchronous=NORMAL")
+    return connection
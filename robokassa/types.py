@@ -31,10 +31,14 @@ class Signature:
 
     hash_: Optional[Hash] = None
 
+    receipt: Optional[str] = None
+
     def __post_init__(self) -> None:
         """
         For create:
-        `MerchantLogin:OutSum:InvId:ResultUrl2:SuccessUrl2:SuccessUrl2Method:password1`
+        `MerchantLogin:OutSum:InvId:Receipt:ResultUrl2:SuccessUrl2:SuccessUrl2Method:password1`
+
+        Receipt is percent-encoded JSON of fiscal receipt.
 
         For check:
         `OutSum:InvId:[password 1 or 2]`
@@ -60,6 +64,7 @@ class Signature:
             self.merchant_login,
             self.out_sum,
             inv_id,
+            self.receipt,
             self.result_url2,
             self.success_url2,
             self.success_url2_method,
@@ -113,8 +118,26 @@ class RobokassaParams:
     encoding: Optional[str] = None
     email: Optional[str] = None
     expiration_date: Optional[str] = None
+    receipt: Optional[str] = None
+    previous_inv_id: Optional[Union[int, str]] = None
+    step_by_step: Optional[str] = None
 
     additional_params: Optional[Dict[str, Any]] = None
 
     def as_dict(self) -> Dict[str, Any]:
         return flatten_dict(asdict(self), True)
+
+
+@dataclass
+class BatchItemResult:
+    """
+    Result of one item of batch operation.
+    """
+
+    index: int
+    value: Any = None
+    error: Optional[BaseException] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
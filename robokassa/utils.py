@@ -1,8 +1,7 @@
-from json import JSONDecodeError
-
 import httpx
 
-from robokassa.exceptions import RobokassaInterfaceError
+from robokassa import codec
+from robokassa.exceptions import RobokassaInterfaceError, RobokassaUnavailableError
 import xml.etree.ElementTree as Et
 
 correct_keys = {
@@ -10,14 +9,17 @@ correct_keys = {
     "description": "Description",
     "out_sum": "OutSum",
     "signature_value": "SignatureValue",
-    "inc_current_label": "IncCurrentLabel",
+    "inc_curr_label": "IncCurrLabel",
     "payment_methods": "PaymentMethods",
     "inv_id": "InvId",
     "culture": "Culture",
     "encoding": "Encoding",
     "email": "Email",
-    "expiration_data": "ExpirationDate",
+    "expiration_date": "ExpirationDate",
     "is_test": "IsTest",
+    "receipt": "Receipt",
+    "previous_inv_id": "PreviousInvoiceID",
+    "step_by_step": "StepByStep",
 }
 
 
@@ -38,40 +40,44 @@ def flatten_dict(data, serialize_to_http_naming: bool = False):
     return items
 
 
+def xml_to_dict(element):
+    if len(element) == 0:
+        return element.text.strip() if element.text else None
+    result = {}
+    for child in element:
+        tag = child.tag.split("}")[-1]
+        child_dict = xml_to_dict(child)
+        if child.attrib:
+            if tag in result:
+                if not isinstance(result[tag], list):
+                    result[tag] = [result[tag]]
+                result[tag].append(
+                    {**child.attrib, **(child_dict if child_dict else {})}
+                )
+            else:
+                result[tag] = {**child.attrib, **(child_dict if child_dict else {})}
+        else:
+            if tag in result:
+                if not isinstance(result[tag], list):
+                    result[tag] = [result[tag]]
+                result[tag].append(child_dict)
+            else:
+                result[tag] = child_dict
+    return result
+
+
 class HttpResponseValidator:
     def __init__(self, response: httpx.Response, in_json: bool = True) -> None:
         self.response = response
         self.in_json = in_json
 
         if response.status_code != 200:
-            raise RobokassaInterfaceError(
+            raise RobokassaUnavailableError(
                 "RobokassaInterface servers are unavailable. Please try again later."
             )
 
     def xml_to_dict(self, element):
-        if len(element) == 0:
-            return element.text.strip() if element.text else None
-        result = {}
-        for child in element:
-            tag = child.tag.split("}")[-1]
-            child_dict = self.xml_to_dict(child)
-            if child.attrib:
-                if tag in result:
-                    if not isinstance(result[tag], list):
-                        result[tag] = [result[tag]]
-                    result[tag].append(
-                        {**child.attrib, **(child_dict if child_dict else {})}
-                    )
-                else:
-                    result[tag] = {**child.attrib, **(child_dict if child_dict else {})}
-            else:
-                if tag in result:
-                    if not isinstance(result[tag], list):
-                        result[tag] = [result[tag]]
-                    result[tag].append(child_dict)
-                else:
-                    result[tag] = child_dict
-        return result
+        return xml_to_dict(element)
 
     def validate_http_response(self) -> dict:
         if not self.in_json:
@@ -80,8 +86,8 @@ class HttpResponseValidator:
             return self.xml_to_dict(root)
 
         try:
-            data = self.response.json()
-        except JSONDecodeError:
+            data = codec.loads(self.response.content)
+        except ValueError:
             raise RobokassaInterfaceError("Internal Robokassa server error")
         if data.get("errorCode") == 0:
             return data
@@ -0,0 +1,151 @@
+"""
+Local validation of params of payment.
+
+Params which Robokassa surely rejects are rejected before request,
+so a bad item of batch costs microseconds instead of round trip.
+"""
+
+import re
+from decimal import Decimal, InvalidOperation
+from typing import Optional, Union
+
+from robokassa.cache import expiration_to_timestamp
+from robokassa.exceptions import (
+    IncorrectUrlMethodError,
+    InvalidParameterError,
+    UnusedStrictUrlParameterError,
+)
+from robokassa.types import RobokassaParams
+
+MAX_DESCRIPTION_LENGTH = 100
+MAX_INV_ID = 2_147_483_647
+MAX_OUT_SUM = Decimal(10) ** 18
+OUT_SUM_SCALE = 6
+
+CULTURES = ("ru", "en")
+URL_METHODS = ("GET", "POST")
+
+_OUT_SUM_QUANTUM = Decimal(1).scaleb(-OUT_SUM_SCALE)
+# strings are sent as is, so only plain notation is accepted
+_OUT_SUM_PATTERN = re.compile(r"[0-9]+(?:\.[0-9]+)?")
+_INV_ID_PATTERN = re.compile(r"\d{1,10}")
+_ENCODING_PATTERN = re.compile(r"[A-Za-z0-9][A-Za-z0-9_.:-]{0,39}")
+_EMAIL_PATTERN = re.compile(r"[^@\s]+@[^@\s]+\.[^@\s]+")
+_CURRENCY_LABEL_PATTERN = re.compile(r"\w{1,64}")
+_URL_PATTERN = re.compile(r"https?://[^\s/?#]+\S*", re.IGNORECASE)
+
+
+def _out_sum_to_decimal(out_sum: Union[str, int, float, Decimal]) -> Optional[Decimal]:
+    if isinstance(out_sum, bool):
+        return None
+    if isinstance(out_sum, str) and _OUT_SUM_PATTERN.fullmatch(out_sum) is None:
+        return None
+    try:
+        value = Decimal(str(out_sum))
+        if isinstance(out_sum, float):
+            # error of binary float, e.g. of 0.1 + 0.2, isn't scale of sum
+            value = value.quantize(_OUT_SUM_QUANTUM)
+    except (InvalidOperation, ValueError):
+        return None
+    return value if value.is_finite() else None
+
+
+def validate_out_sum(out_sum: Union[str, int, float, Decimal]) -> None:
+    value = _out_sum_to_decimal(out_sum)
+    if (
+        value is None
+        or not 0 < value < MAX_OUT_SUM
+        or value.as_tuple().exponent < -OUT_SUM_SCALE
+    ):
+        raise InvalidParameterError(f"OutSum must be positive number, got {out_sum!r}")
+
+
+def validate_inv_id(inv_id: Optional[Union[str, int]]) -> None:
+    if inv_id is None:
+        return
+    value = str(inv_id)
+    if _INV_ID_PATTERN.fullmatch(value) is None or int(value) > MAX_INV_ID:
+        raise InvalidParameterError(
+            f"InvId must be integer from 0 to {MAX_INV_ID}, got {value!r}"
+        )
+
+
+def validate_description(description: Optional[str]) -> None:
+    if description is not None and len(description) > MAX_DESCRIPTION_LENGTH:
+        raise InvalidParameterError(
+            f"Description must be up to {MAX_DESCRIPTION_LENGTH} characters, "
+            f"got {len(description)}"
+        )
+
+
+def validate_url(
+    name: str, url: Optional[str], method: Optional[str], method_required: bool = True
+) -> None:
+    """
+    :raise UnusedStrictUrlParameterError: If only one of URL and its method is set
+    :raise IncorrectUrlMethodError: If method isn't GET or POST
+    """
+    if method_required and (url is None) != (method is None):
+        raise UnusedStrictUrlParameterError(
+            f"If you use {name}, you also need to choose a HTTP method"
+        )
+    if method is not None and method not in URL_METHODS:
+        raise IncorrectUrlMethodError("You can use only GET or POST methods")
+    if url is not None and _URL_PATTERN.fullmatch(url) is None:
+        raise InvalidParameterError(f"{name} must be HTTP or HTTPS URL, got {url!r}")
+
+
+def validate_script_link(
+    out_sum: Union[str, int, float],
+    inv_id: Optional[Union[str, int]] = None,
+    description: Optional[str] = None,
+    result_url: Optional[str] = None,
+    success_url: Optional[str] = None,
+    success_url_method: Optional[str] = None,
+    fail_url: Optional[str] = None,
+    fail_url_method: Optional[str] = None,
+) -> None:
+    """
+    :raise InvalidParameterError: If param is invalid
+    :raise UnusedStrictUrlParameterError: If only one of URL and its method is set
+    :raise IncorrectUrlMethodError: If method of URL isn't GET or POST
+    """
+    validate_out_sum(out_sum)
+    validate_inv_id(inv_id)
+    validate_description(description)
+    validate_url("ResultUrl2", result_url, None, method_required=False)
+    validate_url("SuccessUrl2", success_url, success_url_method)
+    validate_url("FailUrl2", fail_url, fail_url_method)
+
+
+def validate_params(robokassa_params: RobokassaParams) -> None:
+    """
+    Validate params of request to Robokassa.
+
+    :raise InvalidParameterError: If param is invalid
+    """
+    validate_out_sum(robokassa_params.out_sum)
+    validate_inv_id(robokassa_params.inv_id)
+    validate_inv_id(robokassa_params.previous_inv_id)
+    validate_description(robokassa_params.description)
+
+    culture = robokassa_params.culture
+    if culture is not None and culture not in CULTURES:
+        raise InvalidParameterError(f"Culture must be ru or en, got {culture!r}")
+    encoding = robokassa_params.encoding
+    if encoding is not None and _ENCODING_PATTERN.fullmatch(encoding) is None:
+        raise InvalidParameterError(f"Encoding is invalid: {encoding!r}")
+    email = robokassa_params.email
+    if email is not None and _EMAIL_PATTERN.fullmatch(email) is None:
+        raise InvalidParameterError(f"Email is invalid: {email!r}")
+    label = robokassa_params.inc_curr_label
+    if label is not None and _CURRENCY_LABEL_PATTERN.fullmatch(label) is None:
+        raise InvalidParameterError(f"IncCurrLabel is invalid: {label!r}")
+    if robokassa_params.expiration_date is not None:
+        try:
+            expiration_to_timestamp(robokassa_params.expiration_date)
+        except (TypeError, ValueError):
+            raise InvalidParameterError(
+                "ExpirationDate must be ISO 8601 date, "
+                f"got {robokassa_params.expiration_date!r}"
+            ) from None
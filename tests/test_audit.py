@@ -0,0 +1,49 @@
+from urllib.parse import urlencode
+
+from robokassa import HashAlgorithm
+from robokassa.audit import audit_logs, file_ranges
+from robokassa.hash import Hash
+from robokassa.registry import MerchantCredentials
+from robokassa.types import Signature
+
+CREDENTIALS = MerchantCredentials("demo", "p1", "p2", HashAlgorithm.sha256)
+
+
+def body(out_sum: str, inv_id: int, password: str = "p2", **shp) -> str:
+    signature = Signature(
+        out_sum=out_sum,
+        inv_id=inv_id,
+        password=password,
+        additional_params=shp,
+        hash_=Hash(HashAlgorithm.sha256),
+    ).value
+    return urlencode(
+        {"OutSum": out_sum, "InvId": inv_id, "SignatureValue": signature, **shp}
+    )
+
+
+def test_file_ranges_end_at_lines(tmp_path):
+    log = tmp_path / "result.log"
+    log.write_bytes(b"a=1\nbb=22\nccc=333\n")
+
+    ranges = file_ranges(str(log), chunk_size=5)
+
+    assert ranges == [(0, 10), (10, 18)]
+
+
+def test_audit_logs(tmp_path):
+    log = tmp_path / "result.log"
+    lines = [body(f"{i}.00", i, Shp_user=f"user {i}") for i in range(20)]
+    lines[7] = body("7.00", 7, password="wrong")
+    lines.append("garbage")
+    lines.insert(3, "OutSum=1.00&InvId=1&SignatureValue=a&Shp_user=%FF")
+    log.write_bytes(
+        "\r\n".join(lines).encode() + b"\r\nOutSum=1\xff&SignatureValue=a\n"
+    )
+
+    report = audit_logs([str(log)], CREDENTIALS, processes=2, chunk_size=64)
+
+    assert (report.checked, report.valid, report.malformed) == (20, 19, 3)
+    [mismatch] = report.mismatches
+    assert (mismatch.inv_id, mismatch.out_sum) == ("7", "7.00")
+    assert log.read_bytes()[mismatch.offset :].startswith(b"OutSum=7.00&InvId=7")
@@ -0,0 +1,171 @@
+import threading
+import time
+
+import pytest
+
+from robokassa import Robokassa, HashAlgorithm
+from robokassa.asyncio import Robokassa as AsyncRobokassa
+from robokassa.asyncio.payment import AsyncPaymentInterface
+from robokassa.cache import InvoiceLinkCache, ScriptLinkCache, expiration_to_timestamp
+from robokassa.registry import MerchantCredentials, MerchantRegistry
+from robokassa.payment import PaymentInterface
+
+pytest_plugins = ("pytest_asyncio",)
+
+
+def test_expiration_to_timestamp():
+    assert expiration_to_timestamp(None) is None
+    assert expiration_to_timestamp("1970-01-01T00:00:10Z") == 10
+    assert expiration_to_timestamp("1970-01-01T03:00:10.1234567+03:00") == 10.123456
+
+
+def test_invoice_link_cache(tmp_path):
+    cache = InvoiceLinkCache(tmp_path / "links.sqlite3", default_ttl=60)
+    key = cache.make_key({"InvId": 1, "OutSum": 100})
+
+    assert cache.get(key) is None
+    cache.set(key, "https://auth.robokassa.ru/Merchant/Index/1")
+    assert cache.get(key) == "https://auth.robokassa.ru/Merchant/Index/1"
+
+    shared_cache = InvoiceLinkCache(tmp_path / "links.sqlite3")
+    assert shared_cache.get(key) == "https://auth.robokassa.ru/Merchant/Index/1"
+
+    cache.set(key, "https://auth.robokassa.ru/Merchant/Index/2", "2000-01-01T00:00:00")
+    assert cache.get(key) is None
+    assert cache.purge_expired() == 1
+
+
+def test_invoice_link_cache_default_ttl(tmp_path):
+    cache = InvoiceLinkCache(tmp_path / "links.sqlite3", default_ttl=0)
+    cache.set("key", "https://example.com")
+    time.sleep(0.01)
+
+    assert cache.get("key") is None
+
+
+def test_link_by_invoice_id_uses_cache(tmp_path, monkeypatch):
+    calls = []
+
+    def create_url_to_payment_page(self, robokassa_params, *args):
+        calls.append(robokassa_params)
+        return f"https://auth.robokassa.ru/Merchant/Index/{len(calls)}"
+
+    monkeypatch.setattr(
+        PaymentInterface, "create_url_to_payment_page", create_url_to_payment_page
+    )
+    robokassa = Robokassa(
+        merchant_login="test_login",
+        password1="password",
+        password2="password",
+        algorithm=HashAlgorithm.md5,
+        invoice_link_cache=InvoiceLinkCache(tmp_path / "links.sqlite3", default_ttl=60),
+    )
+
+    link = robokassa.create_link_to_payment_page_by_invoice_id(
+        inv_id=1, out_sum=100, description="Order"
+    )
+    same_link = robokassa.create_link_to_payment_page_by_invoice_id(
+        inv_id=1, out_sum=100, description="Order"
+    )
+    other_link = robokassa.create_link_to_payment_page_by_invoice_id(
+        inv_id=2, out_sum=100, description="Order"
+    )
+
+    assert link == same_link
+    assert link != other_link
+    assert len(calls) == 2
+
+    robokassa.create_link_to_payment_page_by_invoice_id(
+        inv_id=None, out_sum=100, description="Order"
+    )
+    robokassa.create_link_to_payment_page_by_invoice_id(
+        inv_id=0, out_sum=100, description="Order"
+    )
+    assert len(calls) == 4
+
+
+@pytest.mark.asyncio
+async def test_async_link_by_invoice_id_uses_cache_off_loop(tmp_path, monkeypatch):
+    threads = []
+
+    class RecordingCache(InvoiceLinkCache):
+        def get(self, key):
+            threads.append(threading.get_ident())
+            return super().get(key)
+
+        def set(self, *args):
+            threads.append(threading.get_ident())
+            super().set(*args)
+
+    async def create_url_to_payment_page(self, robokassa_params, *args):
+        return "https://auth.robokassa.ru/Merchant/Index/1"
+
+    monkeypatch.setattr(
+        AsyncPaymentInterface, "create_url_to_payment_page", create_url_to_payment_page
+    )
+    robokassa = AsyncRobokassa(
+        merchant_login="test_login",
+        password1="password",
+        password2="password",
+        algorithm=HashAlgorithm.md5,
+        invoice_link_cache=RecordingCache(tmp_path / "links.sqlite3", default_ttl=60),
+    )
+
+    for _ in range(2):
+        link = await robokassa.create_link_to_payment_page_by_invoice_id(
+            inv_id=1, out_sum=100, description="Order"
+        )
+
+    assert link == "https://auth.robokassa.ru/Merchant/Index/1"
+    assert len(threads) == 3
+    assert threading.get_ident() not in threads
+
+
+def test_invoice_link_cache_requires_lifetime(tmp_path):
+    cache = InvoiceLinkCache(tmp_path / "links.sqlite3")
+
+    assert not cache.accepts(1)
+    assert cache.accepts(1, "2030-01-01T00:00:00")
+    cache.set("key", "https://auth.robokassa.ru/Merchant/Index/1")
+    assert cache.get("key") is None
+
+
+def test_script_link_cache():
+    cache = ScriptLinkCache(maxsize=2)
+    cached = Robokassa("demo", "p1", "p2", script_link_cache=cache)
+    plain = Robokassa("demo", "p1", "p2")
+
+    for _ in range(3):
+        assert cached.create_link_to_payment_page_by_script(
+            100, product="book", success_url="https://a.ru", success_url_method="GET"
+        ) == plain.create_link_to_payment_page_by_script(
+            100, product="book", success_url="https://a.ru", success_url_method="GET"
+        )
+    # values are compared as they are serialized to link
+    assert cached.create_link_to_payment_page_by_script(
+        100.0
+    ) == plain.create_link_to_payment_page_by_script(100.0)
+    assert cached.create_link_to_payment_page_by_script(
+        100
+    ) == plain.create_link_to_payment_page_by_script(100)
+
+    info = cache.cache_info()
+    assert (info.hits, info.misses, info.currsize) == (2, 3, 2)
+    assert info.hit_rate == 0.4
+
+
+def test_script_link_cache_is_invalidated_by_credentials():
+    cache = ScriptLinkCache()
+    registry = MerchantRegistry(
+        [MerchantCredentials("demo", "p1", "p2")], script_link_cache=cache
+    )
+    old_link = registry.get("demo").link.generate_by_script(100)
+
+    registry.replace([MerchantCredentials("demo", "new", "p2")])
+    new_link = registry.get("demo").link.generate_by_script(100)
+
+    assert new_link != old_link
+    assert new_link == Robokassa(
+        "demo", "new", "p2"
+    ).create_link_to_payment_page_by_script(100)
+    assert len(cache) == 1
@@ -0,0 +1,79 @@
+import time
+
+import httpx
+import pytest
+
+from robokassa import Robokassa
+from robokassa.asyncio import Robokassa as AsyncRobokassa
+from robokassa.cassette import (
+    AsyncRecordingTransport,
+    AsyncReplayTransport,
+    Cassette,
+    RecordingTransport,
+    ReplayTransport,
+)
+from robokassa.exceptions import CassetteMissError
+
+CURRENCIES = (
+    b'<?xml version="1.0" encoding="utf-8"?>'
+    b'<CurrenciesList xmlns="http://merchant.roboxchange.com/WebService/">'
+    b"<Result><Code>0</Code></Result><Groups /></CurrenciesList>"
+)
+
+
+def currencies(request: httpx.Request) -> httpx.Response:
+    time.sleep(0.05)
+    return httpx.Response(200, content=CURRENCIES)
+
+
+async def async_currencies(request: httpx.Request) -> httpx.Response:
+    return httpx.Response(200, content=CURRENCIES)
+
+
+def test_record_and_replay(tmp_path):
+    path = tmp_path / "robokassa.jsonl.gz"
+    cassette = Cassette(path)
+    transport = RecordingTransport(cassette, httpx.MockTransport(currencies))
+    recorded = Robokassa("demo", "p1", "p2", transport=transport).get_currencies()
+    cassette.save()
+
+    loaded = Cassette.load(path)
+    assert len(loaded) == 1
+    assert loaded.interactions[0].elapsed >= 0.05
+
+    replay = Robokassa("demo", "p1", "p2", transport=ReplayTransport(loaded))
+    assert replay.get_currencies() == recorded
+    with pytest.raises(CassetteMissError):
+        replay.get_currencies()
+    with pytest.raises(CassetteMissError):
+        replay.get_currencies(language="ru")
+
+    realtime = Robokassa(
+        "demo",
+        "p1",
+        "p2",
+        transport=ReplayTransport(Cassette.load(path, cycle=True), realtime=True),
+    )
+    started = time.perf_counter()
+    for _ in range(3):
+        assert realtime.get_currencies() == recorded
+    assert time.perf_counter() - started >= 0.15
+
+
+@pytest.mark.asyncio
+async def test_async_record_and_replay(tmp_path):
+    cassette = Cassette(tmp_path / "robokassa.jsonl")
+    transport = AsyncRecordingTransport(cassette, httpx.MockTransport(async_currencies))
+    recorded = await AsyncRobokassa(
+        "demo", "p1", "p2", transport=transport
+    ).get_currencies()
+    cassette.save()
+
+    replay = AsyncRobokassa(
+        "demo",
+        "p1",
+        "p2",
+        transport=AsyncReplayTransport(Cassette.load(cassette.path, cycle=True)),
+    )
+    for _ in range(3):
+        assert await replay.get_currencies() == recorded
@@ -0,0 +1,124 @@
+import io
+import json
+from urllib.parse import parse_qs, urlparse
+
+from robokassa import HashAlgorithm, Robokassa
+from robokassa.cli import build_parser, main
+
+
+def test_links_command(tmp_path, capsys):
+    source = tmp_path / "campaign.csv"
+    source.write_text(
+        "out_sum,inv_id,description,user\n"
+        + "".join(f"{10 + i},{i},Order {i},u{i}\n" for i in range(25))
+    )
+    output = tmp_path / "links.txt"
+
+    main(
+        [
+            "links",
+            str(source),
+            str(output),
+            "--merchant-login",
+            "demo",
+            "--password1",
+            "p1",
+            "--algorithm",
+            "sha512",
+            "--workers",
+            "2",
+            "--chunk-size",
+            "4",
+        ]
+    )
+
+    robokassa = Robokassa("demo", "p1", "p2", HashAlgorithm.sha512)
+    expected = [
+        robokassa.create_link_to_payment_page_by_script(
+            str(10 + i), inv_id=str(i), description=f"Order {i}", user=f"u{i}"
+        )
+        for i in range(25)
+    ]
+    assert output.read_text().splitlines() == expected
+    assert "25 links" in capsys.readouterr().err
+
+
+def test_sharded_links_of_many_merchants(tmp_path):
+    credentials = tmp_path / "credentials.json"
+    credentials.write_text(
+        json.dumps(
+            [
+                {"merchant_login": "a", "password1": "pa", "password2": ""},
+                {"merchant_login": "b", "password1": "pb", "password2": ""},
+            ]
+        )
+    )
+    source = tmp_path / "campaign.jsonl"
+    source.write_text(
+        "".join(
+            json.dumps({"merchant_login": "ab"[i % 2], "out_sum": i + 1}) + "\n"
+            for i in range(10)
+        )
+    )
+    args = build_parser().parse_args(
+        [
+            "links",
+            str(source),
+            str(tmp_path / "shards"),
+            "--credentials",
+            str(credentials),
+            "--chunk-size",
+            "3",
+            "--workers",
+            "2",
+            "--sharded",
+        ]
+    )
+
+    assert args.handler(args, report=io.StringIO()) == 10
+
+    shards = sorted((tmp_path / "shards").iterdir())
+    assert len(shards) == 4
+    links = [link for shard in shards for link in shard.read_text().splitlines()]
+    assert links[1] == Robokassa("b", "pb", "").create_link_to_payment_page_by_script(2)
+
+
+def test_links_command_reports_rejected_rows(tmp_path):
+    source = tmp_path / "campaign.csv"
+    source.write_text("out_sum,inv_id\n10,1\n1e3,2\n30,3\n")
+    output = tmp_path / "links.txt"
+    args = build_parser().parse_args(
+        ["links", str(source), str(output), "--merchant-login", "demo"]
+        + ["--password1", "p1", "--workers", "1"]
+    )
+    report = io.StringIO()
+
+    assert args.handler(args, report=report) == 2
+
+    links = output.read_text().splitlines()
+    assert links[1] == ""
+    assert links[0] and links[2]
+    assert "row 2 is rejected: OutSum" in report.getvalue()
+    assert "1 rejected" in report.getvalue()
+
+
+def test_links_command_keeps_multiline_fields_in_one_row(tmp_path):
+    source = tmp_path / "campaign.csv"
+    source.write_text(
+        'out_sum,inv_id,description\n10,1,"first\n\nline"\n0,2,"a ""b""\nc"\n30,3,x\n'
+    )
+    output = tmp_path / "links.txt"
+    args = build_parser().parse_args(
+        ["links", str(source), str(output), "--merchant-login", "demo"]
+        + ["--password1", "p1", "--workers", "1", "--chunk-size", "1"]
+    )
+    report = io.StringIO()
+
+    assert args.handler(args, report=report) == 2
+
+    links = output.read_text().splitlines()
+    assert len(links) == 3
+    assert parse_qs(urlparse(links[0]).query)["Description"] == ["first\n\nline"]
+    assert links[1] == ""
+    assert parse_qs(urlparse(links[2]).query)["InvId"] == ["3"]
+    assert "row 2 is rejected: OutSum" in report.getvalue()
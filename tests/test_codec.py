@@ -0,0 +1,46 @@
+import pytest
+
+from robokassa import codec
+from robokassa.codec import JSONCodec, available_codecs
+from robokassa.responses import InvoiceCreationResult
+
+PAYLOAD = {"sno": "osn", "items": [{"name": "Товар", "sum": 100.5, "quantity": 1}]}
+
+
+@pytest.mark.parametrize("name", list(available_codecs()))
+def test_codecs_give_same_output(name):
+    installed = available_codecs()[name]
+    encoded = installed.dumps(PAYLOAD)
+
+    assert encoded == JSONCodec().dumps(PAYLOAD)
+    assert installed.loads(encoded) == PAYLOAD
+    assert installed.loads(encoded.encode()) == PAYLOAD
+    with pytest.raises(ValueError):
+        installed.loads(b"<html>")
+
+
+@pytest.mark.parametrize("name", list(available_codecs()))
+def test_codecs_decode_output_of_each_other(name):
+    payload = {
+        "sum": 1e16,
+        "small": 1e-7,
+        "text": "a/b \u00e9",
+        "items": [0.1, -0, None],
+    }
+    encoded = available_codecs()[name].dumps(payload)
+
+    for other in available_codecs().values():
+        assert other.loads(encoded) == payload
+
+
+def test_set_codec():
+    previous = codec.set_codec("json")
+    try:
+        assert codec.get_codec().name == "json"
+        assert InvoiceCreationResult(b'{"invoiceID": "abc"}').invoice_id == "abc"
+        with pytest.raises(ValueError, match="not installed"):
+            codec.set_codec("simdjson")
+    finally:
+        codec.set_codec(previous)
+
+    assert codec.get_codec() is previous
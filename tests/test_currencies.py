@@ -0,0 +1,102 @@
+from decimal import Decimal
+
+import httpx
+import pytest
+
+from robokassa import Robokassa
+from robokassa.currencies import CurrencyIndex
+from robokassa.responses import CurrenciesResult
+
+DOCUMENT = (
+    '<?xml version="1.0" encoding="utf-8"?>'
+    '<CurrenciesList xmlns="http://merchant.roboxchange.com/WebService/">'
+    "<Result><Code>0</Code></Result><Groups>"
+    '<Group Code="BankCard" Description="Bank card"><Items>'
+    '<Currency Label="BankCard" Alias="BankCard" Name="Card" '
+    'MinValue="1" MaxValue="300000" />'
+    "</Items></Group>"
+    '<Group Code="EMoney" Description="E-money"><Items>'
+    '<Currency Label="YandexPay" Alias="YandexPay" Name="Yandex Pay" '
+    'MinValue="10" MaxValue="15000" />'
+    '<Currency Label="Qiwi" Alias="Qiwi" Name="QIWI" MinValue="100.50" />'
+    "</Items></Group>"
+    '<Group Code="Other" Description="Other"><Items>'
+    '<Currency Label="Cash" Alias="Cash" Name="Cash" />'
+    "</Items></Group>"
+    "</Groups></CurrenciesList>"
+).encode()
+
+
+@pytest.fixture
+def index():
+    return CurrencyIndex.from_result(CurrenciesResult(DOCUMENT))
+
+
+def labels(currencies):
+    return [currency.label for currency in currencies]
+
+
+def test_lookup(index):
+    assert len(index) == 4
+    assert "Qiwi" in index
+    assert index["Qiwi"].group_code == "EMoney"
+    assert index["Qiwi"].min_value == Decimal("100.50")
+    assert index["Qiwi"].max_value is None
+    assert index.get("Unknown") is None
+    assert labels(index.group("EMoney").currencies) == ["YandexPay", "Qiwi"]
+    assert [group.code for group in index.groups] == ["BankCard", "EMoney", "Other"]
+
+
+@pytest.mark.parametrize(
+    "amount, expected",
+    [
+        (0.5, ["Cash"]),
+        (1, ["BankCard", "Cash"]),
+        ("10", ["BankCard", "YandexPay", "Cash"]),
+        ("100.49", ["BankCard", "YandexPay", "Cash"]),
+        (Decimal("100.5"), ["BankCard", "YandexPay", "Qiwi", "Cash"]),
+        (15000, ["BankCard", "YandexPay", "Qiwi", "Cash"]),
+        (15000.01, ["BankCard", "Qiwi", "Cash"]),
+        (300001, ["Qiwi", "Cash"]),
+    ],
+)
+def test_for_amount(index, amount, expected):
+    assert labels(index.for_amount(amount)) == expected
+    assert labels(index.for_amount(amount)) == [
+        currency.label for currency in index if currency.accepts(amount)
+    ]
+
+
+def test_for_amount_of_group(index):
+    assert labels(index.for_amount(500, group="EMoney")) == ["YandexPay", "Qiwi"]
+
+
+def test_single_group_and_currency():
+    index = CurrencyIndex.from_dict(
+        {
+            "Groups": {
+                "Group": {
+                    "Code": "BankCard",
+                    "Items": {"Currency": {"Label": "BankCard", "MinValue": "1"}},
+                }
+            }
+        }
+    )
+
+    assert labels(index.for_amount(1)) == ["BankCard"]
+    assert labels(index.for_amount(0)) == []
+
+
+def test_client_get_currency_index():
+    robokassa = Robokassa(
+        "demo",
+        "p1",
+        "p2",
+        transport=httpx.MockTransport(
+            lambda request: httpx.Response(200, content=DOCUMENT)
+        ),
+    )
+
+    index = robokassa.get_currency_index("ru")
+
+    assert labels(index.for_amount(20000)) == ["BankCard", "Qiwi", "Cash"]
@@ -0,0 +1,107 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from robokassa import protocol
+from robokassa.asyncio.connection import AsyncHttpConnection
+from robokassa.batch import run_batch
+from robokassa.connection import HttpConnection
+from robokassa.deadline import Deadline, resolve_timeout
+from robokassa.exceptions import DeadlineExceededError, DeadlineExceededInFlightError
+
+pytest_plugins = ("pytest_asyncio",)
+
+
+def test_resolve_timeout():
+    default = httpx.Timeout(5.0)
+
+    assert resolve_timeout(default) == default
+    assert resolve_timeout(default, 1.5) == httpx.Timeout(1.5)
+    assert resolve_timeout(default, httpx.Timeout(1.0, connect=0.5)).connect == 0.5
+
+    timeout = resolve_timeout(default, deadline=Deadline(1.0))
+    assert 0 < timeout.read <= 1.0
+    assert 0 < timeout.pool <= 1.0
+
+    with pytest.raises(DeadlineExceededError) as error:
+        resolve_timeout(default, deadline=Deadline(0))
+    assert not error.value.sent
+
+
+def test_current_deadline():
+    assert Deadline.current() is None
+
+    with Deadline(10) as outer:
+        assert Deadline.current() is outer
+        with Deadline(60) as inner:
+            assert inner.expires_at == outer.expires_at
+            assert resolve_timeout(httpx.Timeout(None)).read <= 10
+        assert Deadline.current() is outer
+
+    assert Deadline.current() is None
+
+
+@pytest.mark.asyncio
+async def test_deadline_is_shared_with_tasks():
+    async def remaining() -> float:
+        return Deadline.current().remaining()
+
+    with Deadline(2):
+        results = await asyncio.gather(remaining(), remaining())
+
+    assert all(0 < result <= 2 for result in results)
+
+
+def test_connection_timeout():
+    conn = HttpConnection(timeout=2.0)
+
+    with conn as client:
+        assert client.timeout == httpx.Timeout(2.0)
+    assert conn.request_timeout(0.5) == httpx.Timeout(0.5)
+
+
+def test_deadline_reaches_batch_threads():
+    def remaining(_) -> float:
+        return Deadline.current().remaining()
+
+    with Deadline(2):
+        results = run_batch(range(3), remaining, max_workers=2)
+
+    assert all(0 < result.value <= 2 for result in results)
+
+
+def test_deadline_limits_whole_request():
+    def slow_body():
+        yield b"O"
+        time.sleep(0.2)
+        yield b"K"
+
+    conn = HttpConnection(
+        base_url="https://auth.robokassa.ru/Merchant",
+        transport=httpx.MockTransport(
+            lambda request: httpx.Response(200, content=slow_body())
+        ),
+    )
+
+    with pytest.raises(DeadlineExceededInFlightError) as error:
+        conn.send(protocol.get_currencies("demo", "en"), deadline=Deadline(0.1))
+    assert error.value.sent
+
+
+@pytest.mark.asyncio
+async def test_async_deadline_limits_whole_request():
+    async def handler(request):
+        await asyncio.sleep(0.5)
+        return httpx.Response(200)
+
+    conn = AsyncHttpConnection(
+        base_url="https://auth.robokassa.ru/Merchant",
+        transport=httpx.MockTransport(handler),
+    )
+
+    started = time.monotonic()
+    with pytest.raises(DeadlineExceededInFlightError):
+        await conn.send(protocol.get_currencies("demo", "en"), deadline=Deadline(0.1))
+    assert time.monotonic() - started < 0.4
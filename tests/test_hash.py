@@ -1,6 +1,6 @@
 import hashlib
 
-from robokassa.hash import HashAlgorithm, Hash
+from robokassa.hash import HashAlgorithm, Hash, PrefixedHash
 
 
 def test_algorithm():
@@ -13,3 +13,11 @@ def test_hash():
         Hash(algorithm=HashAlgorithm.md5).hash_data("Hello World")
         == hashlib.md5(b"Hello World").hexdigest()
     )
+
+
+def test_prefixed_hash():
+    prefixed = PrefixedHash(HashAlgorithm.sha512, "demo:")
+    plain = Hash(HashAlgorithm.sha512)
+
+    assert prefixed.hash_data("demo:1:2:p1") == plain.hash_data("demo:1:2:p1")
+    assert prefixed.hash_data("other:1:2:p1") == plain.hash_data("other:1:2:p1")
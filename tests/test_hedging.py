@@ -0,0 +1,141 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from robokassa.hedging import HedgingPolicy
+
+pytest_plugins = ("pytest_asyncio",)
+
+
+def test_delay_uses_percentile():
+    policy = HedgingPolicy(percentile=0.9, initial_delay=2.0, min_samples=10)
+
+    assert policy.delay("GetCurrencies") == 2.0
+    for latency in range(1, 11):
+        policy.record("GetCurrencies", latency / 10)
+
+    assert policy.delay("GetCurrencies") == 1.0
+    assert policy.delay("OpStateExt") == 2.0
+
+
+def test_sync_hedged_request_wins():
+    policy = HedgingPolicy(initial_delay=0.05, max_hedge_rate=1)
+    calls = []
+
+    def request() -> int:
+        calls.append(None)
+        if len(calls) == 1:
+            time.sleep(0.5)
+        return len(calls)
+
+    started = time.monotonic()
+    assert policy.run("OpStateExt", request) == 2
+    assert time.monotonic() - started < 0.4
+    assert policy.hedges == policy.hedge_wins == 1
+    policy.close()
+
+
+def test_hedge_rate_is_limited():
+    policy = HedgingPolicy(initial_delay=0, max_hedge_rate=0.5)
+
+    def request() -> None:
+        time.sleep(0.01)
+
+    for _ in range(10):
+        policy.run("OpStateExt", request)
+
+    assert policy.requests == 10
+    assert policy.hedges == 5
+    policy.close()
+
+
+@pytest.mark.asyncio
+async def test_async_hedged_request_cancels_loser():
+    policy = HedgingPolicy(initial_delay=0.05, max_hedge_rate=1)
+    cancelled = []
+    calls = []
+
+    async def request() -> int:
+        calls.append(None)
+        number = len(calls)
+        try:
+            if number == 1:
+                await asyncio.sleep(1)
+            return number
+        except asyncio.CancelledError:
+            cancelled.append(number)
+            raise
+
+    assert await policy.arun("GetCurrencies", request) == 2
+    await asyncio.sleep(0)
+    assert cancelled == [1]
+
+
+@pytest.mark.asyncio
+async def test_async_fast_request_is_not_hedged():
+    policy = HedgingPolicy(initial_delay=1, max_hedge_rate=1)
+
+    async def request() -> str:
+        return "ok"
+
+    assert await policy.arun("GetCurrencies", request) == "ok"
+    assert policy.hedges == 0
+
+
+def test_sync_requests_are_not_limited_by_hedge_workers():
+    policy = HedgingPolicy(initial_delay=10, max_workers=1)
+
+    def request() -> None:
+        time.sleep(0.2)
+
+    threads = [
+        threading.Thread(target=policy.run, args=("OpStateExt", request))
+        for _ in range(4)
+    ]
+    started = time.monotonic()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert time.monotonic() - started < 0.5
+    assert policy.hedges == 0
+    policy.close()
+
+
+def test_hedge_win_records_latency_of_original():
+    policy = HedgingPolicy(initial_delay=0.05, max_hedge_rate=1, min_samples=1)
+    calls = []
+
+    def request() -> None:
+        calls.append(None)
+        if len(calls) == 1:
+            time.sleep(0.3)
+
+    policy.run("OpStateExt", request)
+
+    assert policy.hedge_wins == 1
+    assert policy.delay("OpStateExt") >= 0.05
+    policy.close()
+
+
+def test_delay_while_recording_from_threads():
+    policy = HedgingPolicy(min_samples=1, window=10_000)
+    stop = threading.Event()
+
+    def record() -> None:
+        while not stop.is_set():
+            policy.record("GetCurrencies", 0.1)
+
+    threads = [threading.Thread(target=record) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    try:
+        for _ in range(200):
+            policy.delay("GetCurrencies")
+    finally:
+        stop.set()
+        for thread in threads:
+            thread.join()
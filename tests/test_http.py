@@ -1,8 +1,17 @@
+import asyncio
+import socket
+import ssl
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from importlib.util import find_spec
+
+import httpx
 import pytest
 
 from robokassa import HashAlgorithm
 from robokassa.asyncio.connection import AsyncHttpConnection
 from robokassa.connection import HttpConnection, Requests
+from robokassa.dns import DNSCache, DNSCachingTransport
 from robokassa.exceptions import RobokassaInterfaceError
 from robokassa.hash import Hash
 from robokassa.payment import PaymentRequests
@@ -69,3 +78,127 @@ def test_sync_http_link_generation():
         assert link
     except RobokassaInterfaceError as ex:
         assert "26" in str(ex)
+
+
+class TestAsyncConnectionPool:
+    @pytest.mark.asyncio
+    async def test_client_is_reused(self):
+        conn = AsyncHttpConnection()
+
+        async with conn as first:
+            pass
+        async with conn as second:
+            assert first is second
+            assert not second.is_closed
+
+        await conn.aclose()
+        assert first.is_closed
+
+    @pytest.mark.skipif(find_spec("h2") is not None, reason="h2 is installed")
+    def test_http2_requires_h2(self):
+        with pytest.raises(ImportError):
+            AsyncHttpConnection(http2=True)
+
+
+@pytest.fixture
+def local_server():
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_HEAD(self):
+            self.send_response(200)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://localhost:{server.server_address[1]}"
+    server.shutdown()
+
+
+def test_dns_cache(monkeypatch):
+    calls = []
+    getaddrinfo = socket.getaddrinfo
+
+    def counted_getaddrinfo(*args, **kwargs):
+        calls.append(args)
+        return getaddrinfo(*args, **kwargs)
+
+    monkeypatch.setattr(socket, "getaddrinfo", counted_getaddrinfo)
+    dns_cache = DNSCache(ttl=60)
+
+    assert "127.0.0.1" in dns_cache.resolve("localhost", 80)
+    assert "127.0.0.1" in dns_cache.resolve("localhost", 80)
+    assert len(calls) == 1
+
+    dns_cache.invalidate("localhost", 80)
+    dns_cache.resolve("localhost", 80)
+    assert len(calls) == 2
+
+
+def test_warmup(local_server):
+    conn = HttpConnection(base_url=local_server, dns_cache=DNSCache())
+
+    assert conn.warmup(3) == 3
+    with conn as client:
+        assert len(client._transport._pool.connections) == 3
+    conn.close()
+
+
+def test_warmup_of_no_connections():
+    conn = HttpConnection(base_url="https://auth.robokassa.ru/Merchant")
+
+    assert conn.warmup(0) == 0
+    with pytest.raises(ValueError, match="negative"):
+        conn.warmup(-1)
+
+
+@pytest.mark.asyncio
+async def test_async_warmup_of_no_connections():
+    conn = AsyncHttpConnection(base_url="https://auth.robokassa.ru/Merchant")
+
+    assert await conn.awarmup(0) == 0
+    with pytest.raises(ValueError, match="negative"):
+        await conn.awarmup(-1)
+
+
+@pytest.mark.asyncio
+async def test_async_warmup(local_server):
+    conn = AsyncHttpConnection(base_url=local_server, dns_cache=DNSCache())
+
+    assert await conn.awarmup(3) == 3
+    async with conn as client:
+        assert len(client._transport._pool.connections) == 3
+    await conn.aclose()
+
+
+def test_async_client_of_previous_loop_is_closed(local_server):
+    conn = AsyncHttpConnection(base_url=local_server, dns_cache=DNSCache())
+
+    async def request():
+        async with conn as client:
+            response = await client.head("/")
+        return client, response.status_code
+
+    first, status_code = asyncio.run(request())
+    second, _ = asyncio.run(request())
+
+    assert status_code == 200
+    assert first is not second
+    assert first.is_closed
+    asyncio.run(conn.aclose())
+
+
+def test_dns_caching_transport_keeps_settings():
+    transport = DNSCachingTransport(
+        DNSCache(), verify=False, limits=httpx.Limits(max_connections=7), retries=2
+    )
+
+    assert transport._pool._max_connections == 7
+    assert transport._pool._retries == 2
+    assert transport._pool._ssl_context.verify_mode == ssl.CERT_NONE
+    transport.close()
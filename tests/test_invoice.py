@@ -0,0 +1,116 @@
+import base64
+import json
+
+import httpx
+import pytest
+
+from robokassa import HashAlgorithm, Robokassa
+from robokassa.asyncio import Robokassa as AsyncRobokassa
+from robokassa.asyncio.connection import AsyncHttpConnection
+from robokassa.connection import HttpConnection
+from robokassa.exceptions import RobokassaInterfaceError
+
+
+def decode(part: str) -> dict:
+    return json.loads(base64.urlsafe_b64decode(part + "=" * (-len(part) % 4)))
+
+
+def invoice_transport(sent, total=250):
+    def handler(request: httpx.Request) -> httpx.Response:
+        token = json.loads(request.content)
+        payload = decode(token.split(".")[1])
+        sent.append((request.url.path.rsplit("/", 1)[1], payload))
+        if request.url.path.endswith("/GetInvoiceInformationList"):
+            start = (payload["CurrentPage"] - 1) * payload["PageSize"]
+            stop = min(start + payload["PageSize"], total)
+            return httpx.Response(
+                200,
+                json={
+                    "isSuccess": True,
+                    "invoices": [{"InvId": i} for i in range(start, stop)],
+                },
+            )
+        if payload.get("InvId") == 0:
+            return httpx.Response(
+                200, json={"isSuccess": False, "errorMessage": "bad invoice"}
+            )
+        return httpx.Response(
+            200, json={"isSuccess": True, "id": "abc", "url": "https://rbk.ru/abc"}
+        )
+
+    return httpx.MockTransport(handler)
+
+
+def test_invoice_api(monkeypatch):
+    sent = []
+    transport = invoice_transport(sent)
+    monkeypatch.setattr(
+        HttpConnection,
+        "_create_client",
+        lambda self: httpx.Client(base_url=self.base_url, transport=transport),
+    )
+    robokassa = Robokassa("demo", "p1", "p2", HashAlgorithm.sha256)
+
+    result = robokassa.create_invoice(10, inv_id=5, description="Book")
+    assert result["url"] == "https://rbk.ru/abc"
+    assert sent[0] == (
+        "CreateInvoice",
+        {
+            "MerchantLogin": "demo",
+            "InvoiceType": "OneTime",
+            "OutSum": 10,
+            "InvId": 5,
+            "Description": "Book",
+        },
+    )
+    with pytest.raises(RobokassaInterfaceError, match="bad invoice"):
+        robokassa.create_invoice(10, inv_id=0)
+
+    robokassa.deactivate_invoice(id_="abc")
+    assert sent[-1] == ("DeactivateInvoice", {"MerchantLogin": "demo", "Id": "abc"})
+    with pytest.raises(ValueError):
+        robokassa.deactivate_invoice()
+
+
+def test_iter_invoices_is_lazy(monkeypatch):
+    sent = []
+    transport = invoice_transport(sent)
+    monkeypatch.setattr(
+        HttpConnection,
+        "_create_client",
+        lambda self: httpx.Client(base_url=self.base_url, transport=transport),
+    )
+    robokassa = Robokassa("demo", "p1", "p2")
+
+    invoices = robokassa.iter_invoices(page_size=100, statuses=["paid"])
+    assert sent == []
+    assert next(invoices) == {"InvId": 0}
+    invoices.close()
+    # prefetch of the second page is cancelled if it hasn't started yet
+    assert [payload["CurrentPage"] for _, payload in sent] in ([1], [1, 2])
+    assert sent[0][1]["InvoiceStatuses"] == ["paid"]
+
+    sent.clear()
+    assert [invoice["InvId"] for invoice in robokassa.iter_invoices(100)] == list(
+        range(250)
+    )
+    assert len(sent) == 3
+
+
+@pytest.mark.asyncio
+async def test_async_iter_invoices(monkeypatch):
+    sent = []
+    transport = invoice_transport(sent, total=200)
+    monkeypatch.setattr(
+        AsyncHttpConnection,
+        "_create_client",
+        lambda self: httpx.AsyncClient(base_url=self.base_url, transport=transport),
+    )
+    robokassa = AsyncRobokassa("demo", "p1", "p2")
+
+    invoices = [invoice["InvId"] async for invoice in robokassa.iter_invoices(50)]
+
+    assert invoices == list(range(200))
+    # the last full page is followed by empty one
+    assert len(sent) == 5
+    assert (await robokassa.create_invoice(1))["id"] == "abc"
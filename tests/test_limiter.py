@@ -0,0 +1,124 @@
+import asyncio
+
+import httpx
+import pytest
+
+from robokassa import HashAlgorithm
+from robokassa.asyncio import Robokassa
+from robokassa.asyncio.batch import run_batch
+from robokassa.asyncio.limiter import AIMDLimiter
+from robokassa.exceptions import RobokassaInterfaceError
+from robokassa.responses import OperationStateResult
+
+pytest_plugins = ("pytest_asyncio",)
+
+
+@pytest.mark.asyncio
+async def test_limit_grows_and_drops():
+    limiter = AIMDLimiter(initial_limit=2, max_limit=8)
+
+    for _ in range(20):
+        await limiter.release(await limiter.acquire())
+    assert limiter.limit > 2
+
+    grown = limiter.limit
+    await limiter.release(await limiter.acquire(), httpx.ReadTimeout("timeout"))
+    assert limiter.limit == grown // 2
+    assert limiter.metrics()["failures"] == 1
+
+
+@pytest.mark.asyncio
+async def test_one_congestion_decreases_once():
+    limiter = AIMDLimiter(initial_limit=8)
+    slots = [await limiter.acquire() for _ in range(4)]
+
+    for started_at in slots:
+        await limiter.release(started_at, RobokassaInterfaceError("unavailable"))
+
+    assert limiter.limit == 4
+    assert limiter.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_run_batch_respects_limit():
+    limiter = AIMDLimiter(initial_limit=3, max_limit=3)
+    running = []
+    peak = []
+
+    async def func(item: int) -> int:
+        running.append(item)
+        peak.append(len(running))
+        await asyncio.sleep(0.01)
+        running.remove(item)
+        if item == 5:
+            raise ValueError("bad item")
+        return item * 2
+
+    results = await run_batch(range(10), func, limiter)
+
+    assert max(peak) == 3
+    assert [result.index for result in results] == list(range(10))
+    assert results[1].value == 2
+    assert not results[5].ok
+    assert isinstance(results[5].error, ValueError)
+
+
+@pytest.mark.asyncio
+async def test_client_batch_operation_states(monkeypatch):
+    robokassa = Robokassa("test_login", "p1", "p2", algorithm=HashAlgorithm.md5)
+
+    async def get_operation_state(invoice_id, *args, **kwargs):
+        return OperationStateResult(
+            f"<OperationStateResponse><Info><InvoiceID>{invoice_id}</InvoiceID>"
+            "</Info></OperationStateResponse>".encode()
+        )
+
+    monkeypatch.setattr(
+        robokassa._async_merchant,
+        "get_operation_state",
+        lambda invoice_id, signature_value, **kwargs: get_operation_state(invoice_id),
+    )
+    results = await robokassa.get_operation_states([1, 2, 3])
+
+    assert [result.value["Info"]["InvoiceID"] for result in results] == ["1", "2", "3"]
+    assert robokassa.limiter.in_flight == 0
+
+
+def test_limiter_is_reused_by_several_loops():
+    limiter = AIMDLimiter(initial_limit=1, max_limit=1)
+
+    async def func(item: int) -> int:
+        await asyncio.sleep(0.001)
+        return item
+
+    for _ in range(2):
+        results = asyncio.run(run_batch(range(5), func, limiter))
+        assert [result.value for result in results] == list(range(5))
+    assert limiter.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_cancelled_item_is_not_success():
+    limiter = AIMDLimiter(initial_limit=2)
+
+    async def func(item: int) -> int:
+        await asyncio.sleep(10)
+        return item
+
+    task = asyncio.ensure_future(run_batch(range(2), func, limiter))
+    await asyncio.sleep(0.01)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    assert limiter.successes == 0
+    assert limiter.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_unexpected_error_fails_batch():
+    async def func(item: int) -> int:
+        raise TypeError("bug")
+
+    with pytest.raises(TypeError):
+        await run_batch(range(3), func, AIMDLimiter())
@@ -0,0 +1,155 @@
+"""
+Memory budgets of hot operations.
+
+Every operation is run under tracemalloc. Its peak of traced memory and
+count of blocks which are still alive after it must fit the budget of
+`memory_budgets.json`. After intended change of memory profile update
+budgets with headroom by:
+
+    python -m tests.test_memory_budget --update
+"""
+
+import gc
+import json
+import sys
+import tracemalloc
+import xml.etree.ElementTree as Et
+from pathlib import Path
+from typing import Callable, Dict, Tuple
+
+import pytest
+
+from robokassa.hash import Hash, HashAlgorithm
+from robokassa.payment import PaymentUrlGenerator
+from robokassa.signature import SignaturesChecker
+from robokassa.types import RobokassaParams, Signature
+from robokassa.utils import xml_to_dict
+
+BUDGETS_PATH = Path(__file__).with_name("memory_budgets.json")
+HEADROOM = 1.5
+
+HASH = Hash(HashAlgorithm.sha512)
+SHP = {"shp_product": "book-42", "shp_user": "7f3b"}
+
+
+def currencies_document(groups: int = 100, currencies: int = 50) -> bytes:
+    items = "".join(
+        f'<Group Code="G{group}" Description="Group {group}"><Items>'
+        + "".join(
+            f'<Currency Label="L{group}-{item}" Alias="A{item}" '
+            f'Name="Currency {item}" MinValue="1" MaxValue="100000" />'
+            for item in range(currencies)
+        )
+        + "</Items></Group>"
+        for group in range(groups)
+    )
+    return (
+        '<?xml version="1.0" encoding="utf-8"?>'
+        '<CurrenciesList xmlns="http://merchant.roboxchange.com/WebService/">'
+        f"<Result><Code>0</Code></Result><Groups>{items}</Groups></CurrenciesList>"
+    ).encode()
+
+
+def create_signatures(count: int) -> None:
+    for inv_id in range(count):
+        Signature(
+            merchant_login="demo",
+            out_sum=100,
+            inv_id=inv_id,
+            password="password1",
+            hash_=HASH,
+            additional_params=SHP,
+        )
+
+
+def verify_signatures(count: int) -> None:
+    checker = SignaturesChecker(HASH, "password1", "password2")
+    for inv_id in range(count):
+        checker.result_url_signature_is_valid("0" * 128, 100, inv_id, **SHP)
+
+
+def generate_links(count: int) -> None:
+    generator = PaymentUrlGenerator("demo", "password1", False, HASH)
+    for inv_id in range(count):
+        generator.generate_by_script(100, inv_id=inv_id, description="Book", **SHP)
+
+
+def params_as_dict(count: int) -> None:
+    for inv_id in range(count):
+        RobokassaParams(
+            merchant_login="demo",
+            out_sum=100,
+            inv_id=inv_id,
+            description="Book",
+            signature_value="0" * 128,
+            additional_params=SHP,
+        ).as_dict()
+
+
+DOCUMENT = currencies_document()
+
+
+def parse_currencies(count: int) -> None:
+    for _ in range(count):
+        xml_to_dict(Et.fromstring(DOCUMENT))
+
+
+# operation and count of its repeats
+OPERATIONS: Dict[str, Tuple[Callable[[int], None], int]] = {
+    "signature_create_1k": (create_signatures, 1000),
+    "signature_verify_1k": (verify_signatures, 1000),
+    "generate_by_script_1k": (generate_links, 1000),
+    "robokassa_params_as_dict_1k": (params_as_dict, 1000),
+    "xml_to_dict_currencies_5k": (parse_currencies, 1),
+    "batch_links_100k": (generate_links, 100_000),
+}
+
+
+def measure(operation: Callable[[int], None], count: int) -> Dict[str, int]:
+    # warm up caches of interpreter, they are not a regression
+    operation(min(count, 100))
+    gc.collect()
+    tracemalloc.start()
+    try:
+        operation(count)
+        gc.collect()
+        _, peak = tracemalloc.get_traced_memory()
+        snapshot = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+    blocks = sum(stat.count for stat in snapshot.statistics("filename"))
+    return {"peak_bytes": peak, "retained_blocks": blocks}
+
+
+def load_budgets() -> Dict[str, Dict[str, int]]:
+    return json.loads(BUDGETS_PATH.read_text())
+
+
+@pytest.mark.parametrize("name", sorted(OPERATIONS))
+def test_memory_budget(name):
+    budget = load_budgets()[name]
+    usage = measure(*OPERATIONS[name])
+
+    for metric, limit in budget.items():
+        assert usage[metric] <= limit, (
+            f"{name}: {metric} {usage[metric]} exceeds budget {limit}"
+        )
+
+
+def update_budgets() -> None:
+    budgets = {}
+    for name, operation in sorted(OPERATIONS.items()):
+        usage = measure(*operation)
+        budgets[name] = {
+            metric: int(value * HEADROOM) + 256 for metric, value in usage.items()
+        }
+        print(name, usage)
+    BUDGETS_PATH.write_text(json.dumps(budgets, indent=2) + "\n")
+
+
+if __name__ == "__main__":
+    if "--update" in sys.argv:
+        update_budgets()
+    else:
+        for name, operation in sorted(OPERATIONS.items()):
+            print(name, measure(*operation))
@@ -0,0 +1,99 @@
+import pytest
+
+from robokassa import Robokassa
+from robokassa.exceptions import RobokassaInterfaceError, RobokassaUnavailableError
+from robokassa.outbox import InvoiceOutbox
+from robokassa.payment import PaymentInterface
+
+
+def test_outbox_drains_after_outage(tmp_path):
+    completed = []
+    outbox = InvoiceOutbox(
+        tmp_path / "outbox.sqlite3",
+        retry_interval=0,
+        on_complete=lambda job_id, url, error: completed.append((job_id, url)),
+    )
+    job_id = outbox.enqueue({"inv_id": 1, "out_sum": 100, "description": "Order"})
+    future = outbox.future(job_id)
+    available = []
+
+    def send(inv_id, out_sum, description):
+        if not available:
+            raise RobokassaUnavailableError("unavailable")
+        return f"https://auth.robokassa.ru/Merchant/Index/{inv_id}"
+
+    assert not outbox.drain_once(send)
+    assert outbox.pending_count() == 1
+    assert not future.done()
+
+    available.append(True)
+    assert outbox.drain_once(send)
+    assert future.result() == "https://auth.robokassa.ru/Merchant/Index/1"
+    assert completed == [(job_id, future.result())]
+    assert outbox.pending_count() == 0
+    assert not outbox.drain_once(send)
+
+
+def test_outbox_survives_restart(tmp_path):
+    outbox = InvoiceOutbox(tmp_path / "outbox.sqlite3")
+    job_id = outbox.enqueue({"inv_id": 2, "out_sum": 1, "description": "Order"})
+    outbox.close()
+
+    def send(inv_id, out_sum, description):
+        raise RobokassaInterfaceError("Error code: 26")
+
+    restarted = InvoiceOutbox(tmp_path / "outbox.sqlite3")
+    assert restarted.pending_count() == 1
+    assert restarted.drain_once(send)
+    with pytest.raises(RobokassaInterfaceError):
+        restarted.result(job_id)
+
+
+def test_client_defers_on_outage(tmp_path, monkeypatch):
+    def create_url_to_payment_page(self, robokassa_params, *args):
+        raise RobokassaUnavailableError("unavailable")
+
+    monkeypatch.setattr(
+        PaymentInterface, "create_url_to_payment_page", create_url_to_payment_page
+    )
+    outbox = InvoiceOutbox(tmp_path / "outbox.sqlite3", retry_interval=60)
+    robokassa = Robokassa("test_login", "p1", "p2", outbox=outbox)
+
+    future = robokassa.defer_link_to_payment_page_by_invoice_id(
+        inv_id=1, out_sum=100, description="Order"
+    )
+
+    assert not future.done()
+    assert outbox.pending_count() == 1
+    robokassa.close()
+
+
+def test_outage_postpones_whole_queue(tmp_path):
+    outbox = InvoiceOutbox(tmp_path / "outbox.sqlite3", retry_interval=60)
+    for inv_id in (1, 2):
+        outbox.enqueue({"inv_id": inv_id, "out_sum": 100, "description": "Order"})
+    sent = []
+
+    def send(inv_id, out_sum, description):
+        sent.append(inv_id)
+        raise RobokassaUnavailableError("unavailable")
+
+    assert not outbox.drain_once(send)
+    assert not outbox.drain_once(send)
+    assert sent == [1]
+
+
+def test_unexpected_error_fails_job(tmp_path):
+    outbox = InvoiceOutbox(tmp_path / "outbox.sqlite3")
+    job_id = outbox.enqueue({"inv_id": 3, "out_sum": 100, "description": "Order"})
+    future = outbox.future(job_id)
+
+    def send(inv_id, out_sum, description):
+        raise KeyError("invoiceID")
+
+    assert outbox.drain_once(send)
+    with pytest.raises(KeyError):
+        future.result()
+    assert outbox.pending_count() == 0
+    with pytest.raises(RobokassaInterfaceError):
+        outbox.result(job_id)
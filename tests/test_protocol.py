@@ -0,0 +1,49 @@
+import httpx
+import pytest
+
+from robokassa import protocol
+from robokassa.exceptions import RobokassaInterfaceError, RobokassaUnavailableError
+from robokassa.types import RobokassaParams
+
+
+def test_create_invoice_request():
+    request = protocol.create_invoice(
+        RobokassaParams(merchant_login="demo", out_sum=100, inv_id=1, is_test=True)
+    )
+
+    assert request.url == "Indexjson.aspx"
+    assert request.data["MerchantLogin"] == "demo"
+    assert not request.idempotent
+
+    result = request.parse(200, b'{"invoiceID": "abc", "errorCode": 0}')
+    assert protocol.payment_page_url(result) == f"{protocol.PAYMENT_URL}/abc"
+
+    with pytest.raises(RobokassaInterfaceError):
+        protocol.payment_page_url(request.parse(200, b'{"errorCode": 33}'))
+    with pytest.raises(RobokassaUnavailableError):
+        request.parse(502, b"")
+
+
+def test_core_with_custom_transport():
+    sent = []
+
+    def handler(http_request: httpx.Request) -> httpx.Response:
+        sent.append(http_request)
+        return httpx.Response(
+            200,
+            content=b"<OperationStateResponse><State><Code>100</Code></State>"
+            b"</OperationStateResponse>",
+        )
+
+    request = protocol.get_operation_state("demo", 7, "signature")
+    with httpx.Client(
+        base_url="https://auth.robokassa.ru/Merchant",
+        transport=httpx.MockTransport(handler),
+    ) as client:
+        response = client.post(request.url, data=request.data)
+    result = request.parse(response.status_code, response.content)
+
+    assert request.idempotent
+    assert sent[0].url.path == "/Merchant/WebService/Service.asmx/OpStateExt"
+    assert b"InvoiceID=7" in sent[0].content
+    assert result.state_code == 100
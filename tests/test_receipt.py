@@ -0,0 +1,74 @@
+from urllib.parse import parse_qs, unquote, urlparse
+
+from robokassa import HashAlgorithm, Robokassa, codec
+from robokassa.hash import Hash
+from robokassa.payment import PaymentInterface
+from robokassa.receipt import Receipt, ReceiptItem, ReceiptTemplateCache
+
+COFFEE = ReceiptItem("Кофе", "vat20", "full_payment", "commodity")
+TEA = ReceiptItem("Tea", "none", extra=(("nomenclature_code", "04620034587217"),))
+
+
+def test_receipt_encoding_matches_json():
+    receipt = Receipt("osn").add(COFFEE, 2, 300.5).add(TEA, 1, 100)
+
+    assert unquote(receipt.encode()) == codec.dumps(receipt.as_dict())
+    assert unquote(Receipt().add(TEA, 1, 1).encode()).startswith('{"items":[')
+
+
+def test_template_cache_reuses_items():
+    cache = ReceiptTemplateCache()
+    for quantity in range(1, 4):
+        Receipt(template_cache=cache).add(COFFEE, quantity, quantity * 150).encode()
+
+    info = cache.cache_info()
+    assert info.misses == 1
+    assert info.hits == 2
+
+
+def test_script_link_with_receipt():
+    robokassa = Robokassa(
+        merchant_login="demo",
+        password1="password1",
+        password2="password2",
+        algorithm=HashAlgorithm.md5,
+    )
+    receipt = Receipt("osn").add(COFFEE, 1, 100)
+
+    link = robokassa.create_link_to_payment_page_by_script(
+        out_sum=100, inv_id=1, receipt=receipt
+    )
+    params = parse_qs(urlparse(link).query)
+
+    assert params["Receipt"] == [receipt.encode()]
+    assert params["SignatureValue"] == [
+        Hash(HashAlgorithm.md5).hash_data(f"demo:100:1:{receipt.encode()}:password1")
+    ]
+
+
+def test_invoice_link_with_receipt(monkeypatch):
+    sent = []
+
+    def create_url_to_payment_page(self, robokassa_params, *args):
+        sent.append(robokassa_params.as_dict())
+        return "https://auth.robokassa.ru/Merchant/Index/1"
+
+    monkeypatch.setattr(
+        PaymentInterface, "create_url_to_payment_page", create_url_to_payment_page
+    )
+    robokassa = Robokassa(
+        merchant_login="demo",
+        password1="password1",
+        password2="password2",
+        algorithm=HashAlgorithm.md5,
+    )
+    receipt = Receipt().add(TEA, 1, 100).encode()
+
+    robokassa.create_link_to_payment_page_by_invoice_id(
+        inv_id=1, out_sum=100, description="Order", receipt=receipt
+    )
+
+    assert sent[0]["Receipt"] == receipt
+    assert sent[0]["SignatureValue"] == Hash(HashAlgorithm.md5).hash_data(
+        f"demo:100:1:{receipt}:password1"
+    )
@@ -0,0 +1,211 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from robokassa import HashAlgorithm, Robokassa
+from robokassa.asyncio.recurring import AsyncRecurringRunner
+from robokassa.connection import HttpConnection
+from robokassa.deadline import Deadline
+from robokassa.exceptions import (
+    DeadlineExceededError,
+    DeadlineExceededInFlightError,
+    RobokassaInterfaceError,
+)
+from robokassa.hash import Hash
+from robokassa.recurring import (
+    ChargeStatus,
+    RecurringCharge,
+    RecurringJournal,
+    RecurringRunner,
+)
+from robokassa.responses import RecurringResult
+
+
+class FakeClient:
+    def __init__(self, errors=None, known=()):
+        self.charged = []
+        self.errors = errors or {}
+        self.known = set(known)
+
+    def charge_recurring(self, previous_inv_id, inv_id, out_sum, **kwargs):
+        self.charged.append(inv_id)
+        if inv_id in self.errors:
+            raise self.errors[inv_id]
+        return str(inv_id)
+
+    def get_operation_state(self, invoice_id):
+        code = "0" if invoice_id in self.known else "3"
+        return {"Result": {"Code": code}}
+
+
+class AsyncFakeClient(FakeClient):
+    async def charge_recurring(self, *args, **kwargs):
+        await asyncio.sleep(0)
+        return super().charge_recurring(*args, **kwargs)
+
+    async def get_operation_state(self, invoice_id):
+        return super().get_operation_state(invoice_id)
+
+
+def test_client_charge_recurring(monkeypatch):
+    sent = []
+
+    def send(self, request, *args):
+        sent.append(request)
+        return request.parse(200, b"OK+42")
+
+    monkeypatch.setattr(HttpConnection, "send", send)
+    robokassa = Robokassa("demo", "password1", "password2", HashAlgorithm.md5)
+
+    assert robokassa.charge_recurring(previous_inv_id=1, inv_id=42, out_sum=100) == "42"
+    assert sent[0].url == "Recurring"
+    assert sent[0].data == {
+        "MerchantLogin": "demo",
+        "OutSum": 100,
+        "SignatureValue": Hash(HashAlgorithm.md5).hash_data("demo:100:42:password1"),
+        "InvoiceID": 42,
+        "PreviousInvoiceID": 1,
+    }
+
+    with pytest.raises(RobokassaInterfaceError, match="rejected"):
+        _ = RecurringResult(b"ERROR").invoice_id
+
+
+def test_runner_records_outcomes(tmp_path):
+    journal = RecurringJournal(tmp_path / "recurring.sqlite3")
+    client = FakeClient(
+        errors={
+            2: RobokassaInterfaceError("Recurring charge rejected: ERROR"),
+            3: httpx.ConnectError("refused"),
+            4: httpx.ReadTimeout("timeout"),
+        }
+    )
+    records = [(100, inv_id, 10) for inv_id in range(1, 6)]
+
+    report = RecurringRunner(client, journal, concurrency=2).run(iter(records))
+
+    assert report[ChargeStatus.accepted] == 2
+    assert report[ChargeStatus.rejected] == 1
+    assert report[ChargeStatus.pending] == 1
+    assert report[ChargeStatus.unknown] == 1
+    assert journal.charges(ChargeStatus.unknown) == ["4"]
+
+    # charge 3 wasn't sent and charge 4 isn't known by Robokassa
+    client = FakeClient()
+    report = RecurringRunner(client, journal, not_found_grace=0).run(records)
+
+    assert sorted(client.charged) == [3, 4]
+    assert report.skipped == 3
+    assert journal.counts() == {ChargeStatus.accepted: 4, ChargeStatus.rejected: 1}
+
+
+def test_runner_doesnt_resend_after_crash(tmp_path):
+    journal = RecurringJournal(tmp_path / "recurring.sqlite3")
+    # crash after charges were marked as sending
+    journal.claim(RecurringCharge(100, 1, 10))
+    journal.claim(RecurringCharge(100, 2, 10))
+    journal.claim(RecurringCharge(100, 3, 10))
+    client = FakeClient(known={1})
+
+    RecurringRunner(client, journal, not_found_grace=0).run(
+        [(100, 1, 10), (100, 2, 10)]
+    )
+
+    assert client.charged == [2]
+    assert journal.status(1) is ChargeStatus.accepted
+
+    RecurringRunner(client, journal, reconcile=False).run([(100, 3, 10)])
+    assert client.charged == [2]
+    assert journal.status(3) is ChargeStatus.unknown
+
+
+def test_runner_waits_before_resending_not_found_charge(tmp_path):
+    journal = RecurringJournal(tmp_path / "recurring.sqlite3")
+    RecurringRunner(FakeClient(errors={1: httpx.ReadTimeout("timeout")}), journal).run(
+        [(100, 1, 10)]
+    )
+    sent_at = journal.updated_at(1)
+
+    # Robokassa may not know yet about charge which was just sent
+    client = FakeClient()
+    report = RecurringRunner(client, journal).run([(100, 1, 10)])
+
+    assert client.charged == []
+    assert report[ChargeStatus.unknown] == 1
+    assert journal.updated_at(1) == sent_at
+
+    RecurringRunner(client, journal, not_found_grace=0).run([(100, 1, 10)])
+    assert client.charged == [1]
+    assert journal.status(1) is ChargeStatus.accepted
+
+
+def test_runner_reconciles_charge_after_deadline_in_flight(tmp_path):
+    journal = RecurringJournal(tmp_path / "recurring.sqlite3")
+    client = FakeClient(
+        errors={
+            1: DeadlineExceededInFlightError("deadline"),
+            2: DeadlineExceededError("deadline"),
+        }
+    )
+
+    RecurringRunner(client, journal).run([(100, 1, 10), (100, 2, 10)])
+
+    assert journal.status(1) is ChargeStatus.unknown
+    assert journal.status(2) is ChargeStatus.pending
+
+    # Robokassa accepted charge 1 before deadline passed
+    client = FakeClient(known={1})
+    RecurringRunner(client, journal).run([(100, 1, 10), (100, 2, 10)])
+
+    assert client.charged == [2]
+    assert journal.counts() == {ChargeStatus.accepted: 2}
+
+
+def test_deadline_while_waiting_for_response_leaves_charge_unknown(tmp_path):
+    def slow_body():
+        yield b"OK"
+        time.sleep(0.2)
+        yield b"+1"
+
+    robokassa = Robokassa(
+        "demo",
+        "password1",
+        "password2",
+        HashAlgorithm.md5,
+        transport=httpx.MockTransport(
+            lambda request: httpx.Response(200, content=slow_body())
+        ),
+    )
+    journal = RecurringJournal(tmp_path / "recurring.sqlite3")
+
+    with Deadline(0.1):
+        report = RecurringRunner(robokassa, journal).run([(100, 1, 10)])
+
+    assert report[ChargeStatus.unknown] == 1
+    assert journal.status(1) is ChargeStatus.unknown
+
+
+def test_runner_stops_on_unexpected_error(tmp_path):
+    journal = RecurringJournal(tmp_path / "recurring.sqlite3")
+    client = FakeClient(errors={1: KeyError("bug")})
+
+    with pytest.raises(KeyError):
+        RecurringRunner(client, journal).run([(100, 1, 10)])
+    assert journal.status(1) is ChargeStatus.sending
+
+
+@pytest.mark.asyncio
+async def test_async_runner(tmp_path):
+    journal = RecurringJournal(tmp_path / "recurring.sqlite3")
+    client = AsyncFakeClient(errors={2: httpx.ConnectError("refused")})
+
+    async def records():
+        for inv_id in range(1, 11):
+            yield RecurringCharge(100, inv_id, 10)
+
+    report = await AsyncRecurringRunner(client, journal, concurrency=3).run(records())
+
+    assert report[ChargeStatus.accepted] == 9
+    assert journal.charges(ChargeStatus.pending) == ["2"]
@@ -0,0 +1,96 @@
+import base64
+import hmac
+import json
+
+import httpx
+import pytest
+
+from robokassa import HashAlgorithm, Robokassa
+from robokassa.asyncio import Robokassa as AsyncRobokassa
+from robokassa.asyncio.connection import AsyncHttpConnection
+from robokassa.connection import HttpConnection
+from robokassa.exceptions import RobokassaInterfaceError
+from robokassa.jwt import JWTSigner
+
+
+def decode(part: str) -> dict:
+    return json.loads(base64.urlsafe_b64decode(part + "=" * (-len(part) % 4)))
+
+
+def test_jwt_signer():
+    signer = JWTSigner("password3", HashAlgorithm.sha256)
+    token = signer.sign({"OpKey": "key", "RefundSum": 10})
+    header, payload, signature = token.split(".")
+
+    assert decode(header) == {"typ": "JWT", "alg": "HS256"}
+    assert decode(payload) == {"OpKey": "key", "RefundSum": 10}
+    expected = hmac.new(b"password3", f"{header}.{payload}".encode(), "sha256")
+    assert (
+        signature == base64.urlsafe_b64encode(expected.digest()).rstrip(b"=").decode()
+    )
+    # keyed state is reused for every token
+    assert signer.sign({"OpKey": "other"}) != token
+
+
+def refund_transport(sent):
+    def handler(request: httpx.Request) -> httpx.Response:
+        sent.append(request)
+        if request.url.path.endswith("/GetState"):
+            return httpx.Response(
+                200, json={"requestId": request.url.params["id"], "label": "finished"}
+            )
+        payload = decode(request.content.decode().split(".")[1])
+        if payload["OpKey"] == "bad":
+            return httpx.Response(200, json={"success": False, "message": "bad key"})
+        return httpx.Response(
+            200, json={"success": True, "requestId": f"r-{payload['OpKey']}"}
+        )
+
+    return httpx.MockTransport(handler)
+
+
+def test_refunds(monkeypatch):
+    sent = []
+    transport = refund_transport(sent)
+    monkeypatch.setattr(
+        HttpConnection,
+        "_create_client",
+        lambda self: httpx.Client(base_url=self.base_url, transport=transport),
+    )
+    robokassa = Robokassa(
+        "demo", "p1", "p2", HashAlgorithm.sha256, password3="password3"
+    )
+
+    assert robokassa.create_refund("key", refund_sum=10) == "r-key"
+    assert (
+        str(sent[0].url) == "https://services.robokassa.ru/RefundService/Refund/Create"
+    )
+    assert robokassa.get_refund_state("r-key")["label"] == "finished"
+
+    results = robokassa.create_refunds(
+        [{"op_key": "a"}, {"op_key": "bad"}, {"op_key": "c", "refund_sum": 1}]
+    )
+    assert [result.value for result in results] == ["r-a", None, "r-c"]
+    assert isinstance(results[1].error, RobokassaInterfaceError)
+
+    with pytest.raises(ValueError, match="password3"):
+        Robokassa("demo", "p1", "p2").create_refund("key")
+
+
+@pytest.mark.asyncio
+async def test_async_refunds(monkeypatch):
+    sent = []
+    transport = refund_transport(sent)
+    monkeypatch.setattr(
+        AsyncHttpConnection,
+        "_create_client",
+        lambda self: httpx.AsyncClient(base_url=self.base_url, transport=transport),
+    )
+    robokassa = AsyncRobokassa(
+        "demo", "p1", "p2", HashAlgorithm.sha256, password3="password3"
+    )
+
+    results = await robokassa.create_refunds({"op_key": str(i)} for i in range(50))
+
+    assert [result.value for result in results] == [f"r-{i}" for i in range(50)]
+    assert (await robokassa.get_refund_state("r-1"))["requestId"] == "r-1"
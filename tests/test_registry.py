@@ -0,0 +1,102 @@
+import json
+import os
+
+import pytest
+
+from robokassa import HashAlgorithm, MerchantCredentials, MerchantRegistry, Robokassa
+from robokassa.asyncio import AsyncMerchantRegistry
+from robokassa.exceptions import UnknownMerchantError
+from robokassa.hash import Hash
+from robokassa.types import Signature
+
+
+def make_signature(password: str, algorithm: HashAlgorithm) -> str:
+    return Signature(
+        out_sum=100,
+        inv_id=1,
+        password=password,
+        additional_params={"shp_id": 5},
+        hash_=Hash(algorithm),
+    ).value
+
+
+def test_registry_lookup():
+    registry = MerchantRegistry(
+        [
+            MerchantCredentials("shop1", "p1", "p2"),
+            MerchantCredentials("shop2", "q1", "q2", HashAlgorithm.sha256),
+        ]
+    )
+
+    assert len(registry) == 2
+    assert "shop1" in registry
+    assert registry.credentials("shop2").algorithm == HashAlgorithm.sha256
+    assert registry.result_signature_is_valid(
+        "shop2",
+        make_signature("q2", HashAlgorithm.sha256),
+        out_sum=100,
+        inv_id=1,
+        shp_id=5,
+    )
+    assert not registry.result_signature_is_valid(
+        "shop1",
+        make_signature("q2", HashAlgorithm.sha256),
+        out_sum=100,
+        inv_id=1,
+        shp_id=5,
+    )
+    with pytest.raises(UnknownMerchantError):
+        registry.get("shop3")
+
+
+def test_registry_links_match_client():
+    registry = MerchantRegistry([MerchantCredentials("shop1", "p1", "p2")])
+    robokassa = Robokassa("shop1", "p1", "p2")
+
+    assert registry.create_link_to_payment_page_by_script(
+        "shop1", out_sum=10, inv_id=3, user_id=1
+    ) == robokassa.create_link_to_payment_page_by_script(
+        out_sum=10, inv_id=3, user_id=1
+    )
+
+
+def test_registry_shares_engines():
+    registry = AsyncMerchantRegistry(
+        [
+            MerchantCredentials("shop1", "p1", "p2"),
+            MerchantCredentials("shop2", "q1", "q2"),
+        ]
+    )
+
+    assert registry.get("shop1").merchant._http is registry.get("shop2").merchant._http
+    assert registry.get("shop1").check._hash is registry.get("shop2").check._hash
+
+
+def test_registry_reload(tmp_path):
+    path = tmp_path / "merchants.json"
+    path.write_text(
+        json.dumps([{"merchant_login": "shop1", "password1": "a", "password2": "b"}])
+    )
+    registry = MerchantRegistry.from_file(path)
+    entry = registry.get("shop1")
+
+    assert not registry.reload_if_changed()
+
+    path.write_text(
+        json.dumps(
+            [
+                {"merchant_login": "shop1", "password1": "a", "password2": "b"},
+                {
+                    "merchant_login": "shop2",
+                    "password1": "c",
+                    "password2": "d",
+                    "algorithm": "sha512",
+                },
+            ]
+        )
+    )
+    os.utime(path, (0, 1))
+
+    assert registry.reload_if_changed()
+    assert registry.get("shop1") is entry
+    assert registry.credentials("shop2").algorithm == HashAlgorithm.sha512
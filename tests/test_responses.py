@@ -0,0 +1,99 @@
+import httpx
+import pytest
+
+from robokassa.exceptions import RobokassaInterfaceError, RobokassaUnavailableError
+from robokassa.responses import (
+    CurrenciesResult,
+    HoldOperationResult,
+    InvoiceCreationResult,
+    OperationStateResult,
+)
+from robokassa.utils import HttpResponseValidator
+
+CURRENCIES = b"""<?xml version="1.0" encoding="utf-8"?>
+<CurrenciesList xmlns="http://merchant.roboxchange.com/WebService/">
+  <Result><Code>0</Code></Result>
+  <Groups>
+    <Group Code="BankCard" Description="Bank card">
+      <Items>
+        <Currency Label="BankCard" Alias="BankCard" Name="Bank card"
+                  MinValue="1" MaxValue="300000" />
+        <Currency Label="ApplePay" Alias="ApplePay" Name="Apple Pay"
+                  MinValue="1" MaxValue="100000" />
+      </Items>
+    </Group>
+  </Groups>
+</CurrenciesList>"""
+
+OPERATION_STATE = b"""<?xml version="1.0" encoding="utf-8"?>
+<OperationStateResponse xmlns="http://merchant.roboxchange.com/WebService/">
+  <Result><Code>0</Code></Result>
+  <State><Code>100</Code><RequestDate>2024-01-01T00:00:00</RequestDate></State>
+  <Info><IncCurrLabel>BankCard</IncCurrLabel></Info>
+</OperationStateResponse>"""
+
+
+def test_invoice_result_is_lazy():
+    result = InvoiceCreationResult(b'{"invoiceID": "abc", "errorCode": 0}')
+
+    assert "parsed=False" in repr(result)
+    assert result.invoice_id == "abc"
+    assert "parsed=False" in repr(result)
+    assert result.error_code == 0
+    assert "parsed=True" in repr(result)
+
+
+def test_invoice_result_errors():
+    with pytest.raises(RobokassaInterfaceError, match="26"):
+        _ = InvoiceCreationResult(
+            b'{"errorCode": 26, "errorMessage": "bad"}'
+        ).invoice_id
+    with pytest.raises(RobokassaInterfaceError):
+        _ = InvoiceCreationResult(b"<html>").invoice_id
+    with pytest.raises(RobokassaInterfaceError, match="26"):
+        _ = InvoiceCreationResult(
+            b'{"invoiceID": "abc", "errorCode": 26, "errorMessage": "bad"}'
+        ).invoice_id
+
+
+def test_invoice_id_with_escapes_is_decoded():
+    result = InvoiceCreationResult(b'{"invoiceID": "a\\"b", "errorCode": 0}')
+
+    assert result.invoice_id == 'a"b'
+
+
+@pytest.mark.parametrize(
+    ("content", "accepted"),
+    [
+        (b"OK", True),
+        (b"ok\n", True),
+        (b"OK+42", True),
+        (b"ERROR: hold not found", False),
+        (b"", False),
+        (b"<html><body>502 Bad Gateway</body></html>", False),
+        (b"OKAY", False),
+    ],
+)
+def test_hold_operation_result(content, accepted):
+    result = HoldOperationResult(content)
+
+    assert result.accepted is accepted
+    if not accepted:
+        with pytest.raises(RobokassaInterfaceError, match="rejected"):
+            result.raise_for_error()
+
+
+def test_xml_results():
+    currencies = CurrenciesResult(CURRENCIES)
+    operation_state = OperationStateResult(OPERATION_STATE)
+
+    assert currencies.result_code == 0
+    assert [group["Code"] for group in currencies.groups] == ["BankCard"]
+    assert len(currencies.groups[0]["Items"]["Currency"]) == 2
+    assert operation_state.state_code == 100
+    assert operation_state.info == {"IncCurrLabel": "BankCard"}
+
+
+def test_validator_rejects_unavailable_server():
+    with pytest.raises(RobokassaUnavailableError):
+        HttpResponseValidator(httpx.Response(503))
@@ -0,0 +1,98 @@
+import time
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from robokassa import HashAlgorithm, Robokassa
+from robokassa.asyncio import Robokassa as AsyncRobokassa
+from robokassa.asyncio.connection import AsyncHttpConnection
+from robokassa.asyncio.limiter import AIMDLimiter
+from robokassa.connection import HttpConnection
+from robokassa.exceptions import RobokassaInterfaceError
+from robokassa.hash import Hash
+from robokassa.batch import RateLimiter
+from robokassa.settlement import HoldSettlement, SettlementAction
+
+
+def md5(data: str) -> str:
+    return Hash(HashAlgorithm.md5).hash_data(data)
+
+
+def fake_send(sent, rejected=()):
+    def send(self, request, *args):
+        sent.append(request)
+        content = b"ERROR" if request.data["InvoiceID"] in rejected else b"OK"
+        return request.parse(200, content)
+
+    return send
+
+
+def test_hold_link_and_operations(monkeypatch):
+    sent = []
+    monkeypatch.setattr(HttpConnection, "send", fake_send(sent, rejected={3}))
+    robokassa = Robokassa("demo", "password1", "password2", HashAlgorithm.md5)
+
+    link = robokassa.create_link_to_payment_page_by_script(
+        out_sum=100, inv_id=1, step_by_step=True
+    )
+    assert parse_qs(urlparse(link).query)["StepByStep"] == ["true"]
+
+    assert robokassa.confirm_hold(1, 90)["accepted"]
+    robokassa.cancel_hold(2)
+    with pytest.raises(RobokassaInterfaceError, match="rejected"):
+        robokassa.cancel_hold(3)
+
+    confirm, cancel = sent[:2]
+    assert confirm.url == "Payment/Confirm"
+    assert confirm.data["SignatureValue"] == md5("demo:90:1:password1")
+    assert cancel.url == "Payment/Cancel"
+    assert cancel.data["SignatureValue"] == md5("demo::2:password1")
+
+
+def test_settle_holds(monkeypatch):
+    sent = []
+    monkeypatch.setattr(HttpConnection, "send", fake_send(sent, rejected={2}))
+    robokassa = Robokassa("demo", "password1", "password2", HashAlgorithm.md5)
+
+    results = robokassa.settle_holds(
+        [
+            (1, "confirm", 100),
+            HoldSettlement(2, SettlementAction.cancel),
+            (3, "confirm"),
+            (4, "cancel"),
+        ],
+        max_workers=2,
+    )
+
+    assert [result.ok for result in results] == [True, False, False, True]
+    assert "requires out_sum" in str(results[2].error)
+    assert len(sent) == 3
+
+
+def test_rate_limiter():
+    limiter = RateLimiter(rate=100)
+    started = time.monotonic()
+    for _ in range(6):
+        limiter.acquire()
+
+    assert time.monotonic() - started >= 0.05
+
+
+@pytest.mark.asyncio
+async def test_async_settle_holds(monkeypatch):
+    sent = []
+    send = fake_send(sent)
+
+    async def async_send(self, request, *args):
+        return send(self, request, *args)
+
+    monkeypatch.setattr(AsyncHttpConnection, "send", async_send)
+    robokassa = AsyncRobokassa("demo", "password1", "password2", HashAlgorithm.md5)
+
+    results = await robokassa.settle_holds(
+        ((inv_id, "cancel") for inv_id in range(20)),
+        limiter=AIMDLimiter(initial_limit=4),
+    )
+
+    assert all(result.ok for result in results)
+    assert sorted(request.data["InvoiceID"] for request in sent) == list(range(20))
@@ -1,5 +1,8 @@
+import threading
 from hashlib import md5
 
+from robokassa import Robokassa
+from robokassa.signature import CredentialGeneration, RotatingSignaturesChecker
 from robokassa.types import Signature
 from robokassa.hash import Hash, HashAlgorithm
 
@@ -29,3 +32,68 @@ def test_hash():
     hashed_data = Hash(algorithm=HashAlgorithm.md5).hash_data("hello world")
 
     assert hashed_data == md5(b"hello world").hexdigest().lower()
+
+
+def test_rotating_signatures_checker():
+    old = CredentialGeneration("old1", "old2", HashAlgorithm.md5, name="old")
+    new = CredentialGeneration("new1", "new2", HashAlgorithm.sha256, name="new")
+    checker = RotatingSignaturesChecker([new, old])
+
+    old_signature = Signature(
+        out_sum=100,
+        inv_id=5,
+        password="old2",
+        additional_params={"shp_id": 1},
+        hash_=Hash(HashAlgorithm.md5),
+    )
+    new_signature = Signature(
+        out_sum=100,
+        inv_id=5,
+        password="new1",
+        hash_=Hash(HashAlgorithm.sha256),
+    )
+
+    assert (
+        checker.match_result_url_signature(
+            old_signature.value.upper(), 100, 5, shp_id=1
+        )
+        == old
+    )
+    assert checker.match_result_url_signature(old_signature.value, 100, 5) is None
+    assert checker.success_or_fail_url_signature_is_valid(new_signature.value, 100, 5)
+    assert not checker.result_url_signature_is_valid(new_signature.value, 100, 5)
+    assert checker.matches == {"old": 1, "new": 1}
+    assert checker.match_result_url_signature("é" * 32, 100, 5) is None
+
+
+def test_rotating_signatures_checker_counts_matches_from_threads():
+    generation = CredentialGeneration("p1", "p2", HashAlgorithm.md5, name="current")
+    checker = RotatingSignaturesChecker([generation])
+    signature = Hash(HashAlgorithm.md5).hash_data("100:5:p2")
+
+    def check() -> None:
+        for _ in range(1000):
+            checker.match_result_url_signature(signature, 100, 5)
+
+    threads = [threading.Thread(target=check) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert checker.matches == {"current": 8000}
+
+
+def test_client_accepts_previous_credentials():
+    robokassa = Robokassa(
+        merchant_login="test_login",
+        password1="new1",
+        password2="new2",
+        previous_credentials=[CredentialGeneration("old1", "old2")],
+    )
+    signature = Signature(
+        out_sum=100, inv_id=5, password="old2", hash_=Hash(HashAlgorithm.md5)
+    )
+
+    assert robokassa.result_signature_is_valid(signature.value, 100, 5)
+    assert not robokassa.success_or_fail_signature_is_valid(signature.value, 100, 5)
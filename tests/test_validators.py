@@ -0,0 +1,139 @@
+import asyncio
+from decimal import Decimal
+
+import pytest
+
+from robokassa import HashAlgorithm, Robokassa
+from robokassa.asyncio import Robokassa as AsyncRobokassa
+from robokassa.connection import HttpConnection
+from robokassa.registry import MerchantCredentials, MerchantRegistry
+from robokassa.asyncio.connection import AsyncHttpConnection
+from robokassa.exceptions import (
+    IncorrectUrlMethodError,
+    InvalidParameterError,
+    UnusedStrictUrlParameterError,
+)
+from robokassa.types import RobokassaParams
+from robokassa.validation import validate_params, validate_script_link
+
+
+@pytest.mark.parametrize(
+    "out_sum",
+    [100, "100", "100.5", 0.01, "9999999.99", 0.1 + 0.2, 1e16, Decimal("12.50")],
+)
+def test_valid_out_sum(out_sum):
+    validate_script_link(out_sum)
+
+
+@pytest.mark.parametrize(
+    "out_sum",
+    [0, "-1", "1,5", "1e3", "", "10.1234567", float("nan"), float("inf"), 1e30, True],
+)
+def test_invalid_out_sum(out_sum):
+    with pytest.raises(InvalidParameterError, match="OutSum"):
+        validate_script_link(out_sum)
+
+
+@pytest.mark.parametrize(
+    "params",
+    [
+        {"inv_id": "abc"},
+        {"inv_id": 2_147_483_648},
+        {"description": "x" * 101},
+        {"culture": "de"},
+        {"encoding": "utf 8"},
+        {"email": "not-an-email"},
+        {"expiration_date": "tomorrow"},
+    ],
+)
+def test_invalid_params(params):
+    with pytest.raises(InvalidParameterError):
+        validate_params(RobokassaParams(out_sum=100, **params))
+
+
+def test_valid_params():
+    validate_params(
+        RobokassaParams(
+            out_sum="100.00",
+            inv_id=1,
+            description="x" * 100,
+            culture="en",
+            encoding="utf-8",
+            email="user@example.com",
+            expiration_date="2030-01-01T00:00:00.1234567+03:00",
+        )
+    )
+
+
+def test_url_pairing():
+    robokassa = Robokassa("demo", "password1", "password2")
+
+    with pytest.raises(UnusedStrictUrlParameterError):
+        robokassa.create_link_to_payment_page_by_script(
+            100, success_url="https://example.com"
+        )
+    with pytest.raises(UnusedStrictUrlParameterError):
+        robokassa.create_link_to_payment_page_by_script(
+            100, fail_url="https://example.com"
+        )
+    with pytest.raises(UnusedStrictUrlParameterError):
+        robokassa.create_link_to_payment_page_by_script(100, fail_url_method="GET")
+    with pytest.raises(IncorrectUrlMethodError):
+        robokassa.create_link_to_payment_page_by_script(
+            100, fail_url="https://example.com", fail_url_method="PUT"
+        )
+    with pytest.raises(InvalidParameterError):
+        robokassa.create_link_to_payment_page_by_script(100, result_url="example.com")
+
+    link = robokassa.create_link_to_payment_page_by_script(
+        100, fail_url="https://example.com/fail", fail_url_method="POST"
+    )
+    assert "FailUrl2" in link
+
+
+def test_invalid_invoice_is_not_sent(monkeypatch):
+    def send(*args, **kwargs):
+        raise AssertionError("Request must not be sent")
+
+    monkeypatch.setattr(HttpConnection, "send", send)
+    robokassa = Robokassa("demo", "password1", "password2", algorithm=HashAlgorithm.md5)
+
+    with pytest.raises(InvalidParameterError, match="Description"):
+        robokassa.create_link_to_payment_page_by_invoice_id(
+            inv_id=1, out_sum=100, description="x" * 101
+        )
+
+
+def test_batch_reports_invalid_items(monkeypatch):
+    sent = []
+
+    async def send(self, request, *args, **kwargs):
+        sent.append(request)
+        raise AssertionError("Request must not be sent")
+
+    monkeypatch.setattr(AsyncHttpConnection, "send", send)
+    robokassa = AsyncRobokassa("demo", "password1", "password2")
+
+    results = asyncio.run(
+        robokassa.create_links_to_payment_page_by_invoice_id(
+            [
+                {"inv_id": 1, "out_sum": "1,5", "description": "Order"},
+                {"inv_id": -1, "out_sum": 100, "description": "Order"},
+            ]
+        )
+    )
+
+    assert [type(result.error) for result in results] == [
+        InvalidParameterError,
+        InvalidParameterError,
+    ]
+    assert sent == []
+
+
+def test_registry_validates_script_link():
+    registry = MerchantRegistry([MerchantCredentials("demo", "p1", "p2")])
+
+    with pytest.raises(UnusedStrictUrlParameterError):
+        registry.create_link_to_payment_page_by_script(
+            "demo", 100, fail_url="https://example.com"
+        )
@@ -0,0 +1,80 @@
+import asyncio
+from urllib.parse import urlencode
+
+import pytest
+
+from robokassa.asyncio import Robokassa
+from robokassa.hash import Hash, HashAlgorithm
+from robokassa.signature import CredentialGeneration
+from robokassa.types import Signature
+
+
+def form(inv_id: int, password: str = "p2") -> dict:
+    signature = Signature(
+        out_sum="100.00",
+        inv_id=inv_id,
+        password=password,
+        additional_params={"Shp_user": "7"},
+        hash_=Hash(HashAlgorithm.md5),
+    ).value
+    return {
+        "OutSum": "100.00",
+        "InvId": str(inv_id),
+        "SignatureValue": signature.upper(),
+        "Shp_user": "7",
+    }
+
+
+@pytest.mark.asyncio
+async def test_webhook_queue():
+    handled = []
+    release = asyncio.Event()
+
+    async def fulfil(notification):
+        await release.wait()
+        if notification.inv_id == "2":
+            raise RuntimeError("fulfilment failed")
+        handled.append(notification)
+
+    robokassa = Robokassa("demo", "p1", "p2")
+    queue = robokassa.create_webhook_queue(fulfil, workers=1, maxsize=2)
+    assert queue.accept(form(1)).status_code == 503
+
+    async with queue:
+        assert queue.accept(form(1, password="wrong")).status_code == 400
+        responses = [queue.accept_body(urlencode(form(i)).encode()) for i in range(4)]
+        # acknowledgement doesn't wait for workers, extra notifications are shed
+        assert [response.body for response in responses[:2]] == ["OK0", "OK1"]
+        assert [response.status_code for response in responses[2:]] == [503, 503]
+
+        # worker takes notification from queue and frees a slot
+        await asyncio.sleep(0)
+        assert queue.accept(form(2)).body == "OK2"
+        release.set()
+
+    assert [notification.inv_id for notification in handled] == ["0", "1"]
+    assert handled[0].additional_params == {"Shp_user": "7"}
+    assert queue.metrics() == {
+        "queued": 0,
+        "accepted": 3,
+        "rejected": 1,
+        "shed": 3,
+        "processed": 2,
+        "failed": 1,
+    }
+
+
+@pytest.mark.asyncio
+async def test_webhook_queue_rejects_non_ascii_signature():
+    async def fulfil(notification):
+        pass
+
+    robokassa = Robokassa(
+        "demo", "p1", "p2", previous_credentials=[CredentialGeneration("o1", "o2")]
+    )
+    queue = robokassa.create_webhook_queue(fulfil)
+
+    async with queue:
+        response = queue.accept({"OutSum": "1", "InvId": "1", "SignatureValue": "é"})
+        assert response.status_code == 400
+        assert queue.accept(form(1, password="o2")).body == "OK1"